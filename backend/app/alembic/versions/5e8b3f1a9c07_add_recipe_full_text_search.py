@@ -0,0 +1,118 @@
+"""Add recipe full-text search
+
+Revision ID: 5e8b3f1a9c07
+Revises: c41f8a2d7e63
+Create Date: 2025-06-07 11:03:26.480112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5e8b3f1a9c07'
+down_revision = 'c41f8a2d7e63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('recipe', sa.Column('search_config', sqlmodel.sql.sqltypes.AutoString(length=32), nullable=False, server_default='simple'))
+    op.add_column('recipe', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Title (A), description (B) and ingredients (C) of a recipe
+    op.execute("""
+        CREATE FUNCTION recipe_search_vector(
+            _recipe_id uuid, _config regconfig, _title text, _description text
+        ) RETURNS tsvector LANGUAGE sql STABLE AS $$
+            SELECT setweight(to_tsvector(_config, coalesce(_title, '')), 'A')
+                || setweight(to_tsvector(_config, coalesce(_description, '')), 'B')
+                || setweight(to_tsvector(_config, coalesce(
+                    (SELECT string_agg(content, ' ' ORDER BY index)
+                     FROM ingredient WHERE recipe_id = _recipe_id), ''
+                )), 'C')
+        $$
+    """)
+    op.execute("""
+        CREATE FUNCTION recipe_search_vector_update() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.search_vector := recipe_search_vector(
+                NEW.id, NEW.search_config::regconfig, NEW.title, NEW.description
+            );
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER recipe_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description, search_config ON recipe
+        FOR EACH ROW EXECUTE FUNCTION recipe_search_vector_update()
+    """)
+    # One refresh per statement, so multi-row ingredient writes cost one UPDATE
+    op.execute("""
+        CREATE FUNCTION ingredient_search_vector_refresh() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                UPDATE recipe SET search_vector = recipe_search_vector(
+                    recipe.id, recipe.search_config::regconfig, recipe.title, recipe.description
+                )
+                WHERE recipe.id IN (SELECT recipe_id FROM old_ingredients);
+            ELSE
+                UPDATE recipe SET search_vector = recipe_search_vector(
+                    recipe.id, recipe.search_config::regconfig, recipe.title, recipe.description
+                )
+                WHERE recipe.id IN (SELECT recipe_id FROM new_ingredients);
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER ingredient_insert_search_vector
+        AFTER INSERT ON ingredient REFERENCING NEW TABLE AS new_ingredients
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_search_vector_refresh()
+    """)
+    op.execute("""
+        CREATE TRIGGER ingredient_update_search_vector
+        AFTER UPDATE ON ingredient REFERENCING NEW TABLE AS new_ingredients
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_search_vector_refresh()
+    """)
+    op.execute("""
+        CREATE TRIGGER ingredient_delete_search_vector
+        AFTER DELETE ON ingredient REFERENCING OLD TABLE AS old_ingredients
+        FOR EACH STATEMENT EXECUTE FUNCTION ingredient_search_vector_refresh()
+    """)
+    # Fires recipe_search_vector_update for every existing recipe
+    op.execute("UPDATE recipe SET search_config = search_config")
+
+    # pg_trgm ships with the official Postgres images but may be missing on
+    # other servers; fuzzy search is simply disabled without it
+    has_trgm = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+    ).first()
+    if has_trgm:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        op.create_index('ix_recipe_search_vector', 'recipe', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+        if has_trgm:
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_recipe_title_trgm ON recipe USING gin (title gin_trgm_ops)")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_recipe_title_trgm")
+        op.drop_index('ix_recipe_search_vector', table_name='recipe', postgresql_concurrently=True, if_exists=True)
+    op.execute("DROP TRIGGER ingredient_delete_search_vector ON ingredient")
+    op.execute("DROP TRIGGER ingredient_update_search_vector ON ingredient")
+    op.execute("DROP TRIGGER ingredient_insert_search_vector ON ingredient")
+    op.execute("DROP FUNCTION ingredient_search_vector_refresh()")
+    op.execute("DROP TRIGGER recipe_search_vector_update ON recipe")
+    op.execute("DROP FUNCTION recipe_search_vector_update()")
+    op.execute("DROP FUNCTION recipe_search_vector(uuid, regconfig, text, text)")
+    op.drop_column('recipe', 'search_vector')
+    op.drop_column('recipe', 'search_config')
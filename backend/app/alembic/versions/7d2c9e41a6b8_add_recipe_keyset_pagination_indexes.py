@@ -0,0 +1,49 @@
+"""Add recipe keyset pagination indexes
+
+Revision ID: 7d2c9e41a6b8
+Revises: 3b7e5f0c9d21
+Create Date: 2025-06-04 09:41:12.203561
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2c9e41a6b8'
+down_revision = '3b7e5f0c9d21'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    'ix_recipe_user_id_created_at_id': ['user_id', 'created_at', 'id'],
+    'ix_recipe_user_id_last_accessed_at_id': ['user_id', 'last_accessed_at', 'id'],
+    'ix_recipe_created_at_id': ['created_at', 'id'],
+    'ix_recipe_last_accessed_at_id': ['last_accessed_at', 'id'],
+}
+
+
+def upgrade():
+    # Build the indexes without locking the recipe table against writes
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.create_index(
+                name,
+                'recipe',
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(
+                name,
+                table_name='recipe',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,50 @@
+"""Add recipe access pattern indexes
+
+Revision ID: c41f8a2d7e63
+Revises: 7d2c9e41a6b8
+Create Date: 2025-06-05 14:22:48.917305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f8a2d7e63'
+down_revision = '7d2c9e41a6b8'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Child loads (selectinload) and ON DELETE CASCADE from recipe
+    ('ix_ingredient_recipe_id', 'ingredient', ['recipe_id']),
+    ('ix_direction_recipe_id', 'direction', ['recipe_id']),
+    # GET /recipes/?is_favorite=
+    ('ix_recipe_user_id_is_favorite', 'recipe', ['user_id', 'is_favorite']),
+]
+
+
+def upgrade():
+    # Build the indexes without locking the tables against writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -1,3 +1,4 @@
+import uuid
 from collections.abc import Generator
 from typing import Annotated
 
@@ -9,6 +10,7 @@ from pydantic import ValidationError
 from sqlmodel import Session
 
 from app.core import security
+from app.core.auth_cache import UserSnapshot, auth_cache
 from app.core.config import settings
 from app.core.db import engine
 from app.models import User
@@ -28,7 +30,10 @@ SessionDep = Annotated[Session, Depends(get_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def _token_subject(token: str) -> str:
+    subject = auth_cache.get_token_subject(token)
+    if subject is not None:
+        return subject
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
@@ -39,20 +44,78 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
-    if not user:
+    if token_data.sub is None:
         raise HTTPException(status_code=404, detail="User not found")
+    auth_cache.set_token_subject(token, token_data.sub, payload.get("exp", 0))
+    return token_data.sub
+
+
+def _check_user(user: User | UserSnapshot) -> None:
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     if user.deleted_at is not None:
         raise HTTPException(status_code=400, detail="User account has been deleted")
+
+
+def get_current_user_snapshot(session: SessionDep, token: TokenDep) -> UserSnapshot:
+    """
+    The authenticated user, served from the auth cache when possible, so
+    routes that only need the user's identity and flags skip the user query.
+    """
+    subject = _token_subject(token)
+    try:
+        user_id = uuid.UUID(subject)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="User not found")
+    snapshot = auth_cache.get_user(user_id)
+    if snapshot is None:
+        user = session.get(User, user_id)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        snapshot = UserSnapshot.from_user(user)
+        auth_cache.set_user(snapshot)
+    _check_user(snapshot)
+    return snapshot
+
+
+CurrentUserSnapshot = Annotated[UserSnapshot, Depends(get_current_user_snapshot)]
+
+
+def get_current_user_snapshot_without_db(
+    session: SessionDep, snapshot: CurrentUserSnapshot
+) -> UserSnapshot:
+    """
+    The authenticated user snapshot, with the request's connection returned to
+    the pool, for routes that spend most of their time waiting on something
+    else (the LLM) and open short sessions of their own when they need one.
+    """
+    session.close()
+    return snapshot
+
+
+CurrentUserSnapshotWithoutDB = Annotated[
+    UserSnapshot, Depends(get_current_user_snapshot_without_db)
+]
+
+
+def get_current_user(session: SessionDep, snapshot: CurrentUserSnapshot) -> User:
+    """
+    The authenticated user as a database row, for routes that change it or
+    attach it to other rows.
+    """
+    user = session.get(User, snapshot.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    _check_user(user)
     return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_active_superuser(
+    current_user: CurrentUserSnapshot,
+) -> UserSnapshot:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
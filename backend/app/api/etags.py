@@ -0,0 +1,71 @@
+import datetime
+import hashlib
+import uuid
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response
+
+# Responses are per user; "no-cache" lets clients keep them but revalidate
+# each time, which If-None-Match makes cheap
+CACHE_CONTROL = "private, no-cache"
+
+
+def recipe_etag(recipe_id: uuid.UUID, updated_at: datetime.datetime) -> str:
+    """
+    Weak ETag of a recipe: it changes whenever the recipe is updated. Reads
+    change last_accessed_at and number_of_accesses without changing it, so
+    equal ETags are equivalent representations, not identical ones.
+    """
+    return f'W/"{recipe_id.hex}-{updated_at:%Y%m%d%H%M%S%f}"'
+
+
+def page_etag(
+    recipes: Iterable[tuple[uuid.UUID, datetime.datetime]], *extra: Any
+) -> str:
+    """
+    Weak ETag of a page of recipes, given as (id, updated_at) pairs in page
+    order, and of `extra` values also in the response such as the count.
+    """
+    digest = hashlib.sha256()
+    for recipe_id, updated_at in recipes:
+        digest.update(recipe_etag(recipe_id, updated_at).encode())
+    digest.update(repr(extra).encode())
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def _opaque_tags(header: str) -> list[str]:
+    # The weak comparison: W/"x" and "x" match
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """
+    Whether an If-Match `header` (a list of ETags, or "*") matches `etag`.
+
+    The ETags are weak, so they are compared weakly: a match means the recipe
+    was not updated since, whatever it was read, which is what a conditional
+    update needs.
+    """
+    tags = _opaque_tags(header)
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def not_modified(if_none_match: str | None, etag: str) -> Response | None:
+    """
+    The 304 response to send if an If-None-Match header matches `etag`,
+    compared weakly as the header requires.
+    """
+    if if_none_match is None:
+        return None
+    tags = _opaque_tags(if_none_match)
+    if "*" not in tags and etag.removeprefix("W/") not in tags:
+        return None
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,38 @@
+import base64
+import datetime
+import json
+import uuid
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(key: str, *values: Any) -> str:
+    """
+    Build an opaque keyset cursor from the sort key name and the sort values
+    of the last row of a page.
+    """
+    payload = json.dumps([key, *(_encode_value(value) for value in values)])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: str) -> list[Any]:
+    """
+    Return the sort values stored in a cursor created for the same sort key.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(payload, list) or not payload or payload[0] != key:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload[1:]
@@ -0,0 +1,110 @@
+from typing import Any, get_args
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+from app.schemas.recipe_schemas import RecipePublic, RecipesPublic
+
+
+class DefaultJSONResponse(ORJSONResponse):
+    """
+    JSON encoded with orjson, the app's default response class, or content
+    already serialized to JSON bytes, sent as is.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
+
+
+_MISSING = object()
+
+
+def _nested_model(annotation: Any) -> type[BaseModel] | None:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model = _nested_model(arg)
+        if model is not None:
+            return model
+    return None
+
+
+class ResponseSerializer:
+    """
+    Serializes ORM objects to the JSON of the response model `model`, without
+    validating them again.
+
+    Only the fields of `model` are read, those of nested models (lists and
+    optional ones included) recursively; the field lists are built once. Meant
+    for rows read from the database, which were validated when written: FastAPI
+    would build a `model` from them, validate it a second time and convert it
+    to dicts before encoding. The top-level fields in `exclude` are left out.
+    """
+
+    def __init__(
+        self, model: type[BaseModel], *, exclude: tuple[str, ...] = ()
+    ) -> None:
+        self.model = model
+        self.fields = [
+            (name, field, ResponseSerializer(nested) if nested else None)
+            for name, field in model.model_fields.items()
+            if name not in exclude
+            for nested in [_nested_model(field.annotation)]
+        ]
+
+    def to_python(self, obj: Any) -> dict[str, Any]:
+        """
+        The fields of `obj`, an object or a dict, as JSON-encodable values.
+        `obj` can leave out the fields that have a default; ValueError is
+        raised for a missing required field.
+        """
+        read = dict.get if isinstance(obj, dict) else getattr
+        data = {}
+        for name, field, nested in self.fields:
+            value = read(obj, name, _MISSING)
+            if value is _MISSING:
+                if field.is_required():
+                    raise ValueError(
+                        f"{self.model.__name__}: missing required field {name!r}"
+                    )
+                value = field.get_default(call_default_factory=True)
+            if nested is not None and value is not None:
+                if isinstance(value, list):
+                    value = [nested.to_python(item) for item in value]
+                else:
+                    value = nested.to_python(value)
+            data[name] = value
+        return data
+
+    def dump_json(self, obj: Any) -> bytes:
+        return orjson.dumps(self.to_python(obj))
+
+
+# Updated on reads, without changing updated_at
+RECIPE_ACCESS_FIELDS = ("last_accessed_at", "number_of_accesses")
+
+RECIPE_PUBLIC = ResponseSerializer(RecipePublic)
+RECIPE_PUBLIC_WITHOUT_ACCESSES = ResponseSerializer(
+    RecipePublic, exclude=RECIPE_ACCESS_FIELDS
+)
+RECIPES_PUBLIC = ResponseSerializer(RecipesPublic)
+
+
+def add_json_fields(content: bytes, values: dict[str, Any]) -> bytes:
+    """
+    `content`, a JSON object with at least one field, with the fields
+    `values` added at the end, without decoding it.
+    """
+    return content[:-1] + b"," + orjson.dumps(values)[1:]
+
+
+def model_response(serializer: ResponseSerializer, obj: Any) -> DefaultJSONResponse:
+    """
+    `obj` serialized with `serializer`. Returned from a route, it skips
+    FastAPI's response_model handling; the response_model still documents the
+    response.
+    """
+    return DefaultJSONResponse(serializer.dump_json(obj))
@@ -1,70 +1,313 @@
 # api/routers/recipes.py
+import datetime
 import json
+import logging
 import uuid
-from typing import Annotated, Any
-
-import requests
-from fastapi import APIRouter, Body, HTTPException, Request
-from sqlmodel import delete, func, select
-
-from app.api.deps import CurrentUser, SessionDep
+from collections.abc import AsyncIterator, Sequence
+from typing import Annotated, Any, Literal
+
+from fastapi import APIRouter, Body, Header, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import HttpUrl, ValidationError
+from sqlalchemy import literal, tuple_
+from sqlmodel import Session, col, func, select
+
+from app import crud
+from app.api.deps import (
+    CurrentUser,
+    CurrentUserSnapshot,
+    CurrentUserSnapshotWithoutDB,
+    SessionDep,
+)
+from app.api.etags import (
+    etag_matches,
+    not_modified,
+    page_etag,
+    recipe_etag,
+    set_cache_headers,
+)
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import (
+    RECIPE_PUBLIC,
+    RECIPE_PUBLIC_WITHOUT_ACCESSES,
+    RECIPES_PUBLIC,
+    DefaultJSONResponse,
+    add_json_fields,
+    model_response,
+)
+from app.core.auth_cache import UserSnapshot
 from app.core.config import settings
+from app.core.db import engine
 from app.core.rate_limit import limiter
-from app.models import Direction, Ingredient, Recipe, User
+from app.core.webhooks import check_callback_url
+from app.models import Recipe, RecipeGenerationJob, User
 from app.schemas.recipe_schemas import (
+    RecipeBatchGenerate,
+    RecipeChanges,
     RecipeCreate,
+    RecipeGenerationJobBase,
+    RecipeGenerationJobPublic,
+    RecipePatchOperation,
     RecipePublic,
     RecipesPublic,
     RecipeUpdate,
 )
 from app.schemas.schemas import Message
+from app.services.recipe_access import recipe_access_tracker
+from app.services.recipe_cache import recipe_response_cache
+from app.services.recipe_jobs import recipe_job_runner
+from app.services.recipe_patch import apply_recipe_operations
 from app.services.recipe_services import RecipeAIService
 
-router = APIRouter(prefix="/recipes", tags=["recipes"])
-ai_service = RecipeAIService()  # can be reused across requests
+logger = logging.getLogger(__name__)
 
-OPENAI_URL = "https://api.openai.com/v1/chat/completions"
-OPENAI_API_KEY = settings.OPENAI_API_KEY
+router = APIRouter(prefix="/recipes", tags=["recipes"])
+# Shared with the background job workers, generation cache included
+ai_service = recipe_job_runner.service
+# Owner of the recipes generated with /generate-public
+GUEST_EMAIL = "guest@jammin-dev.com"
 
 
 # --------------------------------------------------------------------------- #
 #                                 CRUD routes                                 #
 # --------------------------------------------------------------------------- #
+RECIPE_SORT_COLUMNS = {
+    "created_at": col(Recipe.created_at),
+    "last_accessed_at": col(Recipe.last_accessed_at),
+}
+
+
 @router.get("/", response_model=RecipesPublic)
 def read_recipes(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshot,
     skip: int = 0,
     limit: int = 100,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = None,
+    order_by: Literal["created_at", "last_accessed_at"] = "created_at",
+    include_count: bool = True,
+    is_favorite: bool | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
-    Retrieve recipes (owns only, unless superuser).
+    Retrieve recipes (owns only, unless superuser), optionally only the
+    favorite (or non-favorite) ones.
+
+    With `pagination=cursor` (implied when `cursor` is given) recipes are
+    paged by keyset over `(order_by, id)`, most recent first: pass the
+    returned `next_cursor` to fetch the following page. `include_count=false`
+    skips counting the matching recipes.
+
+    The page has an ETag that changes when one of its recipes is updated or
+    the page holds other recipes: with a matching If-None-Match, 304 is
+    returned without loading the ingredients and directions.
     """
     base_stmt = select(Recipe)
     if not current_user.is_superuser:
         base_stmt = base_stmt.where(Recipe.user_id == current_user.id)
+    if is_favorite is not None:
+        base_stmt = base_stmt.where(Recipe.is_favorite == is_favorite)
+
+    count = None
+    if include_count:
+        count = session.exec(
+            select(func.count()).select_from(base_stmt.subquery())
+        ).one()
+
+    if pagination == "offset" and cursor is None:
+        recipes = session.exec(
+            base_stmt.options(crud.RECIPE_OWNER_LOADER).offset(skip).limit(limit)
+        ).all()
+        return _recipes_page(session, recipes, count, None, if_none_match)
+
+    sort_column = RECIPE_SORT_COLUMNS[order_by]
+    if cursor:
+        values = decode_cursor(cursor, order_by)
+        try:
+            last_value = datetime.datetime.fromisoformat(values[0])
+            last_id = uuid.UUID(values[1])
+        except (IndexError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        base_stmt = base_stmt.where(
+            tuple_(sort_column, col(Recipe.id))
+            < tuple_(literal(last_value), literal(last_id))
+        )
 
-    count = session.exec(select(func.count()).select_from(base_stmt.subquery())).one()
+    recipes = session.exec(
+        base_stmt.options(crud.RECIPE_OWNER_LOADER)
+        .order_by(sort_column.desc(), col(Recipe.id).desc())
+        .limit(limit + 1)
+    ).all()
+    next_cursor = None
+    if len(recipes) > limit:
+        recipes = recipes[:limit]
+        last = recipes[-1]
+        next_cursor = encode_cursor(order_by, getattr(last, order_by), last.id)
+    return _recipes_page(session, recipes, count, next_cursor, if_none_match)
+
+
+def _recipes_page(
+    session: Session,
+    recipes: Sequence[Recipe],
+    count: int | None,
+    next_cursor: str | None,
+    if_none_match: str | None,
+) -> Response:
+    etag = page_etag(
+        ((recipe.id, recipe.updated_at) for recipe in recipes), count, next_cursor
+    )
+    unchanged = not_modified(if_none_match, etag)
+    if unchanged is not None:
+        return unchanged
+    crud.load_recipe_lines(session=session, recipes=recipes)
+    page = model_response(
+        RECIPES_PUBLIC, {"data": recipes, "count": count, "next_cursor": next_cursor}
+    )
+    set_cache_headers(page, etag)
+    return page
 
-    recipes = session.exec(base_stmt.offset(skip).limit(limit)).all()
-    return RecipesPublic(data=recipes, count=count)
+
+@router.get("/search", response_model=RecipesPublic)
+def search_recipes(
+    session: SessionDep,
+    current_user: CurrentUserSnapshot,
+    q: str,
+    language: str = "en",
+    limit: int = 20,
+    cursor: str | None = None,
+) -> Any:
+    """
+    Search recipes (owns only, unless superuser) by title, description and
+    ingredients, best matches first.
+
+    `language` picks the stemming rules applied to `q`. When nothing matches,
+    recipes are matched on fuzzy title similarity instead, so typos still
+    find results. Pass the returned `next_cursor` to fetch the following page.
+    """
+    owner_id = None if current_user.is_superuser else current_user.id
+    search_config = RecipeAIService.search_config(language)
+
+    fuzzy = False
+    after = None
+    if cursor:
+        values = decode_cursor(cursor, "search")
+        try:
+            mode, rank, last_id = values
+            fuzzy = mode == "fuzzy"
+            after = (float(rank), uuid.UUID(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    results = crud.search_recipes(
+        session=session,
+        query=q,
+        search_config=search_config,
+        owner_id=owner_id,
+        limit=limit + 1,
+        after=after,
+        fuzzy=fuzzy,
+    )
+    if not results and cursor is None and crud.has_trigram_support(session=session):
+        fuzzy = True
+        results = crud.search_recipes(
+            session=session,
+            query=q,
+            search_config=search_config,
+            owner_id=owner_id,
+            limit=limit + 1,
+            fuzzy=True,
+        )
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        last, rank = results[-1]
+        next_cursor = encode_cursor(
+            "search", "fuzzy" if fuzzy else "text", rank, last.id
+        )
+    return model_response(
+        RECIPES_PUBLIC,
+        {"data": [recipe for recipe, _ in results], "next_cursor": next_cursor},
+    )
+
+
+@router.get("/jobs/{id}", response_model=RecipeGenerationJobPublic)
+def read_generation_job(
+    session: SessionDep, current_user: CurrentUserSnapshot, id: uuid.UUID
+) -> Any:
+    """
+    Get the status of a background recipe generation, and the recipe once
+    it has succeeded.
+    """
+    job = session.get(RecipeGenerationJob, id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not current_user.is_superuser and job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    recipe = None
+    if job.recipe_id:
+        recipe = session.get(Recipe, job.recipe_id, options=crud.RECIPE_PUBLIC_LOADERS)
+    return RecipeGenerationJobPublic.model_validate(job, update={"recipe": recipe})
 
 
 @router.get("/{id}", response_model=RecipePublic)
 def read_recipe(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshot,
     id: uuid.UUID,
+    if_none_match: Annotated[str | None, Header()] = None,
 ) -> Any:
     """
     Get a recipe by UUID.
+
+    The read is recorded in last_accessed_at and number_of_accesses a few
+    seconds later, in a batch with other reads. The ETag changes when the
+    recipe is updated, not on reads: with a matching If-None-Match, 304 is
+    returned without loading the ingredients and directions. It can also be
+    sent back in If-Match to PATCH the recipe.
+
+    Guest recipes, which nobody edits once generated, are served from the
+    response cache, keyed by id and updated_at: a cached read neither loads
+    nor serializes the ingredients and directions.
     """
-    recipe = session.get(Recipe, id)
+    recipe = session.get(Recipe, id, options=[crud.RECIPE_OWNER_LOADER])
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     if not current_user.is_superuser and recipe.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return recipe
+    recipe_access_tracker.record(recipe.id)
+    etag = recipe_etag(recipe.id, recipe.updated_at)
+    unchanged = not_modified(if_none_match, etag)
+    if unchanged is not None:
+        return unchanged
+    if recipe.user.email == GUEST_EMAIL:
+        recipe_response = DefaultJSONResponse(_cached_recipe_json(session, recipe))
+    else:
+        crud.load_recipe_lines(session=session, recipes=[recipe])
+        recipe_response = model_response(RECIPE_PUBLIC, recipe)
+    set_cache_headers(recipe_response, etag)
+    return recipe_response
+
+
+def _cached_recipe_json(session: Session, recipe: Recipe) -> bytes:
+    def render() -> bytes:
+        crud.load_recipe_lines(session=session, recipes=[recipe])
+        return RECIPE_PUBLIC_WITHOUT_ACCESSES.dump_json(recipe)
+
+    content = recipe_response_cache.get_or_render(
+        recipe_response_cache.key(recipe.id, recipe.updated_at), render
+    )
+    # Left out of the cache, since reads change them
+    return add_json_fields(
+        content,
+        {
+            "last_accessed_at": recipe.last_accessed_at,
+            "number_of_accesses": recipe.number_of_accesses,
+        },
+    )
 
 
 @router.post("/", response_model=RecipePublic)
@@ -103,37 +346,23 @@ def create_recipe(
     """
     Create a recipe (manual, not AI).
     """
-    recipe_data = recipe_in.model_dump(exclude={"ingredients", "directions"})
-    recipe = Recipe.model_validate(recipe_data, update={"user_id": current_user.id})
-
-    try:
-        session.add(recipe)
-        session.commit()
-        session.refresh(recipe)
-
-        for ing in recipe_in.ingredients or []:
-            session.add(Ingredient.model_validate(ing, update={"recipe_id": recipe.id}))
-        for direc in recipe_in.directions or []:
-            session.add(
-                Direction.model_validate(direc, update={"recipe_id": recipe.id})
-            )
-
-        session.commit()
-        session.refresh(recipe)
-        return recipe
-    except Exception:
-        session.rollback()
-        raise
+    return crud.create_recipe(
+        session=session,
+        recipe_create=recipe_in,
+        owner=current_user,
+        search_config=RecipeAIService.search_config(recipe_in.language),
+    )
 
 
 @router.put("/{id}", response_model=RecipePublic)
 def update_recipe(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshot,
     id: uuid.UUID,
     recipe_in: RecipeUpdate,
-) -> RecipePublic:
+    response: Response,
+) -> Any:
     """
     Update an existing recipe (ingredients & directions fully replaced when provided).
     """
@@ -143,33 +372,79 @@ def update_recipe(
     if not current_user.is_superuser and recipe.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
-    data = recipe_in.model_dump(exclude_unset=True)
-    ingredients_data = data.pop("ingredients", None)
-    directions_data = data.pop("directions", None)
+    crud.update_recipe(session=session, db_recipe=recipe, recipe_in=recipe_in)
+    updated = session.get(
+        Recipe, id, options=crud.RECIPE_PUBLIC_LOADERS, populate_existing=True
+    )
+    assert updated is not None
+    response.headers["ETag"] = recipe_etag(updated.id, updated.updated_at)
+    return updated
 
-    for field, value in data.items():
-        setattr(recipe, field, value)
-    session.flush()
 
-    if ingredients_data is not None:
-        session.exec(delete(Ingredient).where(Ingredient.recipe_id == recipe.id))
-        for ing in ingredients_data:
-            session.add(Ingredient.model_validate(ing, update={"recipe_id": recipe.id}))
+@router.patch("/{id}", response_model=RecipeChanges, response_model_exclude_unset=True)
+def patch_recipe(
+    *,
+    session: SessionDep,
+    current_user: CurrentUserSnapshot,
+    id: uuid.UUID,
+    operations: list[RecipePatchOperation],
+    response: Response,
+    if_match: Annotated[str | None, Header()] = None,
+) -> Any:
+    """
+    Edit a recipe with JSON Patch style operations, applied in order in a
+    single transaction: "replace" a field such as "/is_favorite", or
+    "add", "replace", "remove" or "move" a line such as "/directions/2".
 
-    if directions_data is not None:
-        session.exec(delete(Direction).where(Direction.recipe_id == recipe.id))
-        for dir_ in directions_data:
-            session.add(Direction.model_validate(dir_, update={"recipe_id": recipe.id}))
+    With If-Match, the operations are only applied if the recipe still has
+    that ETag, or 412 is returned. Only the fields that changed are returned,
+    with the new ETag.
+    """
+    # Locked, so that no other update can slip in after the ETag check
+    recipe = session.get(
+        Recipe,
+        id,
+        options=crud.RECIPE_PUBLIC_LOADERS,
+        with_for_update={"of": Recipe},
+    )
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    if not current_user.is_superuser and recipe.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if if_match is not None and not etag_matches(
+        if_match, recipe_etag(recipe.id, recipe.updated_at)
+    ):
+        raise HTTPException(status_code=412, detail="Recipe was modified")
 
-    session.commit()
-    session.refresh(recipe)
-    return recipe
+    try:
+        recipe_in = apply_recipe_operations(recipe, operations)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    before = RecipePublic.model_validate(recipe)
+    crud.update_recipe(session=session, db_recipe=recipe, recipe_in=recipe_in)
+    after = RecipePublic.model_validate(
+        session.get(
+            Recipe, id, options=crud.RECIPE_PUBLIC_LOADERS, populate_existing=True
+        )
+    )
+    response.headers["ETag"] = recipe_etag(after.id, after.updated_at)
+    return RecipeChanges.model_validate(
+        {
+            "id": after.id,
+            "updated_at": after.updated_at,
+            **{
+                field: getattr(after, field)
+                for field in recipe_in.model_fields_set
+                if getattr(after, field) != getattr(before, field)
+            },
+        }
+    )
 
 
 @router.delete("/{id}", response_model=Message)
 def delete_recipe(
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshot,
     id: uuid.UUID,
 ) -> Message:
     """
@@ -189,107 +464,282 @@ def delete_recipe(
 # --------------------------------------------------------------------------- #
 #                              AI‑generated recipe                            #
 # --------------------------------------------------------------------------- #
-@router.post("/generate", response_model=RecipePublic)
-def generate_recipe(
+def _enqueue_generation_job(
+    current_user: UserSnapshot,
+    job_create: RecipeGenerationJobBase,
+    callback_url: str | None,
+) -> RecipeGenerationJob:
+    with Session(engine) as session:
+        # Serializes the admission of one user's concurrent requests
+        session.exec(
+            select(User.id).where(User.id == current_user.id).with_for_update()
+        ).one()
+        unfinished = crud.count_unfinished_generation_jobs(
+            session=session, owner_id=current_user.id
+        )
+        if unfinished >= settings.RECIPE_JOB_MAX_PER_USER:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many recipe generations in progress, wait for one to finish",
+            )
+        if (
+            crud.count_unfinished_generation_jobs(session=session)
+            >= settings.RECIPE_JOB_MAX_PENDING
+        ):
+            raise HTTPException(
+                status_code=503,
+                detail="Too many recipe generations queued, retry shortly",
+                headers={"Retry-After": "10"},
+            )
+        return crud.create_generation_job(
+            session=session,
+            job_create=job_create,
+            owner_id=current_user.id,
+            callback_url=callback_url,
+        )
+
+
+@router.post(
+    "/generate",
+    response_model=RecipePublic,
+    responses={
+        202: {
+            "model": RecipeGenerationJobPublic,
+            "description": "Queued as a background job",
+        }
+    },
+)
+async def generate_recipe(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshotWithoutDB,
     user_input: str = Body(..., embed=True),
-    language: str = Body("fr", embed=True),
-) -> RecipePublic:
+    language: str = Body("fr", embed=True, max_length=16),
+    background: bool = False,
+    callback_url: HttpUrl | None = Body(None, embed=True),
+) -> Any:
     """
     Generate a recipe via OpenAI, storing the result.
+
+    With `background=true`, answer 202 at once with a job to poll at
+    `GET /recipes/jobs/{id}` (also given as the Location header); if
+    `callback_url` is set, the finished job is also POSTed to it.
     """
-    return ai_service.generate_recipe(
-        session=session,
-        current_user=current_user,
+    if background:
+        if callback_url:
+            try:
+                await check_callback_url(str(callback_url))
+            except ValueError as exc:
+                raise HTTPException(status_code=400, detail=str(exc))
+        job = await run_in_threadpool(
+            _enqueue_generation_job,
+            current_user,
+            RecipeGenerationJobBase(user_input=user_input, language=language),
+            str(callback_url) if callback_url else None,
+        )
+        recipe_job_runner.wake()
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(RecipeGenerationJobPublic.model_validate(job)),
+            headers={"Location": f"{settings.API_V1_STR}/recipes/jobs/{job.id}"},
+        )
+    return await ai_service.generate_recipe(
+        owner_id=current_user.id,
         user_input=user_input,
         user_lang=language,
     )
 
 
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _serialize_recipe(recipe: Recipe) -> dict[str, Any]:
+    return RecipePublic.model_validate(recipe).model_dump(mode="json")
+
+
+@router.post(
+    "/generate/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def generate_recipe_stream(
+    *,
+    current_user: CurrentUserSnapshotWithoutDB,
+    user_input: str = Body(..., embed=True),
+    language: str = Body("fr", embed=True),
+) -> StreamingResponse:
+    """
+    Same as /generate, but streams the recipe as server-sent events while
+    OpenAI generates it: `title`, `description`, `preparation_time`,
+    `cook_time`, `serves`, one `ingredient` / `direction` event per item,
+    then `recipe` with the stored recipe (or `error`).
+    """
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event, data in ai_service.stream_recipe(
+                owner_id=current_user.id,
+                user_input=user_input,
+                user_lang=language,
+            ):
+                if event == "recipe":
+                    data = await run_in_threadpool(_serialize_recipe, data)
+                yield _sse(event, data)
+        except Exception:
+            logger.exception("Streamed recipe generation failed")
+            yield _sse("error", {"detail": "Recipe generation failed"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/generate/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def generate_recipe_batch(
+    *, current_user: CurrentUserSnapshotWithoutDB, batch: RecipeBatchGenerate
+) -> StreamingResponse:
+    """
+    Generate several recipes at once, from a list of `prompts` or from one
+    `user_input` repeated `count` times (each giving a different recipe).
+
+    Streams server-sent events: an `item` with `index` and the generated
+    `recipe` (or an `error` with `index` and `detail`) as each generation
+    completes, in any order. The generated recipes are then stored together,
+    and a final `done` lists them in prompt order, with null for failures.
+    """
+    user_inputs = batch.user_inputs()
+    if len(user_inputs) > settings.RECIPE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.RECIPE_BATCH_MAX_ITEMS} recipes per batch",
+        )
+
+    async def event_stream() -> AsyncIterator[str]:
+        generated: dict[int, RecipeCreate] = {}
+        async for index, result in ai_service.generate_recipes(
+            user_inputs=user_inputs,
+            user_lang=batch.language,
+            concurrency=settings.RECIPE_BATCH_CONCURRENCY,
+            distinct=batch.prompts is None,
+        ):
+            if isinstance(result, Exception):
+                logger.error("Batch recipe generation failed", exc_info=result)
+                yield _sse(
+                    "error", {"index": index, "detail": "Recipe generation failed"}
+                )
+                continue
+            generated[index] = result
+            yield _sse(
+                "item",
+                {
+                    "index": index,
+                    "recipe": result.model_dump(mode="json", exclude={"language"}),
+                },
+            )
+
+        indexes = sorted(generated)
+        try:
+            recipes = await ai_service.persist_recipes(
+                owner_id=current_user.id,
+                recipe_creates=[generated[index] for index in indexes],
+            )
+        except Exception:
+            logger.exception("Storing generated recipes failed")
+            yield _sse("error", {"index": None, "detail": "Recipe creation failed"})
+            return
+        stored: list[dict[str, Any] | None] = [None] * len(user_inputs)
+        serialized = await run_in_threadpool(
+            lambda: [_serialize_recipe(recipe) for recipe in recipes]
+        )
+        for index, recipe_data in zip(indexes, serialized, strict=True):
+            stored[index] = recipe_data
+        yield _sse("done", {"recipes": stored})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _get_guest_user_id() -> uuid.UUID | None:
+    with Session(engine) as session:
+        return session.exec(select(User.id).where(User.email == GUEST_EMAIL)).first()
+
+
 @router.post("/generate-public", response_model=RecipePublic)
 @limiter.limit("100/day")
-def generate_recipe_public(
+async def generate_recipe_public(
     *,
     request: Request,  # Required for rate limiter but unused in function body  # noqa: ARG001
-    session: SessionDep,
     user_input: str = Body(..., embed=True),
     language: str = Body("fr", embed=True),
-) -> RecipePublic:
+) -> Recipe:
     """
     Same as /generate but always under the guest account.
     """
-    guest = session.exec(
-        select(User).where(User.email == "guest@jammin-dev.com")
-    ).first()
-    return ai_service.generate_recipe(
-        session=session,
-        current_user=guest,
+    guest_id = await run_in_threadpool(_get_guest_user_id)
+    if not guest_id:
+        raise HTTPException(status_code=500, detail="Guest account is missing")
+    return await ai_service.generate_recipe(
+        owner_id=guest_id,
         user_input=user_input,
         user_lang=language,
     )
 
 
-@router.post(
-    "/{id}/improve",
-)
-def improve_recipe(
+def _read_recipe_for_improvement(current_user: UserSnapshot, id: uuid.UUID) -> Recipe:
+    # Short session of its own: nothing is held while OpenAI answers
+    with Session(engine) as session:
+        original_recipe = session.exec(
+            select(Recipe).where(Recipe.id == id).options(*crud.RECIPE_PUBLIC_LOADERS)
+        ).first()
+        if not original_recipe:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+
+        # Make sure the user has permission
+        if not current_user.is_superuser and original_recipe.user_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not enough permissions")
+        return original_recipe
+
+
+@router.post("/{id}/improve", response_model=RecipePublic)
+async def improve_recipe(
     *,
-    session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentUserSnapshotWithoutDB,
     id: uuid.UUID,
     user_input: str = Body(..., embed=True),
-):
-    """
-    Improve (modify) an existing recipe with user instructions and AI assistance.
-    1. Fetch the original recipe.
-    2. Build a prompt with the original recipe + user instructions.
-    3. Send prompt to OpenAI, parse the improved recipe JSON.
-    4. Update the recipe in the DB.
-    5. Return the updated recipe in the public schema.
+    mode: Literal["rewrite", "patch"] = "rewrite",
+) -> Any:
     """
-    # 1. Fetch the existing recipe
-    original_recipe = session.get(Recipe, id)
-    if not original_recipe:
-        raise HTTPException(status_code=404, detail="Recipe not found")
-
-    # Make sure the user has permission
-    if not current_user.is_superuser and original_recipe.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not enough permissions")
+    Improve an existing recipe with user instructions and AI assistance.
 
-    # 2. Build the improvement prompt
-    prompt = ai_service.build_improvement_prompt(user_input, original_recipe)
-
-    # 3. Prepare and send to OpenAI
-    payload = {
-        "model": "gpt-4o-mini-search-preview",
-        "messages": [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": prompt},
-        ],
-    }
-    headers = {
-        "Content-Type": "application/json",
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-    }
-    response = requests.post(OPENAI_URL, json=payload, headers=headers)
-    if response.status_code != 200:
-        raise HTTPException(status_code=500, detail="OpenAI API call failed")
-
-    data = response.json()
-    ai_response = data["choices"][0]["message"]["content"].strip()
-
-    # 4. Parse the returned JSON (the improved recipe)
-    cleaned_response = ai_response.replace("```json", "").replace("```", "")
+    The improved recipe is stored as a new version of the original (its
+    `parent_id`), which is left unchanged, and returned. With `mode=patch`
+    the model only describes the changes, which are applied to the
+    original: faster and cheaper for small improvements.
+    """
+    original_recipe = await run_in_threadpool(
+        _read_recipe_for_improvement, current_user, id
+    )
+    # OpenAI failures answer 502, or 503 while the circuit is open
     try:
-        improved_data = json.loads(cleaned_response)
-        improved_data["id"] = original_recipe.id
-        improved_data["is_favorite"] = original_recipe.is_favorite
-        improved_data["is_improved"] = True
-        return improved_data
-    except Exception:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to parse improved recipe JSON from OpenAI response.",
+        return await ai_service.improve_recipe(
+            original=original_recipe, user_input=user_input, mode=mode
         )
+    except ValidationError:
+        # Arguments from the model that do not make a valid recipe
+        logger.exception("OpenAI returned an invalid recipe")
+        raise HTTPException(status_code=502, detail="OpenAI returned an invalid recipe")
+    except ValueError as exc:
+        # Patch operations that do not fit the recipe
+        raise HTTPException(status_code=422, detail=str(exc))
+    except RuntimeError:
+        logger.exception("Recipe improvement failed")
+        raise HTTPException(status_code=500, detail="Recipe improvement failed")
@@ -1,17 +1,21 @@
 import uuid
-from typing import Any
+from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import func, select
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import col, func, select
 
 from app import crud
 from app.api.deps import (
     CurrentUser,
+    CurrentUserSnapshot,
     SessionDep,
     get_current_active_superuser,
 )
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.auth_cache import auth_cache
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models import User
 from app.schemas.schemas import Message
 from app.schemas.user_schemas import (
@@ -33,35 +37,64 @@ router = APIRouter(prefix="/users", tags=["users"])
     dependencies=[Depends(get_current_active_superuser)],
     response_model=UsersPublic,
 )
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+def read_users(
+    session: SessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    pagination: Literal["offset", "cursor"] = "offset",
+    cursor: str | None = None,
+    include_count: bool = True,
+) -> Any:
     """
     Retrieve users.
+
+    With `pagination=cursor` (implied when `cursor` is given) users are paged
+    by keyset over their email: pass the returned `next_cursor` to fetch the
+    following page. `include_count=false` skips counting the users.
     """
 
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
+    count = None
+    if include_count:
+        count_statement = select(func.count()).select_from(User)
+        count = session.exec(count_statement).one()
 
-    statement = select(User).offset(skip).limit(limit)
+    if pagination == "offset" and cursor is None:
+        statement = select(User).offset(skip).limit(limit)
+        users = session.exec(statement).all()
+        return UsersPublic(data=users, count=count)
+
+    statement = select(User).order_by(col(User.email)).limit(limit + 1)
+    if cursor:
+        values = decode_cursor(cursor, "email")
+        if len(values) != 1 or not isinstance(values[0], str):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        statement = statement.where(col(User.email) > values[0])
     users = session.exec(statement).all()
 
-    return UsersPublic(data=users, count=count)
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor("email", users[-1].email)
+    return UsersPublic(data=users, count=count, next_cursor=next_cursor)
 
 
 @router.post(
     "/", dependencies=[Depends(get_current_active_superuser)], response_model=UserPublic
 )
-def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
+async def create_user(*, session: SessionDep, user_in: UserCreate) -> Any:
     """
     Create new user.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await run_in_threadpool(
+        crud.get_user_by_email, session=session, email=user_in.email
+    )
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
+    user = await crud.create_user_async(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
@@ -92,32 +125,36 @@ def update_user_me(
     current_user.sqlmodel_update(user_data)
     session.add(current_user)
     session.commit()
+    auth_cache.invalidate_user(current_user.id)
     session.refresh(current_user)
     return current_user
 
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
+async def update_password_me(
     *, session: SessionDep, body: UpdatePassword, current_user: CurrentUser
 ) -> Any:
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not await verify_password_async(
+        body.current_password, current_user.hashed_password
+    ):
         raise HTTPException(status_code=400, detail="Incorrect password")
     if body.current_password == body.new_password:
         raise HTTPException(
             status_code=400, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
+    hashed_password = await get_password_hash_async(body.new_password)
     current_user.hashed_password = hashed_password
     session.add(current_user)
-    session.commit()
+    await run_in_threadpool(session.commit)
+    auth_cache.invalidate_user(current_user.id)
     return Message(message="Password updated successfully")
 
 
 @router.get("/me", response_model=UserPublic)
-def read_user_me(current_user: CurrentUser) -> Any:
+def read_user_me(current_user: CurrentUserSnapshot) -> Any:
     """
     Get current user.
     """
@@ -138,30 +175,32 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
 
 
 @router.post("/signup", response_model=UserPublic)
-def register_user(session: SessionDep, user_in: UserRegister) -> Any:
+async def register_user(session: SessionDep, user_in: UserRegister) -> Any:
     """
     Create new user without the need to be logged in.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await run_in_threadpool(
+        crud.get_user_by_email, session=session, email=user_in.email
+    )
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system",
         )
     user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
+    user = await crud.create_user_async(session=session, user_create=user_create)
     return user
 
 
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user_by_id(
-    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUser
+    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUserSnapshot
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = session.get(User, user_id)
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -205,7 +244,7 @@ def update_user(
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep, current_user: CurrentUserSnapshot, user_id: uuid.UUID
 ) -> Message:
     """
     Delete a user.
@@ -213,7 +252,7 @@ def delete_user(
     user = session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    if user == current_user:
+    if user.id == current_user.id:
         raise HTTPException(
             status_code=403, detail="Super users are not allowed to delete themselves"
         )
@@ -221,4 +260,5 @@ def delete_user(
     # session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    auth_cache.invalidate_user(user_id)
     return Message(message="User deleted successfully")
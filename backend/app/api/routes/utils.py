@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
+from app.core.metrics import metrics
 from app.schemas.schemas import Message
 from app.utils import generate_test_email, send_email
 
@@ -26,6 +27,17 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/metrics/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def read_metrics() -> dict[str, float]:
+    """
+    In-process counters and gauges of the worker that serves the request.
+    """
+    return metrics.snapshot()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
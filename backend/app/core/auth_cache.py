@@ -0,0 +1,92 @@
+import dataclasses
+import datetime
+import time
+import uuid
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.models import User
+
+_token_hits = metrics.counter("auth_token_cache_hits_total")
+_user_hits = metrics.counter("auth_user_cache_hits_total")
+_user_misses = metrics.counter("auth_user_cache_misses_total")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    """
+    The fields of a user needed to authorize a request and to answer
+    ``/users/me``, detached from any session.
+    """
+
+    id: uuid.UUID
+    email: str
+    full_name: str | None
+    is_active: bool
+    is_superuser: bool
+    deleted_at: datetime.datetime | None
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_superuser=user.is_superuser,
+            deleted_at=user.deleted_at,
+        )
+
+
+class AuthCache:
+    """
+    Per-process caches of verified access tokens and of user snapshots.
+
+    Entries live at most `ttl` seconds (a token never outlives its ``exp``
+    claim), which also bounds how long another worker may serve a snapshot
+    after a change it has not seen. Code that changes a user calls
+    ``invalidate_user`` once the change is committed.
+    """
+
+    def __init__(self, *, max_entries: int, ttl: float) -> None:
+        self.ttl = ttl
+        self._tokens: TTLCache[str, str] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._users: TTLCache[uuid.UUID, UserSnapshot] = TTLCache(
+            max_entries=max_entries, ttl=ttl
+        )
+
+    def get_token_subject(self, token: str) -> str | None:
+        subject = self._tokens.get(token)
+        if subject is not None:
+            _token_hits.inc()
+        return subject
+
+    def set_token_subject(self, token: str, subject: str, expires_at: float) -> None:
+        ttl = min(self.ttl, expires_at - time.time())
+        if ttl > 0:
+            self._tokens.set(token, subject, ttl)
+
+    def get_user(self, user_id: uuid.UUID) -> UserSnapshot | None:
+        snapshot = self._users.get(user_id)
+        if snapshot is None:
+            _user_misses.inc()
+        else:
+            _user_hits.inc()
+        return snapshot
+
+    def set_user(self, snapshot: UserSnapshot) -> None:
+        if self.ttl > 0:
+            self._users.set(snapshot.id, snapshot)
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        self._users.pop(user_id)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+        self._users.clear()
+
+
+auth_cache = AuthCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES, ttl=settings.AUTH_CACHE_TTL_SECONDS
+)
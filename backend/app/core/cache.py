@@ -0,0 +1,126 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Protocol, TypeVar
+
+from sqlalchemy import Engine
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, delete, select
+
+from app.models import CacheEntry
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe, size-bounded LRU mapping whose entries expire after a TTL.
+    """
+
+    def __init__(self, *, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(Protocol):
+    """
+    Byte-oriented key/value store used by the application caches.
+    """
+
+    def get(self, key: str) -> bytes | None: ...
+
+    def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU tier; entries are lost on restart and not shared
+    between workers.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._cache: TTLCache[str, bytes] = TTLCache(max_entries=max_entries, ttl=0)
+
+    def get(self, key: str) -> bytes | None:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._cache.set(key, value, ttl)
+
+
+class PostgresCacheBackend:
+    """
+    Shared tier backed by the ``cacheentry`` table, visible to every worker.
+    """
+
+    # Expired rows are purged once every this many writes
+    PURGE_EVERY = 100
+
+    def __init__(self, engine: Engine) -> None:
+        self._engine = engine
+        self._writes = 0
+
+    def get(self, key: str) -> bytes | None:
+        with Session(self._engine) as session:
+            entry = session.exec(
+                select(CacheEntry).where(
+                    CacheEntry.key == key,
+                    CacheEntry.expires_at > datetime.datetime.utcnow(),
+                )
+            ).first()
+            return entry.value if entry else None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        now = datetime.datetime.utcnow()
+        expires_at = now + datetime.timedelta(seconds=ttl)
+        statement = (
+            insert(CacheEntry)
+            .values(key=key, value=value, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[CacheEntry.key],
+                set_={"value": value, "expires_at": expires_at},
+            )
+        )
+        self._writes += 1
+        with Session(self._engine) as session:
+            session.exec(statement)  # type: ignore[call-overload]
+            if self._writes % self.PURGE_EVERY == 0:
+                session.exec(  # type: ignore[call-overload]
+                    delete(CacheEntry).where(col(CacheEntry.expires_at) <= now)
+                )
+            session.commit()
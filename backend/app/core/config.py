@@ -69,6 +69,18 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool of each worker process; a request waiting longer than
+    # the pool timeout for a connection fails with 503. Each worker opens at
+    # most POOL_SIZE + MAX_OVERFLOW connections, plus one held for advisory
+    # locks when RECIPE_COALESCE_BACKEND is "postgres"
+    POSTGRES_POOL_SIZE: int = 5
+    POSTGRES_MAX_OVERFLOW: int = 10
+    POSTGRES_POOL_TIMEOUT_SECONDS: float = 30.0
+    POSTGRES_POOL_RECYCLE_SECONDS: int = 1800
+    POSTGRES_POOL_PRE_PING: bool = True
+    # statement_timeout of every pooled connection; 0 disables it
+    POSTGRES_STATEMENT_TIMEOUT_MS: int = 30000
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -91,6 +103,25 @@ class Settings(BaseSettings):
     def emails_enabled(self) -> bool:
         return bool(self.SMTP_HOST and self.EMAILS_FROM_EMAIL)
 
+    # Verified access tokens and user snapshots are cached per worker for this
+    # long; 0 disables the cache
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing runs in this many processes (default: one per core, 0
+    # for the thread pool) and fails with 503 beyond this many pending hashes
+    PASSWORD_HASHING_WORKERS: int | None = None
+    PASSWORD_HASHING_MAX_PENDING: int = 64
+
+    # New hashes use the first scheme; hashes in the others, or made with other
+    # costs, still verify and are replaced on the next successful login
+    PASSWORD_HASH_SCHEMES: list[Literal["argon2", "bcrypt"]] = ["bcrypt"]
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # argon2id memory in KiB, passes over it and lanes
+    PASSWORD_ARGON2_MEMORY_COST: int = 19456
+    PASSWORD_ARGON2_TIME_COST: int = 2
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+
     EMAIL_TEST_USER: EmailStr = "test@example.com"
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
@@ -117,6 +148,80 @@ class Settings(BaseSettings):
         return self
 
     OPENAI_API_KEY: str
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    # Shared keep-alive connection pool used for every OpenAI call (per worker)
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_READ_TIMEOUT: float = 120.0
+    OPENAI_WRITE_TIMEOUT: float = 10.0
+    OPENAI_POOL_TIMEOUT: float = 10.0
+    # A call gives up after this many attempts, or once this many seconds have
+    # passed in total, retries included. 429 and 5xx answers and network errors
+    # are retried after a jittered exponential backoff, or after Retry-After
+    OPENAI_MAX_ATTEMPTS: int = 3
+    OPENAI_DEADLINE_SECONDS: float = 180.0
+    OPENAI_BACKOFF_INITIAL_SECONDS: float = 0.5
+    OPENAI_BACKOFF_MAX_SECONDS: float = 20.0
+    # After this many failed attempts in a row, calls fail at once with 503
+    # for this long, then a single call probes whether OpenAI has recovered
+    OPENAI_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    OPENAI_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Cache of generated recipes, keyed by normalized prompt, language and model
+    RECIPE_CACHE_BACKEND: Literal["none", "memory", "postgres"] = "memory"
+    RECIPE_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7
+    RECIPE_CACHE_MAX_ENTRIES: int = 1024
+
+    # Concurrent generations of the same prompt share one OpenAI call: within
+    # a worker ("memory"), or across workers through Postgres advisory locks,
+    # which hand the result over through the postgres cache backend
+    RECIPE_COALESCE_BACKEND: Literal["none", "memory", "postgres"] = "memory"
+    RECIPE_COALESCE_POLL_INTERVAL_SECONDS: float = 0.2
+
+    # POST /recipes/generate/batch: at most this many recipes per batch, of
+    # which this many are generated at a time
+    RECIPE_BATCH_MAX_ITEMS: int = 21
+    RECIPE_BATCH_CONCURRENCY: int = 5
+
+    @model_validator(mode="after")
+    def _check_coalesce_backend(self) -> Self:
+        if (
+            self.RECIPE_COALESCE_BACKEND == "postgres"
+            and self.RECIPE_CACHE_BACKEND != "postgres"
+        ):
+            raise ValueError(
+                'RECIPE_COALESCE_BACKEND="postgres" requires '
+                'RECIPE_CACHE_BACKEND="postgres"'
+            )
+        return self
+
+    # Serialized guest recipes (GET /recipes/{id}), keyed by id and
+    # updated_at: a per-worker LRU of this many responses, in front of an
+    # optional tier shared by every worker
+    RECIPE_RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RECIPE_RESPONSE_CACHE_SHARED_BACKEND: Literal["none", "postgres"] = "none"
+    RECIPE_RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 7
+
+    # Recipe reads are buffered per worker and written back in batches
+    RECIPE_ACCESS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    RECIPE_ACCESS_FLUSH_EVENTS: int = 1000
+    RECIPE_ACCESS_MAX_PENDING: int = 10000
+
+    # Background generation jobs (POST /recipes/generate?background=true). Each
+    # process runs this many job workers (0 leaves the jobs to `python -m
+    # app.worker`); a user may have this many unfinished jobs, and all users
+    # together this many
+    RECIPE_JOB_WORKERS: int = 4
+    RECIPE_JOB_MAX_PER_USER: int = 3
+    RECIPE_JOB_MAX_PENDING: int = 1000
+    RECIPE_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # A running job goes back to the queue if its worker has not finished it
+    # in this long, so it must exceed the longest OpenAI call
+    RECIPE_JOB_LEASE_SECONDS: int = 300
+    RECIPE_JOB_MAX_ATTEMPTS: int = 3
+    RECIPE_JOB_CALLBACK_TIMEOUT_SECONDS: float = 10.0
 
 
 settings = Settings()  # type: ignore
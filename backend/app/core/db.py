@@ -1,11 +1,58 @@
+from sqlalchemy import Engine, event
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, create_engine, select
 
 from app import crud
 from app.core.config import settings
+from app.core.metrics import metrics
 from app.models import User
 from app.schemas.user_schemas import UserCreate
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+def create_db_engine(
+    *,
+    pool_size: int = settings.POSTGRES_POOL_SIZE,
+    max_overflow: int = settings.POSTGRES_MAX_OVERFLOW,
+    pool_timeout: float = settings.POSTGRES_POOL_TIMEOUT_SECONDS,
+    pool_recycle: int = settings.POSTGRES_POOL_RECYCLE_SECONDS,
+    pool_pre_ping: bool = settings.POSTGRES_POOL_PRE_PING,
+    statement_timeout_ms: int = settings.POSTGRES_STATEMENT_TIMEOUT_MS,
+) -> Engine:
+    connect_args: dict[str, str] = {}
+    if statement_timeout_ms > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    return create_engine(
+        str(settings.SQLALCHEMY_DATABASE_URI),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        connect_args=connect_args,
+    )
+
+
+def _instrument_pool(engine: Engine) -> None:
+    pool = engine.pool
+    assert isinstance(pool, QueuePool)
+    checkouts = metrics.counter("db_pool_checkouts_total")
+    checkins = metrics.counter("db_pool_checkins_total")
+    connects = metrics.counter("db_pool_connects_total")
+    invalidations = metrics.counter("db_pool_invalidations_total")
+
+    event.listen(pool, "checkout", lambda *_args: checkouts.inc())
+    event.listen(pool, "checkin", lambda *_args: checkins.inc())
+    event.listen(pool, "connect", lambda *_args: connects.inc())
+    event.listen(pool, "invalidate", lambda *_args: invalidations.inc())
+    metrics.gauge("db_pool_size", pool.size)
+    metrics.gauge("db_pool_checked_out", pool.checkedout)
+    metrics.gauge("db_pool_checked_in", pool.checkedin)
+    # Connections opened beyond pool_size; negative while the pool is not full
+    metrics.gauge("db_pool_overflow", pool.overflow)
+
+
+engine = create_db_engine()
+_instrument_pool(engine)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -0,0 +1,91 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import ParamSpec, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_rejected = metrics.counter("password_hashing_rejected_total")
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when too many password hashes are already queued on this worker.
+    """
+
+
+class HashingExecutor:
+    """
+    Runs CPU-bound password hashing off the event loop.
+
+    With `workers` > 0 the work goes to a pool of that many processes, so
+    hashing neither holds the GIL of the serving process nor competes with
+    other requests for the thread pool; with 0 it runs in the thread pool.
+    At most `max_pending` calls may be running or queued at once; further
+    calls fail fast with PasswordHashingBusy instead of queueing for seconds.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "HashingExecutor":
+        workers = settings.PASSWORD_HASHING_WORKERS
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return cls(workers=workers, max_pending=settings.PASSWORD_HASHING_MAX_PENDING)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned rather than forked: the serving process runs threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        if self._pending >= self.max_pending:
+            _rejected.inc()
+            raise PasswordHashingBusy()
+        self._pending += 1
+        try:
+            if self.workers == 0:
+                return await run_in_threadpool(fn, *args, **kwargs)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._get_executor(), functools.partial(fn, *args, **kwargs)
+                )
+            except BrokenProcessPool:
+                # A worker died; start a fresh pool for the next calls
+                self.shutdown(wait=False)
+                raise
+        finally:
+            self._pending -= 1
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
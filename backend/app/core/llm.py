@@ -0,0 +1,310 @@
+import asyncio
+import datetime
+import email.utils
+import threading
+import time
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+_attempts = metrics.counter("openai_requests_total")
+_retries = metrics.counter("openai_retries_total")
+_failures = metrics.counter("openai_failures_total")
+_deadlines_exceeded = metrics.counter("openai_deadline_exceeded_total")
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_openai_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide OpenAI HTTP client.
+
+    A single keep-alive connection pool is shared by every request handled by
+    this worker, so concurrent generations reuse TLS connections instead of
+    opening a new one per call.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=settings.OPENAI_BASE_URL,
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
+            },
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                connect=settings.OPENAI_CONNECT_TIMEOUT,
+                read=settings.OPENAI_READ_TIMEOUT,
+                write=settings.OPENAI_WRITE_TIMEOUT,
+                pool=settings.OPENAI_POOL_TIMEOUT,
+            ),
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """
+    Raised instead of calling OpenAI while the circuit breaker is open.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"OpenAI is unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the upstream is degraded.
+
+    Closed, calls go through, and `failure_threshold` failed calls in a row
+    open the breaker. Open, calls fail at once with ``CircuitOpenError`` for
+    `reset_timeout` seconds. Half-open, a single call probes the upstream:
+    its success closes the breaker, its failure opens it again.
+    """
+
+    STATES = ("closed", "half_open", "open")
+
+    def __init__(
+        self, name: str, *, failure_threshold: int, reset_timeout: float
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._transitions = {
+            state: metrics.counter(f"{name}_circuit_{state}_total")
+            for state in self.STATES
+        }
+        self._rejected = metrics.counter(f"{name}_circuit_rejected_total")
+        metrics.gauge(f"{name}_circuit_state", lambda: self.STATES.index(self.state))
+
+    def before_call(self) -> None:
+        """
+        Raise ``CircuitOpenError`` unless a call may go through now; every call
+        let through must be followed by ``record``.
+        """
+        with self._lock:
+            if self.state == "open":
+                retry_after = self._opened_at + self.reset_timeout - time.monotonic()
+                if retry_after > 0:
+                    self._rejected.inc()
+                    raise CircuitOpenError(retry_after)
+                self._set_state("half_open")
+            if self.state == "half_open":
+                if self._probing:
+                    self._rejected.inc()
+                    raise CircuitOpenError(1)
+                self._probing = True
+
+    def record(self, success: bool | None) -> None:
+        """
+        Record the outcome of a call; None when it tells nothing about the
+        upstream, e.g. it was cancelled.
+        """
+        with self._lock:
+            self._probing = False
+            if success is None:
+                return
+            if success:
+                self._failures = 0
+                if self.state != "closed":
+                    self._set_state("closed")
+                return
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set_state("open")
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._transitions[state].inc()
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return _is_retryable_status(exc.response.status_code)
+    return isinstance(exc, httpx.TransportError)
+
+
+def _is_retryable_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    """
+    Seconds to wait according to the Retry-After header (seconds or an HTTP
+    date), or OpenAI's retry-after-ms.
+    """
+    if value := response.headers.get("retry-after-ms"):
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class OpenAITransport:
+    """
+    Sends requests to OpenAI within a deadline, retrying 429 and 5xx answers
+    and network errors, behind a circuit breaker.
+
+    Retries wait for a jittered exponential backoff, or for as long as the
+    Retry-After header asks; a retry that could not start before the deadline
+    is not attempted and the last error is raised. Exceeding the deadline
+    raises ``httpx.TimeoutException``.
+    """
+
+    def __init__(
+        self,
+        client: Callable[[], httpx.AsyncClient],
+        breaker: CircuitBreaker,
+        *,
+        max_attempts: int,
+        deadline: float,
+        backoff_initial: float,
+        backoff_max: float,
+    ) -> None:
+        self.client = client
+        self.breaker = breaker
+        self.max_attempts = max_attempts
+        self.deadline = deadline
+        self._backoff = wait_random_exponential(
+            multiplier=backoff_initial, max=backoff_max
+        )
+
+    @classmethod
+    def from_settings(cls) -> "OpenAITransport":
+        return cls(
+            get_openai_client,
+            CircuitBreaker(
+                "openai",
+                failure_threshold=settings.OPENAI_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.OPENAI_CIRCUIT_RESET_SECONDS,
+            ),
+            max_attempts=settings.OPENAI_MAX_ATTEMPTS,
+            deadline=settings.OPENAI_DEADLINE_SECONDS,
+            backoff_initial=settings.OPENAI_BACKOFF_INITIAL_SECONDS,
+            backoff_max=settings.OPENAI_BACKOFF_MAX_SECONDS,
+        )
+
+    async def post(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        response = await self._send(path, payload, stream=False)
+        data: dict[str, Any] = response.json()
+        return data
+
+    @asynccontextmanager
+    async def stream(
+        self, path: str, payload: dict[str, Any]
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        POST and yield the response before its body is read. Only getting the
+        response is retried and bound by the deadline, not reading the body.
+        """
+        response = await self._send(path, payload, stream=True)
+        try:
+            yield response
+        finally:
+            await response.aclose()
+
+    async def _send(
+        self, path: str, payload: dict[str, Any], *, stream: bool
+    ) -> httpx.Response:
+        started = time.monotonic()
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.max_attempts)
+            | stop_before_delay(self.deadline),
+            wait=self._wait,
+            retry=retry_if_exception(_is_retryable),
+            before_sleep=lambda _: _retries.inc(),
+            reraise=True,
+        )
+        async for attempt in retrying:
+            with attempt:
+                remaining = self.deadline - (time.monotonic() - started)
+                return await self._attempt(
+                    path, payload, stream=stream, timeout=remaining
+                )
+        raise AssertionError("unreachable")
+
+    def _wait(self, retry_state: RetryCallState) -> float:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = _retry_after(exc.response)
+            if retry_after is not None:
+                return retry_after
+        return float(self._backoff(retry_state))
+
+    async def _attempt(
+        self, path: str, payload: dict[str, Any], *, stream: bool, timeout: float
+    ) -> httpx.Response:
+        self.breaker.before_call()
+        _attempts.inc()
+        success: bool | None = None
+        try:
+            client = self.client()
+            request = client.build_request("POST", path, json=payload)
+            try:
+                response = await asyncio.wait_for(
+                    client.send(request, stream=stream), max(timeout, 0)
+                )
+            except asyncio.TimeoutError:
+                _deadlines_exceeded.inc()
+                raise httpx.TimeoutException(
+                    "OpenAI call deadline exceeded", request=request
+                )
+            success = not _is_retryable_status(response.status_code)
+            if not response.is_success:
+                if stream:
+                    await response.aread()
+                    await response.aclose()
+                response.raise_for_status()
+            return response
+        except httpx.TransportError:
+            success = False
+            raise
+        finally:
+            if success is False:
+                _failures.inc()
+            self.breaker.record(success)
+
+
+openai_transport = OpenAITransport.from_settings()
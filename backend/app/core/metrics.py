@@ -0,0 +1,53 @@
+import threading
+from collections.abc import Callable
+
+
+class Counter:
+    def __init__(self, name: str, description: str = "") -> None:
+        self.name = name
+        self.description = description
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class MetricsRegistry:
+    """
+    In-process metrics for this worker.
+
+    Counters are incremented by the code that owns them; gauges are read
+    from a callback when a snapshot is taken.
+    """
+
+    def __init__(self) -> None:
+        self._counters: dict[str, Counter] = {}
+        self._gauges: dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, description: str = "") -> Counter:
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name, description)
+            return self._counters[name]
+
+    def gauge(self, name: str, callback: Callable[[], float]) -> None:
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            values = {name: counter.value for name, counter in self._counters.items()}
+            gauges = dict(self._gauges)
+        for name, callback in gauges.items():
+            values[name] = float(callback())
+        return dict(sorted(values.items()))
+
+
+metrics = MetricsRegistry()
@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
@@ -5,8 +6,42 @@ import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import HashingExecutor
+from app.core.metrics import metrics
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def make_password_context(
+    schemes: Sequence[str],
+    *,
+    bcrypt_rounds: int,
+    argon2_memory_cost: int,
+    argon2_time_cost: int,
+    argon2_parallelism: int,
+) -> CryptContext:
+    """
+    Hashes with the first scheme and the given costs. Hashes in any other
+    scheme, or with other costs, verify but are reported by ``needs_update``.
+    """
+    return CryptContext(
+        schemes=list(schemes),
+        deprecated="auto",
+        bcrypt__rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__memory_cost=argon2_memory_cost,
+        argon2__time_cost=argon2_time_cost,
+        argon2__parallelism=argon2_parallelism,
+    )
+
+
+pwd_context = make_password_context(
+    settings.PASSWORD_HASH_SCHEMES,
+    bcrypt_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    argon2_memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST,
+    argon2_time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+    argon2_parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+)
 
 
 ALGORITHM = "HS256"
@@ -23,5 +58,35 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """
+    Verifies the password and, if its hash is outdated, returns a new one.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+# Hashes run here for requests served by the event loop
+password_hasher = HashingExecutor.from_settings()
+metrics.gauge("password_hashing_pending", lambda: password_hasher.pending)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    return await password_hasher.run(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
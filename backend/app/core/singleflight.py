@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Generic, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Connection, Engine, text
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls for the same key within this process: the
+    first caller starts ``fn``, and callers arriving while it runs wait for
+    the same result (or exception) instead of calling it again.
+
+    The call runs in a task of its own, so a caller that goes away, such as a
+    client disconnecting, does not cancel it for the others.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._calls: dict[str, asyncio.Task[T]] = {}
+        self._coalesced = metrics.counter(f"{name}_coalesced_total")
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        recheck: Callable[[], Awaitable[T | None]] | None = None,  # noqa: ARG002
+    ) -> T:
+        """
+        Return the result of ``fn``, shared with every concurrent call for
+        `key`. `recheck` looks the result up where another process would
+        have left it; only the cross-process variant needs it.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self._coalesced.inc()
+        else:
+            task = asyncio.ensure_future(self._run(fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    async def _run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        return await fn()
+
+    def _forget(self, key: str, task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Retrieved here in case every caller went away
+            task.exception()
+
+
+class PostgresSingleFlight(SingleFlight[T]):
+    """
+    Also coalesces across processes: the call for a key runs under a Postgres
+    advisory lock, so a process that finds the lock taken waits for it to be
+    released and then `recheck`s for the result the holder stored, calling
+    ``fn`` itself only if there is none.
+
+    Advisory locks belong to a session, so every lock of this flight is
+    taken and released on one connection of `engine`, kept open and shared
+    by the calls of this process; it is only busy for the few milliseconds of
+    each statement. Neither the holder, while ``fn`` runs, nor the waiters,
+    which poll the lock every `poll_interval` seconds, check out another
+    connection. Give it an engine of its own, so that this connection is not
+    taken from the pool of the requests.
+    """
+
+    def __init__(self, name: str, engine: Engine, *, poll_interval: float) -> None:
+        super().__init__(name)
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self._waits = metrics.counter(f"{name}_lock_waits_total")
+        self._conn: Connection | None = None
+        # Statements on the connection come from threadpool threads
+        self._conn_lock = threading.Lock()
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        recheck: Callable[[], Awaitable[T | None]] | None = None,
+    ) -> T:
+        return await super().do(key, lambda: self._locked(key, fn, recheck))
+
+    @staticmethod
+    def lock_id(key: str) -> int:
+        digest = hashlib.sha256(key.encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    def close(self) -> None:
+        """
+        Close the lock connection, which releases the locks still held.
+        """
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def _locked(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        recheck: Callable[[], Awaitable[T | None]] | None,
+    ) -> T:
+        lock_id = self.lock_id(key)
+        waited = False
+        # Calls for a key are coalesced within the process first, so the
+        # session never asks twice for a lock it holds
+        while not await self._try_lock(lock_id):
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+        if waited:
+            self._waits.inc()
+        try:
+            if waited and recheck is not None:
+                result = await recheck()
+                if result is not None:
+                    return result
+            return await fn()
+        finally:
+            await run_in_threadpool(self._execute, "pg_advisory_unlock", lock_id)
+
+    async def _try_lock(self, lock_id: int) -> bool:
+        attempt = asyncio.ensure_future(
+            run_in_threadpool(self._execute, "pg_try_advisory_lock", lock_id)
+        )
+        try:
+            return await asyncio.shield(attempt)
+        except asyncio.CancelledError:
+            # The lock may still be granted once we are gone: release it then
+            attempt.add_done_callback(lambda done: self._release(done, lock_id))
+            raise
+
+    def _release(self, attempt: "asyncio.Future[bool]", lock_id: int) -> None:
+        if attempt.cancelled() or attempt.exception() is not None:
+            return
+        if attempt.result():
+            asyncio.ensure_future(
+                run_in_threadpool(self._execute, "pg_advisory_unlock", lock_id)
+            )
+
+    def _execute(self, function: str, lock_id: int) -> bool:
+        with self._conn_lock:
+            if self._conn is None:
+                self._conn = self.engine.connect().execution_options(
+                    isolation_level="AUTOCOMMIT"
+                )
+            try:
+                result: bool = self._conn.execute(
+                    text(f"SELECT {function}(:id)"), {"id": lock_id}
+                ).scalar_one()
+            except Exception:
+                # The session, and the locks with it, may be gone: start over
+                # on a new connection next time
+                self._conn.invalidate()
+                self._conn.close()
+                self._conn = None
+                raise
+            return result
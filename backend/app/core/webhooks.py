@@ -0,0 +1,36 @@
+import asyncio
+import ipaddress
+import socket
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+
+
+async def check_callback_url(url: str) -> None:
+    """
+    Raise ValueError unless `url` can be POSTed to on behalf of a user: an
+    https URL whose host only resolves to public addresses, so that callbacks
+    cannot reach the loopback, private or link-local networks of the server.
+
+    The host is resolved again on each check, so call it both when accepting
+    the URL and right before delivering to it. The local environment accepts
+    any http(s) URL, for callbacks to a development server.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    if settings.ENVIRONMENT == "local":
+        return
+    if parts.scheme != "https":
+        raise ValueError("callback_url must use https")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or 443, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError):
+        raise ValueError("callback_url host does not resolve")
+    for *_, sockaddr in infos:
+        # IPv6 addresses can carry a "%<interface>" scope
+        address = ipaddress.ip_address(str(sockaddr[0]).split("%")[0])
+        if not address.is_global:
+            raise ValueError("callback_url must resolve to public addresses")
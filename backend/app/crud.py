@@ -1,18 +1,56 @@
 import datetime
+import uuid
+from collections.abc import Sequence
 from typing import Any
 
-from sqlmodel import Session, select
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import (
+    Double,
+    String,
+    Uuid,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    text,
+    tuple_,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, col, select
 
-from app.core.security import get_password_hash, verify_password
-from app.models import User
+from app.core.auth_cache import auth_cache
+from app.core.security import (
+    get_password_hash,
+    get_password_hash_async,
+    verify_and_update_password,
+    verify_and_update_password_async,
+)
+from app.models import Direction, Ingredient, Recipe, RecipeGenerationJob, User
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipeGenerationJobBase,
+    RecipeUpdate,
+)
 from app.schemas.user_schemas import UserCreate, UserUpdate
 
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+def create_user(
+    *, session: Session, user_create: UserCreate, hashed_password: str | None = None
+) -> User:
     db_obj = User.model_validate(
         user_create,
         update={
-            "hashed_password": get_password_hash(user_create.password),
+            "hashed_password": hashed_password
+            or get_password_hash(user_create.password),
             "is_active": True,
         },
     )
@@ -22,6 +60,20 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     return db_obj
 
 
+async def create_user_async(*, session: Session, user_create: UserCreate) -> User:
+    """
+    Like create_user, for async routes: the password is hashed by the hashing
+    executor and the database work runs in the thread pool.
+    """
+    hashed_password = await get_password_hash_async(user_create.password)
+    return await run_in_threadpool(
+        create_user,
+        session=session,
+        user_create=user_create,
+        hashed_password=hashed_password,
+    )
+
+
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
@@ -32,6 +84,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     db_user.sqlmodel_update(user_data, update=extra_data)
     session.add(db_user)
     session.commit()
+    auth_cache.invalidate_user(db_user.id)
     session.refresh(db_user)
     return db_user
 
@@ -42,12 +95,53 @@ def get_user_by_email(*, session: Session, email: str) -> User | None:
     return session_user
 
 
+def _upgrade_password_hash(
+    *, session: Session, db_user: User, hashed_password: str
+) -> None:
+    # The stored hash used an outdated scheme or cost; now that the password
+    # is known, replace it with one made with the current settings
+    db_user.hashed_password = hashed_password
+    session.add(db_user)
+    session.commit()
+    session.refresh(db_user)
+
+
 def authenticate(*, session: Session, email: str, password: str) -> User | None:
     db_user = get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    verified, new_hash = verify_and_update_password(password, db_user.hashed_password)
+    if not verified:
         return None
+    if new_hash:
+        _upgrade_password_hash(
+            session=session, db_user=db_user, hashed_password=new_hash
+        )
+    return db_user
+
+
+async def authenticate_async(
+    *, session: Session, email: str, password: str
+) -> User | None:
+    """
+    Like authenticate, for async routes: the password is verified by the
+    hashing executor and the database work runs in the thread pool.
+    """
+    db_user = await run_in_threadpool(get_user_by_email, session=session, email=email)
+    if not db_user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(
+        password, db_user.hashed_password
+    )
+    if not verified:
+        return None
+    if new_hash:
+        await run_in_threadpool(
+            _upgrade_password_hash,
+            session=session,
+            db_user=db_user,
+            hashed_password=new_hash,
+        )
     return db_user
 
 
@@ -55,10 +149,377 @@ def delete_user(*, session: Session, db_user: User) -> User:
     db_user.deleted_at = datetime.datetime.now()
     session.add(db_user)
     session.commit()
+    auth_cache.invalidate_user(db_user.id)
     session.refresh(db_user)
     return db_user
 
 
+# Loader options for everything RecipePublic serializes: one SELECT for the
+# recipes joined with their owner, plus one per child table for the whole page
+RECIPE_PUBLIC_LOADERS = (
+    selectinload(Recipe.ingredients),  # type: ignore[arg-type]
+    selectinload(Recipe.directions),  # type: ignore[arg-type]
+    joinedload(Recipe.user),  # type: ignore[arg-type]
+)
+# Only the owner: load_recipe_lines fetches the rest once it is needed
+RECIPE_OWNER_LOADER = joinedload(Recipe.user)  # type: ignore[arg-type]
+
+
+def load_recipe_lines(*, session: Session, recipes: Sequence[Recipe]) -> None:
+    """
+    Populate the ingredients and directions of `recipes`, loaded with
+    RECIPE_OWNER_LOADER, with one SELECT per child table as
+    RECIPE_PUBLIC_LOADERS would have done.
+    """
+    if not recipes:
+        return
+    ids = [recipe.id for recipe in recipes]
+    children: list[tuple[str, type[Ingredient] | type[Direction]]] = [
+        ("ingredients", Ingredient),
+        ("directions", Direction),
+    ]
+    for attribute, model in children:
+        lines: dict[uuid.UUID, list[Any]] = {recipe_id: [] for recipe_id in ids}
+        for recipe_id, line in session.exec(
+            select(model.recipe_id, model).where(col(model.recipe_id).in_(ids))
+        ):
+            lines[recipe_id].append(line)
+        for recipe in recipes:
+            set_committed_value(recipe, attribute, lines[recipe.id])  # type: ignore[no-untyped-call]
+
+
+def create_recipe(
+    *,
+    session: Session,
+    recipe_create: RecipeCreate,
+    owner: User,
+    search_config: str = "simple",
+    parent: Recipe | None = None,
+) -> Recipe:
+    """
+    Insert a recipe, its ingredients and its directions in a single transaction.
+
+    Ids are generated client-side, so the children go out as one multi-row
+    INSERT per table right after the recipe, with no refresh in between.
+    The returned instance is not attached to the session but has its
+    relationships populated, so serializing it issues no further queries.
+    `search_config` is the text search configuration the recipe is indexed with.
+    With a `parent`, the recipe is stored as its next version.
+    """
+    return create_recipes(
+        session=session,
+        recipe_creates=[recipe_create],
+        owner=owner,
+        search_config=search_config,
+        parent=parent,
+    )[0]
+
+
+def create_recipes(
+    *,
+    session: Session,
+    recipe_creates: list[RecipeCreate],
+    owner: User,
+    search_config: str = "simple",
+    parent: Recipe | None = None,
+) -> list[Recipe]:
+    """
+    Like ``create_recipe`` for several recipes at once: still one transaction
+    and one multi-row INSERT per table, whatever the number of recipes.
+    """
+    update: dict[str, Any] = {"user_id": owner.id, "search_config": search_config}
+    if parent is not None:
+        update.update(parent_id=parent.id, version=parent.version + 1)
+    recipes: list[Recipe] = []
+    ingredients: list[Ingredient] = []
+    directions: list[Direction] = []
+    for recipe_create in recipe_creates:
+        recipe_data = recipe_create.model_dump(exclude={"ingredients", "directions"})
+        recipe = Recipe.model_validate(recipe_data, update=update)
+        recipe_ingredients = [
+            Ingredient.model_validate(ing, update={"recipe_id": recipe.id})
+            for ing in recipe_create.ingredients
+        ]
+        recipe_directions = [
+            Direction.model_validate(direc, update={"recipe_id": recipe.id})
+            for direc in recipe_create.directions
+        ]
+        set_committed_value(recipe, "ingredients", recipe_ingredients)  # type: ignore[no-untyped-call]
+        set_committed_value(recipe, "directions", recipe_directions)  # type: ignore[no-untyped-call]
+        set_committed_value(recipe, "user", owner)  # type: ignore[no-untyped-call]
+        recipes.append(recipe)
+        ingredients.extend(recipe_ingredients)
+        directions.extend(recipe_directions)
+    if not recipes:
+        return recipes
+
+    try:
+        session.exec(  # type: ignore[call-overload]
+            insert(Recipe).values(
+                [recipe.model_dump(exclude={"search_vector"}) for recipe in recipes]
+            )
+        )
+        if ingredients:
+            session.exec(  # type: ignore[call-overload]
+                insert(Ingredient).values([ing.model_dump() for ing in ingredients])
+            )
+        if directions:
+            session.exec(  # type: ignore[call-overload]
+                insert(Direction).values([direc.model_dump() for direc in directions])
+            )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return recipes
+
+
+def update_recipe(
+    *, session: Session, db_recipe: Recipe, recipe_in: RecipeUpdate
+) -> Recipe:
+    """
+    Apply `recipe_in` to `db_recipe` in a single transaction.
+
+    Given ingredients and directions replace the current ones, but are
+    matched to the stored lines by index: only lines whose content changed
+    are updated, in place, and the others are inserted or deleted, with at
+    most one statement of each kind per table. Saving an unchanged recipe
+    therefore writes nothing, and lines keep their ids; otherwise updated_at
+    is set to the time of the update.
+    """
+    data = recipe_in.model_dump(
+        exclude_unset=True, exclude={"ingredients", "directions"}
+    )
+    changes = {
+        field: value
+        for field, value in data.items()
+        if getattr(db_recipe, field) != value
+    }
+    try:
+        lines_changed = False
+        if recipe_in.ingredients is not None:
+            lines_changed |= _sync_recipe_lines(
+                session, Ingredient, db_recipe.id, recipe_in.ingredients
+            )
+        if recipe_in.directions is not None:
+            lines_changed |= _sync_recipe_lines(
+                session, Direction, db_recipe.id, recipe_in.directions
+            )
+        if changes or lines_changed:
+            changes["updated_at"] = datetime.datetime.utcnow()
+            db_recipe.sqlmodel_update(changes)
+            session.add(db_recipe)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return db_recipe
+
+
+def _sync_recipe_lines(
+    session: Session,
+    model: type[Ingredient] | type[Direction],
+    recipe_id: uuid.UUID,
+    lines: list[IngredientCreate] | list[DirectionCreate],
+) -> bool:
+    stored: dict[int, list[tuple[uuid.UUID, str | None]]] = {}
+    for line_id, index, content in session.exec(
+        select(model.id, model.index, model.content)
+        .where(model.recipe_id == recipe_id)
+        .order_by(col(model.index), col(model.id))
+    ):
+        stored.setdefault(index, []).append((line_id, content))
+
+    changed: list[tuple[uuid.UUID, str | None]] = []
+    added: list[dict[str, Any]] = []
+    for line in lines:
+        # Lines sharing an index are matched in order; extra ones are new
+        matches = stored.get(line.index)
+        if not matches:
+            added.append(
+                model.model_validate(line, update={"recipe_id": recipe_id}).model_dump()
+            )
+            continue
+        line_id, content = matches.pop(0)
+        if content != line.content:
+            changed.append((line_id, line.content))
+    removed = [line_id for matches in stored.values() for line_id, _ in matches]
+
+    # One statement each, as the search vector is refreshed once per statement.
+    # Lines loaded in the session are left as they are: the commit expires them
+    if changed:
+        changes = values(
+            column("id", Uuid), column("content", String), name="changes"
+        ).data(changed)
+        session.exec(  # type: ignore[call-overload]
+            update(model)
+            .where(col(model.id) == changes.c.id)
+            .values(content=changes.c.content)
+            .execution_options(synchronize_session=False)
+        )
+    if added:
+        session.exec(insert(model).values(added))  # type: ignore[call-overload]
+    if removed:
+        session.exec(  # type: ignore[call-overload]
+            delete(model)
+            .where(col(model.id).in_(removed))
+            .execution_options(synchronize_session=False)
+        )
+    return bool(changed or added or removed)
+
+
+def search_recipes(
+    *,
+    session: Session,
+    query: str,
+    search_config: str,
+    owner_id: uuid.UUID | None,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+    fuzzy: bool = False,
+) -> list[tuple[Recipe, float]]:
+    """
+    Return up to `limit` recipes matching `query` with their rank, best first,
+    restricted to `owner_id` when given. `after` is the (rank, id) of the last
+    recipe of the previous page.
+
+    Full-text matches use the GIN-indexed search_vector; with `fuzzy` recipes
+    are matched on title trigram similarity instead, which tolerates typos.
+    """
+    if fuzzy:
+        rank = cast(func.word_similarity(query, Recipe.title), Double)
+        condition = literal(query).op("<%")(Recipe.title)
+    else:
+        tsquery = func.websearch_to_tsquery(cast(search_config, REGCONFIG), query)
+        rank = cast(func.ts_rank_cd(Recipe.search_vector, tsquery), Double)
+        condition = col(Recipe.search_vector).op("@@")(tsquery)
+
+    statement = select(Recipe, rank).where(condition)
+    if owner_id is not None:
+        statement = statement.where(Recipe.user_id == owner_id)
+    if after is not None:
+        statement = statement.where(
+            tuple_(rank, col(Recipe.id)) < tuple_(literal(after[0]), literal(after[1]))
+        )
+    statement = (
+        statement.options(*RECIPE_PUBLIC_LOADERS)
+        .order_by(rank.desc(), col(Recipe.id).desc())
+        .limit(limit)
+    )
+    return [(recipe, score) for recipe, score in session.exec(statement).all()]
+
+
+def has_trigram_support(*, session: Session) -> bool:
+    """
+    Whether the pg_trgm extension, needed for fuzzy search, is installed.
+    """
+    installed = session.exec(  # type: ignore[call-overload]
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).first()
+    return installed is not None
+
+
+def create_generation_job(
+    *,
+    session: Session,
+    job_create: RecipeGenerationJobBase,
+    owner_id: uuid.UUID,
+    callback_url: str | None = None,
+) -> RecipeGenerationJob:
+    job = RecipeGenerationJob.model_validate(
+        job_create, update={"user_id": owner_id, "callback_url": callback_url}
+    )
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
+def count_unfinished_generation_jobs(
+    *, session: Session, owner_id: uuid.UUID | None = None
+) -> int:
+    statement = (
+        select(func.count())
+        .select_from(RecipeGenerationJob)
+        .where(col(RecipeGenerationJob.status).in_(("queued", "running")))
+    )
+    if owner_id is not None:
+        statement = statement.where(RecipeGenerationJob.user_id == owner_id)
+    return session.exec(statement).one()
+
+
+def claim_generation_job(
+    *, session: Session, lease_seconds: float, max_attempts: int
+) -> RecipeGenerationJob | None:
+    """
+    Lease the oldest queued job, or the oldest running one whose lease has
+    expired (its worker died), to the caller. A queued job's `locked_until`
+    is the time before which it must not be retried.
+
+    Rows locked by other workers are skipped rather than waited for, so any
+    number of workers in any number of processes can claim concurrently.
+    A job that already had `max_attempts` attempts is failed instead.
+    """
+    while True:
+        now = datetime.datetime.utcnow()
+        job = session.exec(
+            select(RecipeGenerationJob)
+            .where(
+                col(RecipeGenerationJob.status).in_(("queued", "running")),
+                or_(
+                    col(RecipeGenerationJob.locked_until).is_(None),
+                    col(RecipeGenerationJob.locked_until) < now,
+                ),
+            )
+            .order_by(col(RecipeGenerationJob.created_at))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if job is None:
+            session.rollback()
+            return None
+        if job.attempts >= max_attempts:
+            job.status = "failed"
+            job.error = f"Gave up after {job.attempts} attempts"
+            job.finished_at = now
+            job.locked_until = None
+            session.add(job)
+            session.commit()
+            continue
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = now
+        job.locked_until = now + datetime.timedelta(seconds=lease_seconds)
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+        return job
+
+
+def finish_generation_job(
+    *,
+    session: Session,
+    job: RecipeGenerationJob,
+    status: str,
+    recipe_id: uuid.UUID | None = None,
+    error: str | None = None,
+    retry_at: datetime.datetime | None = None,
+) -> RecipeGenerationJob:
+    """
+    Record the outcome of a claimed job; "queued" hands it back to be
+    claimed again, not before `retry_at` if given.
+    """
+    job.status = status
+    job.recipe_id = recipe_id
+    job.error = error[:500] if error else None
+    job.locked_until = retry_at
+    job.finished_at = None if status == "queued" else datetime.datetime.utcnow()
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    return job
+
+
 # def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
 #     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
 #     session.add(db_item)
@@ -1,13 +1,32 @@
+import logging
+import math
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+import httpx
 import sentry_sdk
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.routing import APIRoute
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
+from app.api.responses import DefaultJSONResponse
 from app.core.config import settings
+from app.core.hashing import PasswordHashingBusy
+from app.core.llm import CircuitOpenError, close_openai_client
+from app.core.metrics import metrics
 from app.core.rate_limit import limiter
+from app.core.security import password_hasher
+from app.services.recipe_access import recipe_access_tracker
+from app.services.recipe_jobs import recipe_job_runner
+
+logger = logging.getLogger(__name__)
+
+_pool_timeouts = metrics.counter("db_pool_timeouts_total")
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -17,10 +36,27 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    recipe_access_tracker.start()
+    recipe_job_runner.start()
+    yield
+    # Jobs still running go back to the queue for another worker
+    await recipe_job_runner.stop()
+    # Write back the recipe reads still buffered in this worker
+    await recipe_access_tracker.stop()
+    # Release the pooled OpenAI connections of this worker
+    await close_openai_client()
+    password_hasher.shutdown()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
+    default_response_class=DefaultJSONResponse,
 )
 
 # Attach the limiter to your app's state
@@ -29,6 +65,50 @@ app.state.limiter = limiter
 # Register the exception handler for rate limit errors
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+
+@app.exception_handler(PasswordHashingBusy)
+async def password_hashing_busy_handler(
+    _request: Request, _exc: PasswordHashingBusy
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent password checks, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(
+    _request: Request, _exc: PoolTimeoutError
+) -> JSONResponse:
+    # Every pooled connection stayed checked out for the whole pool timeout
+    _pool_timeouts.inc()
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "The database is busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(CircuitOpenError)
+async def openai_circuit_open_handler(
+    _request: Request, exc: CircuitOpenError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Recipe generation is unavailable, retry shortly"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+@app.exception_handler(httpx.HTTPError)
+async def openai_error_handler(_request: Request, exc: httpx.HTTPError) -> JSONResponse:
+    # OpenAI is the only upstream called while handling requests, and it
+    # failed even after retries
+    logger.warning("OpenAI API call failed: %r", exc)
+    return JSONResponse(status_code=502, content={"detail": "OpenAI API call failed"})
+
+
 # Set all CORS enabled origins
 if settings.all_cors_origins:
     app.add_middleware(
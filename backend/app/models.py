@@ -1,9 +1,16 @@
 import datetime
 import uuid
 
+from sqlalchemy import Column, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlmodel import Field, Relationship, SQLModel  # noqa: F401
 
-from app.schemas.recipe_schemas import DirectionBase, IngredientBase, RecipeBase
+from app.schemas.recipe_schemas import (
+    DirectionBase,
+    IngredientBase,
+    RecipeBase,
+    RecipeGenerationJobBase,
+)
 from app.schemas.user_schemas import UserBase
 
 
@@ -22,7 +29,7 @@ class Ingredient(IngredientBase, table=True):
     content: str | None = None
 
     recipe_id: uuid.UUID = Field(
-        foreign_key="recipe.id", nullable=False, ondelete="CASCADE"
+        foreign_key="recipe.id", nullable=False, ondelete="CASCADE", index=True
     )
     recipe: "Recipe" = Relationship(back_populates="ingredients")
 
@@ -33,12 +40,29 @@ class Direction(DirectionBase, table=True):
     content: str | None = None
 
     recipe_id: uuid.UUID = Field(
-        foreign_key="recipe.id", nullable=False, ondelete="CASCADE"
+        foreign_key="recipe.id", nullable=False, ondelete="CASCADE", index=True
     )
     recipe: "Recipe" = Relationship(back_populates="directions")
 
 
 class Recipe(RecipeBase, table=True):
+    # Keyset pagination orders by (created_at | last_accessed_at, id), per
+    # owner for regular users and across all recipes for superusers. The
+    # user_id prefix also serves plain ownership filters and counts.
+    __table_args__ = (
+        Index("ix_recipe_user_id_is_favorite", "user_id", "is_favorite"),
+        Index("ix_recipe_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_recipe_user_id_last_accessed_at_id",
+            "user_id",
+            "last_accessed_at",
+            "id",
+        ),
+        Index("ix_recipe_created_at_id", "created_at", "id"),
+        Index("ix_recipe_last_accessed_at_id", "last_accessed_at", "id"),
+        Index("ix_recipe_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
@@ -47,6 +71,28 @@ class Recipe(RecipeBase, table=True):
     )
     number_of_accesses: int = Field(default=0)
     deleted_at: datetime.datetime | None = Field(default=None, nullable=True)
+    # Text search configuration (e.g. "french") the recipe is indexed with.
+    # search_vector is maintained by database triggers from the title, the
+    # description and the ingredients.
+    search_config: str = Field(
+        default="simple", max_length=32, sa_column_kwargs={"server_default": "simple"}
+    )
+    search_vector: str | None = Field(
+        default=None, sa_column=Column(TSVECTOR, nullable=True)
+    )
+    # Language code the recipe is written in (e.g. "fr"), when known
+    language: str | None = Field(default=None, max_length=16)
+
+    # Improvements are stored as new versions: parent_id is the recipe that
+    # was improved, and version counts from 1 for an original recipe
+    parent_id: uuid.UUID | None = Field(
+        default=None,
+        foreign_key="recipe.id",
+        nullable=True,
+        ondelete="SET NULL",
+        index=True,
+    )
+    version: int = Field(default=1, sa_column_kwargs={"server_default": "1"})
 
     user_id: uuid.UUID = Field(
         foreign_key="user.id", nullable=False, ondelete="CASCADE"
@@ -59,3 +105,36 @@ class Recipe(RecipeBase, table=True):
     directions: list[Direction] = Relationship(
         back_populates="recipe", cascade_delete=True
     )
+
+
+class RecipeGenerationJob(RecipeGenerationJobBase, table=True):
+    # Workers claim the oldest queued job (or the oldest running one whose
+    # lease expired); admission counts the unfinished jobs of a user
+    __table_args__ = (
+        Index("ix_recipegenerationjob_status_created_at", "status", "created_at"),
+        Index("ix_recipegenerationjob_user_id_status", "user_id", "status"),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    status: str = Field(default="queued", max_length=16)
+    attempts: int = Field(default=0)
+    error: str | None = Field(default=None, max_length=500)
+    callback_url: str | None = Field(default=None, max_length=2048)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    # Until when the worker running the job owns it
+    locked_until: datetime.datetime | None = None
+
+    user_id: uuid.UUID = Field(
+        foreign_key="user.id", nullable=False, ondelete="CASCADE"
+    )
+    recipe_id: uuid.UUID | None = Field(
+        default=None, foreign_key="recipe.id", nullable=True, ondelete="SET NULL"
+    )
+
+
+class CacheEntry(SQLModel, table=True):
+    key: str = Field(primary_key=True, max_length=255)
+    value: bytes
+    expires_at: datetime.datetime = Field(index=True)
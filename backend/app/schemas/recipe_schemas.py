@@ -1,7 +1,10 @@
 import datetime
 import uuid
+from typing import Literal
 
+from pydantic import model_validator
 from sqlmodel import Field, SQLModel
+from typing_extensions import Self
 
 from app.schemas.user_schemas import UserPublic
 
@@ -52,6 +55,9 @@ class RecipeBase(SQLModel):
 class RecipeCreate(RecipeBase):
     ingredients: list[IngredientCreate] = []
     directions: list[DirectionCreate] = []
+    # Language the recipe is written in, used to index it for search and to
+    # improve it in the same language
+    language: str | None = Field(default=None, max_length=16)
 
 
 # Properties to receive on item update
@@ -66,6 +72,16 @@ class RecipeUpdate(SQLModel):
     directions: list[DirectionCreate] | None = None
 
 
+# One operation of PATCH /recipes/{id}, in the style of JSON Patch (RFC 6902).
+# "/title" and the other scalar fields can be replaced; "/ingredients/2" is the
+# third ingredient, and "/ingredients/-" the end of the list to add to
+class RecipePatchOperation(SQLModel):
+    op: Literal["replace", "add", "remove", "move"]
+    path: str
+    value: str | int | bool | None = None
+    from_: str | None = Field(default=None, schema_extra={"validation_alias": "from"})
+
+
 # Properties to return via API, id is always required
 class RecipePublic(RecipeBase):
     id: uuid.UUID
@@ -77,8 +93,64 @@ class RecipePublic(RecipeBase):
     number_of_accesses: int
     user: UserPublic | None = None
     deleted_at: datetime.datetime | None = None
+    parent_id: uuid.UUID | None = None
+    version: int = 1
+
+
+# Answer to PATCH /recipes/{id}: only the fields that changed are set
+class RecipeChanges(SQLModel):
+    id: uuid.UUID
+    updated_at: datetime.datetime
+    title: str | None = None
+    description: str | None = None
+    preparation_time: int | None = None
+    cook_time: int | None = None
+    serves: int | None = None
+    is_favorite: bool | None = None
+    ingredients: list[IngredientPublic] | None = None
+    directions: list[DirectionPublic] | None = None
 
 
 class RecipesPublic(SQLModel):
     data: list[RecipePublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
+
+
+# Background generation jobs: queued -> running -> succeeded | failed
+class RecipeGenerationJobBase(SQLModel):
+    user_input: str
+    language: str = Field(default="fr", max_length=16)
+
+
+class RecipeGenerationJobPublic(RecipeGenerationJobBase):
+    id: uuid.UUID
+    status: str
+    attempts: int
+    error: str | None = None
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None = None
+    finished_at: datetime.datetime | None = None
+    recipe: RecipePublic | None = None
+
+
+# Several recipes at once: a list of prompts, or one prompt `count` times
+class RecipeBatchGenerate(SQLModel):
+    prompts: list[str] | None = None
+    user_input: str | None = None
+    count: int | None = Field(default=None, ge=1)
+    language: str = "fr"
+
+    @model_validator(mode="after")
+    def _check_prompts_or_count(self) -> Self:
+        if (self.prompts is None) == (self.user_input is None):
+            raise ValueError("Give either prompts or user_input with a count")
+        if self.user_input is not None and self.count is None:
+            raise ValueError("count is required with user_input")
+        return self
+
+    def user_inputs(self) -> list[str]:
+        if self.prompts is not None:
+            return self.prompts
+        assert self.user_input is not None and self.count is not None
+        return [self.user_input] * self.count
@@ -46,4 +46,5 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    count: int | None = None
+    next_cursor: str | None = None
@@ -0,0 +1,170 @@
+import asyncio
+import datetime
+import logging
+import threading
+import uuid
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DateTime, Engine, Integer, Uuid, column, func, update, values
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import metrics
+from app.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+_events = metrics.counter("recipe_access_events_total")
+_dropped = metrics.counter("recipe_access_dropped_total")
+_flushes = metrics.counter("recipe_access_flushes_total")
+_flushed_rows = metrics.counter("recipe_access_flushed_rows_total")
+
+
+class RecipeAccessTracker:
+    """
+    Buffers recipe reads in memory and writes them back in batches.
+
+    Reads are coalesced per recipe (hit count and latest timestamp), so the
+    buffer holds at most `max_pending` recipes however busy they are; reads
+    of further recipes are dropped until the next flush. A background task
+    applies the buffer as one bulk UPDATE every `flush_interval` seconds, or
+    sooner once `flush_events` reads have been recorded, and once more on
+    shutdown.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        flush_interval: float,
+        flush_events: int,
+        max_pending: int,
+    ) -> None:
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self.max_pending = max_pending
+        self._pending: dict[uuid.UUID, tuple[int, datetime.datetime]] = {}
+        self._events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls) -> "RecipeAccessTracker":
+        return cls(
+            engine,
+            flush_interval=settings.RECIPE_ACCESS_FLUSH_INTERVAL_SECONDS,
+            flush_events=settings.RECIPE_ACCESS_FLUSH_EVENTS,
+            max_pending=settings.RECIPE_ACCESS_MAX_PENDING,
+        )
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(
+        self, recipe_id: uuid.UUID, accessed_at: datetime.datetime | None = None
+    ) -> None:
+        """
+        Count one read of a recipe. Safe to call from any thread.
+        """
+        accessed_at = accessed_at or datetime.datetime.utcnow()
+        with self._lock:
+            entry = self._pending.get(recipe_id)
+            if entry is None:
+                if len(self._pending) >= self.max_pending:
+                    _dropped.inc()
+                    return
+                self._pending[recipe_id] = (1, accessed_at)
+            else:
+                hits, last = entry
+                self._pending[recipe_id] = (hits + 1, max(last, accessed_at))
+            self._events += 1
+            wake = self._events >= self.flush_events
+        _events.inc()
+        if wake and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def flush(self) -> int:
+        """
+        Write the buffered reads to the database and return how many recipes
+        were updated.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._events = 0
+            if not pending:
+                return 0
+
+            # Sorted so that concurrent flushes from several workers lock
+            # rows in the same order
+            rows = [
+                (recipe_id, accessed_at, hits)
+                for recipe_id, (hits, accessed_at) in sorted(pending.items())
+            ]
+            accesses = values(
+                column("id", Uuid),
+                column("accessed_at", DateTime),
+                column("hits", Integer),
+                name="accesses",
+            ).data(rows)
+            statement = (
+                update(Recipe)
+                .where(Recipe.id == accesses.c.id)  # type: ignore[arg-type]
+                .values(
+                    last_accessed_at=func.greatest(
+                        Recipe.last_accessed_at, accesses.c.accessed_at
+                    ),
+                    number_of_accesses=Recipe.number_of_accesses + accesses.c.hits,
+                )
+            )
+            try:
+                with Session(self.engine) as session:
+                    session.exec(statement)  # type: ignore[call-overload]
+                    session.commit()
+            except Exception:
+                _dropped.inc(sum(hits for _, _, hits in rows))
+                logger.exception("Failed to record %d recipe accesses", len(rows))
+                return 0
+            _flushes.inc()
+            _flushed_rows.inc(len(rows))
+            return len(rows)
+
+    def start(self) -> None:
+        """
+        Start the background flusher on the running event loop.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background flusher and write whatever is still buffered.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._wakeup = self._loop = None
+        await run_in_threadpool(self.flush)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await run_in_threadpool(self.flush)
+
+
+recipe_access_tracker = RecipeAccessTracker.from_settings()
+metrics.gauge("recipe_access_pending", lambda: len(recipe_access_tracker))
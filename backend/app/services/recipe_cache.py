@@ -0,0 +1,162 @@
+import datetime
+import hashlib
+import json
+import re
+import unicodedata
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+from app.core.cache import (
+    CacheBackend,
+    MemoryCacheBackend,
+    PostgresCacheBackend,
+    TTLCache,
+)
+from app.core.config import settings
+from app.core.db import create_db_engine, engine
+from app.core.metrics import metrics
+from app.core.singleflight import PostgresSingleFlight, SingleFlight
+
+_hits = metrics.counter("recipe_generation_cache_hits_total")
+_misses = metrics.counter("recipe_generation_cache_misses_total")
+_response_local_hits = metrics.counter("recipe_response_cache_local_hits_total")
+_response_shared_hits = metrics.counter("recipe_response_cache_shared_hits_total")
+_response_misses = metrics.counter("recipe_response_cache_misses_total")
+
+
+def normalize_prompt(user_input: str) -> str:
+    """
+    Fold case, accents and whitespace so that "crêpes", "Crepes " and
+    "crepes" share a cache entry.
+    """
+    decomposed = unicodedata.normalize("NFKD", user_input)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return re.sub(r"\s+", " ", stripped).strip().casefold()
+
+
+class RecipeGenerationCache:
+    """
+    Content-addressed cache of ``create_recipe`` arguments returned by OpenAI.
+
+    The key covers everything that shapes the model output: the normalized
+    request, the language entry, the model and a fingerprint of the prompt
+    templates and function schema, so editing a prompt invalidates the cache.
+    """
+
+    NAMESPACE = "recipe-generation"
+
+    def __init__(self, backend: CacheBackend | None, *, ttl: float, fingerprint: str):
+        self.backend = backend
+        self.ttl = ttl
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_settings(cls, *, fingerprint: str) -> "RecipeGenerationCache":
+        backend: CacheBackend | None = None
+        if settings.RECIPE_CACHE_BACKEND == "memory":
+            backend = MemoryCacheBackend(max_entries=settings.RECIPE_CACHE_MAX_ENTRIES)
+        elif settings.RECIPE_CACHE_BACKEND == "postgres":
+            backend = PostgresCacheBackend(engine)
+        return cls(
+            backend, ttl=settings.RECIPE_CACHE_TTL_SECONDS, fingerprint=fingerprint
+        )
+
+    def key(self, *, user_input: str, language: dict[str, str], model: str) -> str:
+        material = json.dumps(
+            [normalize_prompt(user_input), language, model, self.fingerprint],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        digest = hashlib.sha256(material.encode()).hexdigest()
+        return f"{self.NAMESPACE}:{digest}"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            _misses.inc()
+            return None
+        _hits.inc()
+        arguments: dict[str, Any] = json.loads(value)
+        return arguments
+
+    def set(self, key: str, arguments: dict[str, Any]) -> None:
+        if self.backend is None:
+            return
+        self.backend.set(key, json.dumps(arguments).encode(), self.ttl)
+
+
+class RecipeResponseCache:
+    """
+    Read-through cache of serialized RecipePublic JSON, for the guest recipes
+    that nobody edits once generated. The access fields, which reads change,
+    are left out of it.
+
+    Keys include updated_at, so an edited recipe is never served stale: the
+    entry of the previous version just ages out. The per-worker LRU tier is
+    checked first, then the `shared` tier if any, before rendering.
+    """
+
+    NAMESPACE = "recipe-response"
+
+    def __init__(
+        self, shared: CacheBackend | None, *, max_entries: int, ttl: float
+    ) -> None:
+        self.local: TTLCache[str, bytes] = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.shared = shared
+        self.ttl = ttl
+
+    @classmethod
+    def from_settings(cls) -> "RecipeResponseCache":
+        shared: CacheBackend | None = None
+        if settings.RECIPE_RESPONSE_CACHE_SHARED_BACKEND == "postgres":
+            shared = PostgresCacheBackend(engine)
+        return cls(
+            shared,
+            max_entries=settings.RECIPE_RESPONSE_CACHE_MAX_ENTRIES,
+            ttl=settings.RECIPE_RESPONSE_CACHE_TTL_SECONDS,
+        )
+
+    def key(self, recipe_id: uuid.UUID, updated_at: datetime.datetime) -> str:
+        return f"{self.NAMESPACE}:{recipe_id.hex}:{updated_at.isoformat()}"
+
+    def get_or_render(self, key: str, render: Callable[[], bytes]) -> bytes:
+        value = self.local.get(key)
+        if value is not None:
+            _response_local_hits.inc()
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                _response_shared_hits.inc()
+                self.local.set(key, value)
+                return value
+        _response_misses.inc()
+        value = render()
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value, self.ttl)
+        return value
+
+
+def generation_flight_from_settings() -> SingleFlight[dict[str, Any]] | None:
+    """
+    Coalescing of concurrent generations of the same prompt, keyed like the
+    cache; None when disabled.
+    """
+    if settings.RECIPE_COALESCE_BACKEND == "memory":
+        return SingleFlight("recipe_generation")
+    if settings.RECIPE_COALESCE_BACKEND == "postgres":
+        # The advisory locks take one connection per worker, outside the pool
+        return PostgresSingleFlight(
+            "recipe_generation",
+            create_db_engine(pool_size=1, max_overflow=0),
+            poll_interval=settings.RECIPE_COALESCE_POLL_INTERVAL_SECONDS,
+        )
+    return None
+
+
+recipe_response_cache = RecipeResponseCache.from_settings()
+metrics.gauge("recipe_response_cache_entries", lambda: len(recipe_response_cache.local))
@@ -0,0 +1,236 @@
+import asyncio
+import datetime
+import logging
+import uuid
+from typing import Any
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.metrics import metrics
+from app.core.webhooks import check_callback_url
+from app.models import Recipe, RecipeGenerationJob
+from app.schemas.recipe_schemas import RecipeGenerationJobPublic
+from app.services.recipe_services import RecipeAIService
+
+logger = logging.getLogger(__name__)
+
+_succeeded = metrics.counter("recipe_jobs_succeeded_total")
+_failed = metrics.counter("recipe_jobs_failed_total")
+_retried = metrics.counter("recipe_jobs_retried_total")
+_callbacks_failed = metrics.counter("recipe_jobs_callbacks_failed_total")
+
+
+class RecipeJobRunner:
+    """
+    Runs queued recipe generation jobs in `workers` tasks on the event loop.
+
+    Postgres is the only broker: a worker claims a job with FOR UPDATE SKIP
+    LOCKED and owns it for `lease_seconds`, so workers in any number of
+    processes share the queue, and a job whose worker died is claimed again
+    once its lease expires. Failed OpenAI calls are retried until the job has
+    had `max_attempts`; any other failure fails the job. Idle workers poll
+    every `poll_interval` seconds, or wake up as soon as ``wake`` is called.
+    """
+
+    # Seconds; a retried job waits 2, 4, 8... seconds before its next attempt
+    MAX_RETRY_BACKOFF = 60
+
+    def __init__(
+        self,
+        engine: Engine,
+        service: RecipeAIService,
+        *,
+        workers: int,
+        poll_interval: float,
+        lease_seconds: float,
+        max_attempts: int,
+        callback_timeout: float,
+    ) -> None:
+        self.engine = engine
+        self.service = service
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.callback_timeout = callback_timeout
+        self._running = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._callback_client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def from_settings(
+        cls, service: RecipeAIService, *, workers: int | None = None
+    ) -> "RecipeJobRunner":
+        return cls(
+            engine,
+            service,
+            workers=settings.RECIPE_JOB_WORKERS if workers is None else workers,
+            poll_interval=settings.RECIPE_JOB_POLL_INTERVAL_SECONDS,
+            lease_seconds=settings.RECIPE_JOB_LEASE_SECONDS,
+            max_attempts=settings.RECIPE_JOB_MAX_ATTEMPTS,
+            callback_timeout=settings.RECIPE_JOB_CALLBACK_TIMEOUT_SECONDS,
+        )
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def wake(self) -> None:
+        """
+        Tell idle workers a job was queued. Safe to call from any thread.
+        """
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def start(self) -> None:
+        """
+        Start the workers on the running event loop.
+        """
+        if self.workers <= 0 or self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """
+        Stop the workers; the jobs they were running go back to the queue.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = self._loop = None
+        if self._callback_client is not None:
+            await self._callback_client.aclose()
+            self._callback_client = None
+
+    async def run_once(self) -> bool:
+        """
+        Claim and run one job; False if there was none to claim.
+        """
+        job = await run_in_threadpool(self._claim)
+        if job is None:
+            return False
+        self._running += 1
+        try:
+            await self._execute(job)
+        finally:
+            self._running -= 1
+        return True
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                if await self.run_once():
+                    continue
+            except Exception:
+                logger.exception("Recipe job worker failed to claim a job")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _claim(self) -> RecipeGenerationJob | None:
+        with Session(self.engine, expire_on_commit=False) as session:
+            return crud.claim_generation_job(
+                session=session,
+                lease_seconds=self.lease_seconds,
+                max_attempts=self.max_attempts,
+            )
+
+    def _finish(
+        self,
+        job: RecipeGenerationJob,
+        status: str,
+        *,
+        recipe_id: uuid.UUID | None = None,
+        error: str | None = None,
+        retry_at: datetime.datetime | None = None,
+    ) -> RecipeGenerationJob:
+        with Session(self.engine, expire_on_commit=False) as session:
+            return crud.finish_generation_job(
+                session=session,
+                job=session.merge(job),
+                status=status,
+                recipe_id=recipe_id,
+                error=error,
+                retry_at=retry_at,
+            )
+
+    async def _execute(self, job: RecipeGenerationJob) -> None:
+        recipe: Recipe | None = None
+        try:
+            generated = await self.service.generate_recipe(
+                owner_id=job.user_id, user_input=job.user_input, user_lang=job.language
+            )
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to another worker, without counting
+            # this attempt
+            job.attempts -= 1
+            await run_in_threadpool(self._finish, job, "queued")
+            raise
+        except httpx.HTTPError as exc:
+            if job.attempts < self.max_attempts:
+                _retried.inc()
+                logger.warning("Recipe job %s will be retried: %r", job.id, exc)
+                backoff = min(self.MAX_RETRY_BACKOFF, 2**job.attempts)
+                retry_at = datetime.datetime.utcnow() + datetime.timedelta(
+                    seconds=backoff
+                )
+                await run_in_threadpool(
+                    self._finish, job, "queued", error=repr(exc), retry_at=retry_at
+                )
+                return
+            _failed.inc()
+            job = await run_in_threadpool(
+                self._finish, job, "failed", error="OpenAI API call failed"
+            )
+        except Exception:
+            logger.exception("Recipe job %s failed", job.id)
+            _failed.inc()
+            job = await run_in_threadpool(
+                self._finish, job, "failed", error="Recipe generation failed"
+            )
+        else:
+            recipe = generated
+            _succeeded.inc()
+            job = await run_in_threadpool(
+                self._finish, job, "succeeded", recipe_id=recipe.id
+            )
+        if job.callback_url:
+            await self._notify(job, recipe)
+
+    async def _notify(self, job: RecipeGenerationJob, recipe: Recipe | None) -> None:
+        """
+        POST the finished job to its callback URL, once and on a best-effort
+        basis: the job can always be polled.
+        """
+        assert job.callback_url is not None
+        payload: dict[str, Any] = RecipeGenerationJobPublic.model_validate(
+            job, update={"recipe": recipe}
+        ).model_dump(mode="json")
+        if self._callback_client is None:
+            self._callback_client = httpx.AsyncClient(timeout=self.callback_timeout)
+        try:
+            # The host may resolve elsewhere than when the job was queued
+            await check_callback_url(job.callback_url)
+            resp = await self._callback_client.post(job.callback_url, json=payload)
+            resp.raise_for_status()
+        except (httpx.HTTPError, ValueError) as exc:
+            _callbacks_failed.inc()
+            logger.warning("Callback for recipe job %s failed: %r", job.id, exc)
+
+
+recipe_job_runner = RecipeJobRunner.from_settings(RecipeAIService())
+metrics.gauge("recipe_jobs_running", lambda: recipe_job_runner.running)
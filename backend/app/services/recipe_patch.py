@@ -0,0 +1,243 @@
+from typing import Any
+
+from app.models import Recipe
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipePatchOperation,
+    RecipeUpdate,
+)
+
+SCALAR_FIELDS = ("title", "description", "preparation_time", "cook_time", "serves")
+LINE_FIELDS = ("ingredients", "directions")
+
+_OPERATION = {
+    "type": "object",
+    "properties": {
+        "op": {"type": "string", "enum": ["replace", "insert", "delete"]},
+        "index": {"type": "integer"},
+        "content": {"type": "string"},
+    },
+    "required": ["op", "index"],
+}
+
+# Function the model calls to describe an improvement as changes only
+RECIPE_PATCH_FUNCTION = {
+    "name": "patch_recipe",
+    "description": (
+        "Describe the changes to make to the recipe. Only give the fields that "
+        "change; for ingredients and directions, give one operation per line "
+        "replaced, inserted or deleted."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "description": {"type": "string"},
+            "preparation_time": {"type": "integer"},
+            "cook_time": {"type": "integer"},
+            "serves": {"type": "integer"},
+            "ingredients": {
+                "type": "array",
+                "description": (
+                    "index is that of a line of the original recipe; insert "
+                    "adds a line before it, or at the end with the number of "
+                    "lines"
+                ),
+                "items": _OPERATION,
+            },
+            "directions": {
+                "type": "array",
+                "description": (
+                    "index is that of a step of the original recipe; insert "
+                    "adds a step before it, or at the end with the number of "
+                    "steps"
+                ),
+                "items": _OPERATION,
+            },
+        },
+    },
+}
+
+
+def apply_recipe_patch(recipe: Recipe, patch: dict[str, Any]) -> RecipeCreate:
+    """
+    Return `recipe` with the ``patch_recipe`` arguments `patch` applied.
+
+    Operation indexes refer to the lines of `recipe` as given to the model,
+    whatever the other operations; the resulting lines are numbered from 0.
+    Raises ValueError for operations that do not fit the recipe, and its
+    subclass ValidationError when the patched recipe is not valid.
+    """
+    data: dict[str, Any] = {
+        field: patch[field] if patch.get(field) is not None else getattr(recipe, field)
+        for field in SCALAR_FIELDS
+    }
+    data["is_favorite"] = recipe.is_favorite
+    data["ingredients"] = [
+        IngredientCreate(index=index, content=content)
+        for index, content in enumerate(
+            _apply_operations(
+                "ingredients",
+                [ing.content for ing in sorted(recipe.ingredients, key=_by_index)],
+                patch.get("ingredients") or [],
+            )
+        )
+    ]
+    data["directions"] = [
+        DirectionCreate(index=index, content=content)
+        for index, content in enumerate(
+            _apply_operations(
+                "directions",
+                [direc.content for direc in sorted(recipe.directions, key=_by_index)],
+                patch.get("directions") or [],
+            )
+        )
+    ]
+    return RecipeCreate.model_validate(data)
+
+
+def _by_index(item: Any) -> int:
+    index: int = item.index
+    return index
+
+
+def _apply_operations(
+    field: str, lines: list[str | None], operations: list[dict[str, Any]]
+) -> list[str | None]:
+    replaced: dict[int, str | None] = {}
+    deleted: set[int] = set()
+    # Inserted before the original line at that position, len(lines) = at the end
+    inserted: dict[int, list[str | None]] = {}
+    for operation in operations:
+        op, index = operation.get("op"), operation.get("index")
+        content = operation.get("content")
+        if not isinstance(index, int) or not 0 <= index <= len(lines):
+            raise ValueError(f"{field}: no line {index!r} to {op}")
+        if op in ("insert", "replace") and (
+            not isinstance(content, str) or not content
+        ):
+            raise ValueError(f"{field}: no content to {op} at line {index}")
+        if op == "insert":
+            inserted.setdefault(index, []).append(content)
+            continue
+        if index == len(lines):
+            raise ValueError(f"{field}: no line {index} to {op}")
+        if index in replaced or index in deleted:
+            raise ValueError(f"{field}: line {index} is changed twice")
+        if op == "replace":
+            replaced[index] = content
+        elif op == "delete":
+            deleted.add(index)
+        else:
+            raise ValueError(f"{field}: unknown operation {op!r}")
+
+    result: list[str | None] = []
+    for index, line in enumerate(lines):
+        result.extend(inserted.get(index, []))
+        if index not in deleted:
+            result.append(replaced.get(index, line))
+    result.extend(inserted.get(len(lines), []))
+    return result
+
+
+def apply_recipe_operations(
+    recipe: Recipe, operations: list[RecipePatchOperation]
+) -> RecipeUpdate:
+    """
+    Return the update that applies the PATCH /recipes/{id} `operations` to
+    `recipe`, with only the fields they touch set.
+
+    As in JSON Patch, the operations apply one after the other, each to the
+    result of the previous ones; line positions are those of the lines
+    sorted by index. Lines keep their stored index, except those after an
+    added or removed line, which shift by one.
+    Raises ValueError for an operation that does not fit the recipe.
+    """
+    scalars: dict[str, Any] = {}
+    lines = {
+        field: [
+            {"index": line.index, "content": line.content}
+            for line in sorted(getattr(recipe, field), key=_by_index)
+        ]
+        for field in LINE_FIELDS
+    }
+    touched: set[str] = set()
+    for operation in operations:
+        field, position = _parse_path(operation.path)
+        if field in LINE_FIELDS:
+            _apply_line_operation(lines[field], operation, position)
+            touched.add(field)
+            continue
+        if operation.op != "replace" or position is not None:
+            raise ValueError(f"cannot {operation.op} {operation.path}")
+        if field not in (*SCALAR_FIELDS, "is_favorite"):
+            raise ValueError(f"{operation.path} cannot be changed")
+        # cook_time is the only optional field
+        if operation.value is None and field != "cook_time":
+            raise ValueError(f"{operation.path} cannot be null")
+        scalars[field] = operation.value
+    for field in touched:
+        scalars[field] = lines[field]
+    return RecipeUpdate.model_validate(scalars)
+
+
+def _parse_path(path: str) -> tuple[str, str | None]:
+    parts = path.split("/")
+    if len(parts) not in (2, 3) or parts[0] != "":
+        raise ValueError(f"invalid path {path!r}")
+    return parts[1], parts[2] if len(parts) == 3 else None
+
+
+def _position(
+    lines: list[dict[str, Any]], position: str | None, *, end: bool = False
+) -> int:
+    # end: the position may be that after the last line, also written "-"
+    if end and position == "-":
+        return len(lines)
+    if position is None or not position.isdigit():
+        raise ValueError(f"invalid line position {position!r}")
+    index = int(position)
+    if index >= len(lines) + end:
+        raise ValueError(f"no line at position {index}")
+    return index
+
+
+def _insert_line(lines: list[dict[str, Any]], at: int, content: str | None) -> None:
+    # The new line takes the index of the one it goes before, which shifts
+    if at < len(lines):
+        index = lines[at]["index"]
+    else:
+        index = lines[-1]["index"] + 1 if lines else 0
+    for line in lines[at:]:
+        line["index"] += 1
+    lines.insert(at, {"index": index, "content": content})
+
+
+def _remove_line(lines: list[dict[str, Any]], at: int) -> str | None:
+    content: str | None = lines.pop(at)["content"]
+    for line in lines[at:]:
+        line["index"] -= 1
+    return content
+
+
+def _apply_line_operation(
+    lines: list[dict[str, Any]], operation: RecipePatchOperation, position: str | None
+) -> None:
+    if operation.op == "move":
+        source, source_position = _parse_path(operation.from_ or "")
+        target = _parse_path(operation.path)[0]
+        if source != target:
+            raise ValueError(f"cannot move from {operation.from_} to {operation.path}")
+        content = _remove_line(lines, _position(lines, source_position))
+        _insert_line(lines, _position(lines, position, end=True), content)
+        return
+    if operation.value is not None and not isinstance(operation.value, str):
+        raise ValueError(f"{operation.path} must be a string")
+    if operation.op == "add":
+        _insert_line(lines, _position(lines, position, end=True), operation.value)
+    elif operation.op == "replace":
+        lines[_position(lines, position)]["content"] = operation.value
+    else:
+        _remove_line(lines, _position(lines, position))
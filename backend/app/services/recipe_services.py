@@ -1,14 +1,27 @@
+import asyncio
+import hashlib
 import json
+import logging
+import uuid
+from collections.abc import AsyncIterator
+from typing import Any, Literal
 
-import requests
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session
 
-from app.core.config import settings
-from app.models import Direction, Ingredient, Recipe, User
+from app import crud
+from app.core.db import engine
+from app.core.llm import openai_transport
+from app.models import Recipe, User
 from app.schemas.recipe_schemas import RecipeCreate
+from app.services.recipe_cache import (
+    RecipeGenerationCache,
+    generation_flight_from_settings,
+)
+from app.services.recipe_patch import RECIPE_PATCH_FUNCTION, apply_recipe_patch
+from app.services.recipe_stream import RecipeArgumentsParser
 
-OPENAI_URL = "https://api.openai.com/v1/chat/completions"
-OPENAI_API_KEY = settings.OPENAI_API_KEY
+logger = logging.getLogger(__name__)
 
 
 class RecipeAIService:
@@ -18,6 +31,8 @@ class RecipeAIService:
       • prompt building
       • language handling (input + output)
       • OpenAI calls
+      • caching generated recipes
+      • coalescing concurrent generations of the same prompt
       • persisting the returned JSON
     """
 
@@ -103,24 +118,170 @@ class RecipeAIService:
         },
     }
 
-    def generate_recipe(
+    # Improvements need function calling, which search-preview models lack
+    IMPROVEMENT_MODEL = "gpt-4o-mini"
+
+    def __init__(self) -> None:
+        self.cache = RecipeGenerationCache.from_settings(
+            fingerprint=self._prompt_fingerprint()
+        )
+        self.flight = generation_flight_from_settings()
+
+    async def generate_recipe(
         self,
         *,
-        session: Session,
-        current_user: User,
+        owner_id: uuid.UUID,
         user_input: str,
         user_lang: str = "en",
     ) -> Recipe:
         """
-        Create a recipe via OpenAI, store and return it.
+        Create a recipe via OpenAI (or the generation cache), store and return it.
+
+        No database connection is held while OpenAI answers: the recipe is
+        stored afterwards in a short session of its own.
+        """
+        recipe_create = await self._generate_recipe_create(user_input, user_lang)
+        return await run_in_threadpool(self._persist_recipe, owner_id, recipe_create)
+
+    async def generate_recipes(
+        self,
+        *,
+        user_inputs: list[str],
+        user_lang: str = "en",
+        concurrency: int,
+        distinct: bool = False,
+    ) -> AsyncIterator[tuple[int, RecipeCreate | Exception]]:
+        """
+        Generate a recipe for each of `user_inputs`, at most `concurrency` at a
+        time, yielding ``(index, recipe or exception)`` as each one completes.
+        Nothing is stored: see ``persist_recipes``.
+
+        With `distinct`, the generation cache is bypassed so that repeated
+        prompts give different recipes.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def generate(
+            index: int, user_input: str
+        ) -> tuple[int, RecipeCreate | Exception]:
+            async with semaphore:
+                try:
+                    return index, await self._generate_recipe_create(
+                        user_input, user_lang, reuse=not distinct
+                    )
+                except Exception as exc:
+                    return index, exc
+
+        tasks = [
+            asyncio.ensure_future(generate(index, user_input))
+            for index, user_input in enumerate(user_inputs)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Only left running if the caller stopped iterating early
+            for task in tasks:
+                task.cancel()
+
+    async def persist_recipes(
+        self, *, owner_id: uuid.UUID, recipe_creates: list[RecipeCreate]
+    ) -> list[Recipe]:
+        """
+        Store generated recipes in a single transaction.
+        """
+        return await run_in_threadpool(self._persist_recipes, owner_id, recipe_creates)
+
+    async def _generate_recipe_create(
+        self, user_input: str, user_lang: str, *, reuse: bool = True
+    ) -> RecipeCreate:
+        payload = self._build_generation_payload(user_input, user_lang)
+        key = self._cache_key(user_input, user_lang, payload)
+        arguments = None
+        if reuse:
+            arguments = await run_in_threadpool(self.cache.get, key)
+        if arguments is None:
+            if self.flight is None or not reuse:
+                arguments = await self._generate_arguments(key, payload, cache=reuse)
+            else:
+                # Identical concurrent requests share one OpenAI call, and
+                # each still gets a recipe of its own
+                arguments = await self.flight.do(
+                    key,
+                    lambda: self._generate_arguments(key, payload),
+                    recheck=lambda: run_in_threadpool(self.cache.get, key),
+                )
+        recipe_create = RecipeCreate(**arguments)
+        recipe_create.language = user_lang
+        return recipe_create
+
+    async def _generate_arguments(
+        self, key: str, payload: dict[str, Any], *, cache: bool = True
+    ) -> dict[str, Any]:
+        arguments = await self._call_openai(payload)
+        # Validated before being cached or shared with coalesced requests
+        RecipeCreate(**arguments)
+        if cache:
+            await run_in_threadpool(self.cache.set, key, arguments)
+        return arguments
+
+    async def stream_recipe(
+        self,
+        *,
+        owner_id: uuid.UUID,
+        user_input: str,
+        user_lang: str = "en",
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Like ``generate_recipe``, but yields ``(event, data)`` pairs while the
+        recipe is being generated: each top-level field, then every ingredient
+        and direction as soon as it is complete, and finally ``("recipe", Recipe)``
+        once the full recipe has been stored.
         """
-        meta = self.LANGUAGE_META.get(
-            user_lang, {"name": "English", "units": "imperial"}
+        payload = self._build_generation_payload(user_input, user_lang)
+        key = self._cache_key(user_input, user_lang, payload)
+        parser = RecipeArgumentsParser()
+        cached = await run_in_threadpool(self.cache.get, key)
+        if cached is not None:
+            for event in parser.feed(json.dumps(cached)):
+                yield event
+            recipe_create = RecipeCreate(**cached)
+        else:
+            payload["stream"] = True
+            async for fragment in self._stream_openai(payload):
+                for event in parser.feed(fragment):
+                    yield event
+            arguments = parser.arguments()
+            recipe_create = RecipeCreate(**arguments)
+            await run_in_threadpool(self.cache.set, key, arguments)
+
+        recipe_create.language = user_lang
+        recipe = await run_in_threadpool(self._persist_recipe, owner_id, recipe_create)
+        yield "recipe", recipe
+
+    @classmethod
+    def search_config(cls, user_lang: str | None) -> str:
+        """
+        Postgres text search configuration for recipes written in `user_lang`,
+        e.g. "french" for "fr-FR"; unknown languages are indexed unstemmed.
+        """
+        meta = cls.LANGUAGE_META.get(user_lang or "")
+        return meta["name"].lower() if meta else "simple"
+
+    @classmethod
+    def _language_meta(cls, user_lang: str | None) -> dict[str, str]:
+        return cls.LANGUAGE_META.get(
+            user_lang or "", {"name": "English", "units": "imperial"}
         )
+
+    def _build_generation_payload(
+        self, user_input: str, user_lang: str
+    ) -> dict[str, Any]:
+        meta = self._language_meta(user_lang)
         pre_prompt = self._build_pre_prompt(user_input, meta["name"])
         final_prompt = self._build_prompt(user_input, meta["name"], meta["units"])
 
-        payload = {
+        return {
             "model": "gpt-4o",
             "messages": [
                 {
@@ -133,9 +294,26 @@ class RecipeAIService:
             "function_call": {"name": "create_recipe"},
         }
 
-        arguments = self._call_openai(payload)
-        recipe_create = RecipeCreate(**arguments)
-        return self._persist_recipe(session, current_user, recipe_create)
+    def _cache_key(
+        self, user_input: str, user_lang: str, payload: dict[str, Any]
+    ) -> str:
+        return self.cache.key(
+            user_input=user_input,
+            language=self._language_meta(user_lang),
+            model=payload["model"],
+        )
+
+    @classmethod
+    def _prompt_fingerprint(cls) -> str:
+        """
+        Hash of everything in the prompt besides the request itself.
+        """
+        material = json.dumps(
+            [cls._recipe_function, cls._PROMPT_TEMPLATES, cls._PRE_PROMPT_TEMPLATES],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
 
     @classmethod
     def _build_prompt(cls, request: str, output_lang: str, unit_system: str) -> str:
@@ -153,91 +331,192 @@ class RecipeAIService:
         )
 
     @staticmethod
-    def _headers() -> dict[str, str]:
-        return {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {OPENAI_API_KEY}",
-        }
+    async def _post_chat_completion(payload: dict[str, Any]) -> dict[str, Any]:
+        return await openai_transport.post("/chat/completions", payload)
+
+    @staticmethod
+    async def _stream_openai(payload: dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Yield the function-call argument fragments of a streamed completion.
+        """
+        async with openai_transport.stream("/chat/completions", payload) as resp:
+            async for line in resp.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line.removeprefix("data:").strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                if not choices:
+                    continue
+                fn_call = choices[0].get("delta", {}).get("function_call") or {}
+                if fragment := fn_call.get("arguments"):
+                    yield fragment
 
-    def _call_openai(self, payload: dict) -> dict:
-        resp = requests.post(OPENAI_URL, json=payload, headers=self._headers())
-        resp.raise_for_status()
+    async def _call_openai(self, payload: dict[str, Any]) -> dict[str, Any]:
+        data = await self._post_chat_completion(payload)
         try:
-            fn_call = resp.json()["choices"][0]["message"]["function_call"]
-            print(f"OpenAI response: {fn_call}")
-            return json.loads(fn_call["arguments"])
+            fn_call = data["choices"][0]["message"]["function_call"]
+            logger.debug("OpenAI response: %s", fn_call)
+            arguments: dict[str, Any] = json.loads(fn_call["arguments"])
+            return arguments
         except Exception:
             raise RuntimeError("Failed to extract recipe JSON from OpenAI response")
 
-    @staticmethod
+    @classmethod
     def _persist_recipe(
-        session: Session, current_user: User, recipe_create: RecipeCreate
+        cls, owner_id: uuid.UUID, recipe_create: RecipeCreate
     ) -> Recipe:
-        recipe_data = recipe_create.model_dump(exclude={"ingredients", "directions"})
-        recipe = Recipe.model_validate(recipe_data, update={"user_id": current_user.id})
+        return cls._persist_recipes(owner_id, [recipe_create])[0]
 
+    @classmethod
+    def _persist_recipes(
+        cls, owner_id: uuid.UUID, recipe_creates: list[RecipeCreate]
+    ) -> list[Recipe]:
         try:
-            session.add(recipe)
-            session.commit()
-            session.refresh(recipe)
-
-            for ing in recipe_create.ingredients:
-                session.add(
-                    Ingredient.model_validate(ing, update={"recipe_id": recipe.id})
+            # Not expired on commit: the recipes and their owner are
+            # serialized after the session is closed
+            with Session(engine, expire_on_commit=False) as session:
+                owner = session.get(User, owner_id)
+                if owner is None:
+                    raise LookupError("the owner no longer exists")
+                return crud.create_recipes(
+                    session=session,
+                    recipe_creates=recipe_creates,
+                    owner=owner,
+                    search_config=cls.search_config(
+                        recipe_creates[0].language if recipe_creates else None
+                    ),
                 )
-            for direc in recipe_create.directions:
-                session.add(
-                    Direction.model_validate(direc, update={"recipe_id": recipe.id})
-                )
-
-            session.commit()
-            session.refresh(recipe)
-            return recipe
         except Exception as exc:
-            session.rollback()
             raise RuntimeError(f"Recipe creation failed: {exc}") from exc
 
-    @staticmethod
-    def build_improvement_prompt(user_input: str, original_recipe: Recipe) -> str:
-        """
-        Replicates your front-end prompt to improve a given recipe.
-        We embed the original recipe and user instructions.
-        """
-        return f"""
-        Améliore la recette suivante au format JSON
-
-        La recette originale est : {json.dumps({
-            "title": original_recipe.title,
-            "description": original_recipe.description,
-            "preparation_time": original_recipe.preparation_time,
-            "cook_time": original_recipe.cook_time,
-            "serves": original_recipe.serves,
-            "ingredients": [{"content": ing.content, "index": ing.index} for ing in original_recipe.ingredients],
-            "directions": [{"content": dir.content, "index": dir.index} for dir in original_recipe.directions],
-        }, ensure_ascii=False)}
-
-        L'amélioration doit être : {user_input}
-
-        Exemple de structure JSON attendue :
-
-        {{
-        "title": "Titre de la recette (str)",
-        "description": "Description de la recette (str, max 200 caractères)",
-        "preparation_time": "Temps de préparation en minutes (int)",
-        "cook_time": "Temps de cuisson en minutes (int, 0 if not applicable)",
-        "serves": "Nombre de portions (int)",
-        "ingredients": [
-            {{ "content": "Nom de l'ingrédient, quantité", "index": 0 }},
-            ...
-        ],
-        "directions": [
-            {{ "content": "Instruction détaillée, quantité", "index": 0 }},
-            ...
-        ]
-        }}
+    async def improve_recipe(
+        self,
+        *,
+        original: Recipe,
+        user_input: str,
+        mode: Literal["rewrite", "patch"] = "rewrite",
+    ) -> Recipe:
+        """
+        Have OpenAI improve `original` following `user_input`, and store the
+        result as the next version of it, owned by the same user.
 
-        Renvoie exactement les mêmes champs que la recette originale,
-        mais avec les modifications apportées, au format JSON.
+        In "rewrite" mode the model returns the whole improved recipe through
+        ``create_recipe``, like generated ones; in "patch" mode it only returns
+        the changes through ``patch_recipe``, which are applied here, so far
+        fewer tokens are generated. `original` must have its ingredients and
+        directions loaded.
+        """
+        payload = self._build_improvement_payload(user_input, original, mode)
+        arguments = await self._call_openai(payload)
+        if mode == "patch":
+            recipe_create = apply_recipe_patch(original, arguments)
+        else:
+            recipe_create = RecipeCreate(**arguments)
+            recipe_create.is_favorite = original.is_favorite
+        return await run_in_threadpool(
+            self._persist_version, original.id, recipe_create
+        )
 
-        Renvoyez uniquement le JSON brut.
+    def _build_improvement_payload(
+        self,
+        user_input: str,
+        original_recipe: Recipe,
+        mode: Literal["rewrite", "patch"] = "rewrite",
+    ) -> dict[str, Any]:
+        function = RECIPE_PATCH_FUNCTION if mode == "patch" else self._recipe_function
+        return {
+            "model": self.IMPROVEMENT_MODEL,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": self._build_pre_prompt(
+                        user_input,
+                        self._language_meta(original_recipe.language)["name"],
+                    ),
+                },
+                {
+                    "role": "user",
+                    "content": self.build_improvement_prompt(
+                        user_input, original_recipe, mode
+                    ),
+                },
+            ],
+            "functions": [function],
+            "function_call": {"name": function["name"]},
+        }
+
+    @classmethod
+    def _persist_version(
+        cls, parent_id: uuid.UUID, recipe_create: RecipeCreate
+    ) -> Recipe:
+        try:
+            with Session(engine, expire_on_commit=False) as session:
+                parent = session.get(Recipe, parent_id)
+                if parent is None:
+                    raise LookupError("the improved recipe no longer exists")
+                recipe_create.language = parent.language
+                return crud.create_recipe(
+                    session=session,
+                    recipe_create=recipe_create,
+                    owner=parent.user,
+                    search_config=parent.search_config,
+                    parent=parent,
+                )
+        except Exception as exc:
+            raise RuntimeError(f"Recipe creation failed: {exc}") from exc
+
+    @staticmethod
+    def build_improvement_prompt(
+        user_input: str,
+        original_recipe: Recipe,
+        mode: Literal["rewrite", "patch"] = "rewrite",
+    ) -> str:
+        """
+        Embed the original recipe and the user instructions; the improvement
+        itself is returned through the ``create_recipe`` function, or through
+        ``patch_recipe`` in "patch" mode. Lines are numbered by position, which
+        is what patch operations refer to.
         """
+        original = json.dumps(
+            {
+                "title": original_recipe.title,
+                "description": original_recipe.description,
+                "preparation_time": original_recipe.preparation_time,
+                "cook_time": original_recipe.cook_time,
+                "serves": original_recipe.serves,
+                "ingredients": [
+                    {"content": ing.content, "index": index}
+                    for index, ing in enumerate(
+                        sorted(original_recipe.ingredients, key=lambda i: i.index)
+                    )
+                ],
+                "directions": [
+                    {"content": direc.content, "index": index}
+                    for index, direc in enumerate(
+                        sorted(original_recipe.directions, key=lambda d: d.index)
+                    )
+                ],
+            },
+            ensure_ascii=False,
+        )
+        if mode == "patch":
+            answer = (
+                "Renvoie uniquement les modifications, via l'appel de fonction "
+                "patch_recipe : les champs modifiés, et une opération par "
+                "ingrédient ou étape remplacé, inséré ou supprimé, dans la "
+                "langue de la recette originale."
+            )
+        else:
+            answer = (
+                "Renvoie la recette complète avec les modifications apportées, "
+                "dans la langue de la recette originale, via l'appel de fonction "
+                "create_recipe."
+            )
+        return (
+            "Améliore la recette suivante.\n\n"
+            f"La recette originale est : {original}\n\n"
+            f"L'amélioration doit être : {user_input}\n\n"
+            f"{answer}"
+        )
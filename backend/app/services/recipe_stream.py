@@ -0,0 +1,103 @@
+import json
+from typing import Any
+
+# Streamed list fields and the event name emitted for each of their items
+LIST_EVENTS = {"ingredients": "ingredient", "directions": "direction"}
+
+_WHITESPACE = " \t\r\n"
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class RecipeArgumentsParser:
+    """
+    Incremental parser for the streamed ``create_recipe`` function arguments.
+
+    OpenAI streams the arguments as arbitrary JSON fragments. ``feed`` buffers
+    them and returns an event for every top-level field, and for every item of
+    the ``ingredients`` / ``directions`` arrays, as soon as it is complete.
+    Once the stream is over, ``arguments`` returns the fully parsed object.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._key = ""
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, fragment: str) -> list[tuple[str, Any]]:
+        self._buffer += fragment
+        events: list[tuple[str, Any]] = []
+        try:
+            while self._state != "done":
+                event = self._step()
+                if event is not None:
+                    events.append(event)
+        except _NeedMore:
+            pass
+        return events
+
+    def arguments(self) -> dict[str, Any]:
+        arguments: dict[str, Any] = json.loads(self._buffer)
+        return arguments
+
+    def _step(self) -> tuple[str, Any] | None:
+        char = self._next_char()
+        if self._state == "start":
+            self._expect(char, "{")
+            self._state = "key"
+        elif self._state == "key":
+            if char == "}":
+                self._pos += 1
+                self._state = "done"
+            elif char == ",":
+                self._pos += 1
+            else:
+                self._key = self._decode()
+                self._state = "colon"
+        elif self._state == "colon":
+            self._expect(char, ":")
+            self._state = "value"
+        elif self._state == "value":
+            if char == "[" and self._key in LIST_EVENTS:
+                self._pos += 1
+                self._state = "list"
+            else:
+                value = self._decode()
+                self._state = "key"
+                return self._key, value
+        elif self._state == "list":
+            if char == "]":
+                self._pos += 1
+                self._state = "key"
+            elif char == ",":
+                self._pos += 1
+            else:
+                return LIST_EVENTS[self._key], self._decode()
+        return None
+
+    def _next_char(self) -> str:
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        if self._pos >= len(self._buffer):
+            raise _NeedMore
+        return self._buffer[self._pos]
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            raise ValueError(f"Expected {expected!r} at position {self._pos}")
+        self._pos += 1
+
+    def _decode(self) -> Any:
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            raise _NeedMore
+        # A number at the very end of the buffer may still be growing ("1" -> "12")
+        if end == len(self._buffer) and not isinstance(value, str | dict | list):
+            raise _NeedMore
+        self._pos = end
+        return value
@@ -1,10 +1,11 @@
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
 from sqlmodel import Session
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import pwd_context, verify_password
 from app.crud import create_user
 from app.schemas.user_schemas import UserCreate
 from app.tests.utils.user import user_authentication_headers
@@ -33,6 +34,24 @@ def test_get_access_token_incorrect_password(client: TestClient) -> None:
     assert r.status_code == 400
 
 
+def test_login_upgrades_outdated_hash(client: TestClient, db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    user = create_user(
+        session=db,
+        user_create=UserCreate(email=email, password=password),
+        hashed_password=bcrypt.using(rounds=4).hash(password),
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={"username": email, "password": password},
+    )
+    assert r.status_code == 200
+    db.refresh(user)
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert verify_password(password, user.hashed_password)
+
+
 def test_use_access_token(
     client: TestClient, superuser_token_headers: dict[str, str]
 ) -> None:
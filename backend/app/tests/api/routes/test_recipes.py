@@ -0,0 +1,995 @@
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.core.llm import CircuitBreaker, openai_transport
+from app.models import Recipe, User
+from app.schemas.recipe_schemas import (
+    IngredientPublic,
+    RecipeGenerationJobBase,
+    RecipePublic,
+)
+from app.schemas.user_schemas import UserPublic
+from app.services.recipe_cache import recipe_response_cache
+from app.services.recipe_services import RecipeAIService
+from app.tests.utils.openai_stub import SAMPLE_RECIPE_ARGUMENTS, OpenAIStub
+from app.tests.utils.recipe import create_random_recipe
+from app.tests.utils.user import create_random_user, create_user_with_headers
+from app.tests.utils.utils import count_statements, random_lower_string
+
+
+def test_generate_recipe(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    openai_stub: OpenAIStub,
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate",
+        headers=normal_user_token_headers,
+        json={"user_input": "crêpes", "language": "fr"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == SAMPLE_RECIPE_ARGUMENTS["title"]
+    assert len(content["ingredients"]) == len(SAMPLE_RECIPE_ARGUMENTS["ingredients"])
+    assert len(content["directions"]) == len(SAMPLE_RECIPE_ARGUMENTS["directions"])
+    assert content["user"]["email"] == settings.EMAIL_TEST_USER
+    assert openai_stub.requests[-1]["function_call"] == {"name": "create_recipe"}
+
+
+@pytest.mark.usefixtures("openai_stub")
+def test_generate_recipe_public(client: TestClient) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate-public",
+        json={"user_input": "crêpes", "language": "en"},
+    )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == SAMPLE_RECIPE_ARGUMENTS["title"]
+    assert content["user"]["email"] == "guest@jammin-dev.com"
+
+
+def test_read_guest_recipe_is_cached(
+    client: TestClient, db: Session, superuser_token_headers: dict[str, str]
+) -> None:
+    guest = db.exec(select(User).where(User.email == "guest@jammin-dev.com")).one()
+    recipe = create_random_recipe(db, guest)
+    url = f"{settings.API_V1_STR}/recipes/{recipe.id}"
+    headers = superuser_token_headers
+    r = client.get(url, headers=headers)
+    assert r.status_code == 200
+    content = r.json()
+    assert content["id"] == str(recipe.id)
+    assert len(content["ingredients"]) == 3
+    assert content["user"]["email"] == "guest@jammin-dev.com"
+
+    with count_statements() as statements:
+        cached = client.get(url, headers=headers)
+    assert cached.content == r.content
+    # Only the recipe joined with its owner
+    assert len(statements) == 1
+
+    # Reads are counted without changing updated_at: the cached JSON still
+    # gets the current access fields
+    stored = db.get(Recipe, recipe.id, populate_existing=True)
+    assert stored is not None
+    stored.number_of_accesses = 41
+    db.add(stored)
+    db.commit()
+    cached = client.get(url, headers=headers).json()
+    assert cached["number_of_accesses"] == 41
+    assert cached == {**content, "number_of_accesses": 41}
+    r = client.get(url, headers={**headers, "If-None-Match": r.headers["ETag"]})
+    assert r.status_code == 304
+
+    # Edits are served at once
+    client.put(url, headers=headers, json={"title": "Edited"})
+    assert client.get(url, headers=headers).json()["title"] == "Edited"
+
+    # Only guest recipes are cached, and reading them still needs permission
+    other = create_random_recipe(db, create_random_user(db))
+    r = client.get(f"{settings.API_V1_STR}/recipes/{other.id}", headers=headers)
+    assert r.status_code == 200
+    assert (
+        recipe_response_cache.local.get(
+            recipe_response_cache.key(other.id, other.updated_at)
+        )
+        is None
+    )
+    _, user_headers = create_user_with_headers(client, db)
+    assert client.get(url, headers=user_headers).status_code == 403
+    assert client.get(url).status_code == 401
+
+
+def test_generate_recipe_public_coalesces_identical_prompts(
+    client: TestClient, openai_stub: OpenAIStub, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(openai_stub, "latency", 0.5)
+    user_input = f"crêpes {random_lower_string()}"
+    sent = len(openai_stub.requests)
+
+    def generate(i: int) -> dict[str, Any]:
+        r = client.post(
+            f"{settings.API_V1_STR}/recipes/generate-public",
+            # Differently spelled, but the same prompt once normalized
+            json={"user_input": user_input.upper() if i % 2 else user_input},
+        )
+        assert r.status_code == 200
+        content: dict[str, Any] = r.json()
+        return content
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        recipes = list(executor.map(generate, range(6)))
+    assert len(openai_stub.requests) == sent + 1
+    assert {recipe["title"] for recipe in recipes} == {SAMPLE_RECIPE_ARGUMENTS["title"]}
+    # Each request still gets a recipe of its own
+    assert len({recipe["id"] for recipe in recipes}) == 6
+
+
+def test_generate_recipe_openai_failures(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    openai_stub: OpenAIStub,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    url = f"{settings.API_V1_STR}/recipes/generate"
+    monkeypatch.setattr(openai_transport, "max_attempts", 2)
+    openai_stub.fail_next(2, status_code=500)
+    r = client.post(
+        url, headers=normal_user_token_headers, json={"user_input": "crêpes 502"}
+    )
+    assert r.status_code == 502
+    assert r.json() == {"detail": "OpenAI API call failed"}
+
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    breaker.before_call()
+    breaker.record(False)
+    monkeypatch.setattr(openai_transport, "breaker", breaker)
+    sent = len(openai_stub.requests)
+    r = client.post(
+        url, headers=normal_user_token_headers, json={"user_input": "crêpes 503"}
+    )
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "30"
+    assert len(openai_stub.requests) == sent
+
+
+def test_improve_recipe(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    openai_stub: OpenAIStub,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate",
+        headers=normal_user_token_headers,
+        json={"user_input": "crêpes"},
+    )
+    original = r.json()
+    assert original["version"] == 1
+    assert original["parent_id"] is None
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{original['id']}/improve",
+        headers=normal_user_token_headers,
+        json={"user_input": "less sugar"},
+    )
+    assert r.status_code == 200
+    improved = r.json()
+    assert improved["id"] != original["id"]
+    assert improved["parent_id"] == original["id"]
+    assert improved["version"] == 2
+    assert improved["title"] == SAMPLE_RECIPE_ARGUMENTS["title"]
+    assert len(improved["ingredients"]) == len(SAMPLE_RECIPE_ARGUMENTS["ingredients"])
+    assert improved["user"]["email"] == settings.EMAIL_TEST_USER
+    payload = openai_stub.requests[-1]
+    assert payload["function_call"] == {"name": "create_recipe"}
+    assert original["title"] in payload["messages"][1]["content"]
+    assert "less sugar" in payload["messages"][1]["content"]
+
+    # Stored, and the original is left as it was
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/{improved['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+    assert r.json()["parent_id"] == original["id"]
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/{original['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert r.json()["updated_at"] == original["updated_at"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{improved['id']}/improve",
+        headers=normal_user_token_headers,
+        json={"user_input": "even less sugar"},
+    )
+    assert r.json()["parent_id"] == improved["id"]
+    assert r.json()["version"] == 3
+
+    # Arguments that are not a recipe are an OpenAI failure, not the caller's
+    monkeypatch.setattr(
+        openai_stub,
+        "function_arguments",
+        {"create_recipe": {**SAMPLE_RECIPE_ARGUMENTS, "serves": "many"}},
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{improved['id']}/improve",
+        headers=normal_user_token_headers,
+        json={"user_input": "more sugar"},
+    )
+    assert r.status_code == 502
+
+
+def test_improve_recipe_in_its_language(
+    client: TestClient, db: Session, openai_stub: OpenAIStub
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/",
+        headers=headers,
+        json={
+            "title": "Tarte aux pommes",
+            "description": "La tarte de mamie",
+            "preparation_time": 30,
+            "serves": 6,
+            "language": "fr",
+        },
+    )
+    recipe_id = r.json()["id"]
+    french = RecipeAIService._PRE_PROMPT_TEMPLATES["french"]
+    for version in (2, 3):
+        r = client.post(
+            f"{settings.API_V1_STR}/recipes/{recipe_id}/improve",
+            headers=headers,
+            json={"user_input": "moins de sucre"},
+        )
+        assert r.status_code == 200
+        assert r.json()["version"] == version
+        assert openai_stub.requests[-1]["messages"][0]["content"] == french
+        # Versions keep the language of the recipe they improve
+        recipe_id = r.json()["id"]
+        stored = db.get(Recipe, uuid.UUID(recipe_id))
+        assert stored is not None
+        assert stored.language == "fr"
+
+
+def test_improve_recipe_patch_mode(
+    client: TestClient,
+    db: Session,
+    openai_stub: OpenAIStub,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    owner, headers = create_user_with_headers(client, db)
+    original = create_random_recipe(db, owner, ingredients=3, directions=2)
+    patch = {
+        "title": "Less sugar",
+        "ingredients": [{"op": "replace", "index": 1, "content": "1 tbsp sugar"}],
+        "directions": [{"op": "delete", "index": 0}],
+    }
+    monkeypatch.setattr(openai_stub, "function_arguments", {"patch_recipe": patch})
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{original.id}/improve?mode=patch",
+        headers=headers,
+        json={"user_input": "less sugar"},
+    )
+    assert r.status_code == 200
+    assert openai_stub.requests[-1]["function_call"] == {"name": "patch_recipe"}
+    improved = r.json()
+    assert improved["parent_id"] == str(original.id)
+    assert improved["title"] == "Less sugar"
+    assert improved["description"] == original.description
+    assert [ing["content"] for ing in improved["ingredients"]] == [
+        original.ingredients[0].content,
+        "1 tbsp sugar",
+        original.ingredients[2].content,
+    ]
+    assert [direc["content"] for direc in improved["directions"]] == [
+        original.directions[1].content
+    ]
+
+    monkeypatch.setattr(
+        openai_stub,
+        "function_arguments",
+        {"patch_recipe": {"ingredients": [{"op": "delete", "index": 7}]}},
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{original.id}/improve?mode=patch",
+        headers=headers,
+        json={"user_input": "less sugar"},
+    )
+    assert r.status_code == 422
+
+    monkeypatch.setattr(
+        openai_stub,
+        "function_arguments",
+        {"patch_recipe": {"ingredients": [{"op": "insert", "index": 0}]}},
+    )
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/{original.id}/improve?mode=patch",
+        headers=headers,
+        json={"user_input": "more sugar"},
+    )
+    assert r.status_code == 422
+
+    # A patch that fits but makes an invalid recipe is an OpenAI failure
+    for invalid in ({"serves": "many"}, {"title": "x" * 256}):
+        monkeypatch.setattr(
+            openai_stub, "function_arguments", {"patch_recipe": invalid}
+        )
+        r = client.post(
+            f"{settings.API_V1_STR}/recipes/{original.id}/improve?mode=patch",
+            headers=headers,
+            json={"user_input": "more sugar"},
+        )
+        assert r.status_code == 502
+
+
+@pytest.mark.usefixtures("openai_stub")
+def test_generate_recipe_stream(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate/stream",
+        headers=normal_user_token_headers,
+        json={"user_input": "streamed crêpes", "language": "fr"},
+    )
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (
+            block.split("\n")[0].removeprefix("event: "),
+            json.loads(block.split("\n")[1].removeprefix("data: ")),
+        )
+        for block in r.text.strip().split("\n\n")
+    ]
+    names = [name for name, _ in events]
+    assert names[:2] == ["title", "description"]
+    assert names.count("ingredient") == len(SAMPLE_RECIPE_ARGUMENTS["ingredients"])
+    assert names.count("direction") == len(SAMPLE_RECIPE_ARGUMENTS["directions"])
+    assert names[-1] == "recipe"
+    recipe = events[-1][1]
+    assert recipe["title"] == SAMPLE_RECIPE_ARGUMENTS["title"]
+    assert len(recipe["ingredients"]) == len(SAMPLE_RECIPE_ARGUMENTS["ingredients"])
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/{recipe['id']}",
+        headers=normal_user_token_headers,
+    )
+    assert r.status_code == 200
+
+
+def _read_events(text: str) -> list[tuple[str, Any]]:
+    return [
+        (
+            block.split("\n")[0].removeprefix("event: "),
+            json.loads(block.split("\n")[1].removeprefix("data: ")),
+        )
+        for block in text.strip().split("\n\n")
+    ]
+
+
+def test_generate_recipe_batch(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    running: list[str] = []
+    peak = 0
+
+    async def call_openai(_: RecipeAIService, payload: dict[str, Any]) -> Any:
+        nonlocal peak
+        prompt = payload["messages"][1]["content"]
+        running.append(prompt)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.05)
+        running.remove(prompt)
+        if "broken" in prompt:
+            raise RuntimeError("Failed to extract recipe JSON from OpenAI response")
+        return dict(SAMPLE_RECIPE_ARGUMENTS, title=prompt.rsplit(" ", 1)[-1])
+
+    monkeypatch.setattr(RecipeAIService, "_call_openai", call_openai)
+    monkeypatch.setattr(settings, "RECIPE_BATCH_CONCURRENCY", 2)
+    prompts = [random_lower_string() for _ in range(4)] + ["broken"]
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate/batch",
+        headers=headers,
+        json={"prompts": prompts, "language": "en"},
+    )
+    assert r.status_code == 200
+    events = _read_events(r.text)
+    assert peak == 2
+
+    items = {data["index"]: data["recipe"] for name, data in events if name == "item"}
+    titles = {index: item["title"] for index, item in items.items()}
+    assert titles == dict(enumerate(prompts[:4]))
+    assert [data for name, data in events if name == "error"] == [
+        {"index": 4, "detail": "Recipe generation failed"}
+    ]
+    name, done = events[-1]
+    assert name == "done"
+    assert [recipe and recipe["title"] for recipe in done["recipes"]] == [
+        *prompts[:4],
+        None,
+    ]
+    for recipe in done["recipes"][:4]:
+        r = client.get(f"{settings.API_V1_STR}/recipes/{recipe['id']}", headers=headers)
+        assert r.status_code == 200
+
+
+def test_generate_recipe_batch_with_count(
+    client: TestClient, db: Session, openai_stub: OpenAIStub
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    sent = len(openai_stub.requests)
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate/batch",
+        headers=headers,
+        json={"user_input": "a week of dinners", "count": 3},
+    )
+    assert r.status_code == 200
+    name, done = _read_events(r.text)[-1]
+    assert name == "done"
+    assert len({recipe["id"] for recipe in done["recipes"]}) == 3
+    # Neither cached nor coalesced: each one is generated
+    assert len(openai_stub.requests) == sent + 3
+
+
+@pytest.mark.parametrize(
+    "body, status_code",
+    [
+        ({"prompts": ["crêpes"], "user_input": "crêpes", "count": 2}, 422),
+        ({"user_input": "crêpes"}, 422),
+        ({}, 422),
+        ({"user_input": "crêpes", "count": 0}, 422),
+        ({"user_input": "crêpes", "count": 22}, 400),
+    ],
+)
+def test_generate_recipe_batch_invalid(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    body: dict[str, Any],
+    status_code: int,
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate/batch",
+        headers=normal_user_token_headers,
+        json=body,
+    )
+    assert r.status_code == status_code
+
+
+@pytest.mark.usefixtures("openai_stub")
+def test_generation_holds_no_connection_during_llm_call(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    owner, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, owner)
+    checked_out: list[int] = []
+    post = RecipeAIService._post_chat_completion
+
+    async def recording_post(payload: dict[str, Any]) -> dict[str, Any]:
+        checked_out.append(engine.pool.checkedout())  # type: ignore[attr-defined]
+        return await post(payload)
+
+    monkeypatch.setattr(
+        RecipeAIService, "_post_chat_completion", staticmethod(recording_post)
+    )
+    # Cold auth cache: the user is loaded from the database first
+    auth_cache.clear()
+    baseline = engine.pool.checkedout()  # type: ignore[attr-defined]
+    for path, body in [
+        ("/recipes/generate", {"user_input": random_lower_string()}),
+        ("/recipes/generate-public", {"user_input": random_lower_string()}),
+        (f"/recipes/{recipe.id}/improve", {"user_input": "less sugar"}),
+    ]:
+        r = client.post(f"{settings.API_V1_STR}{path}", headers=headers, json=body)
+        assert r.status_code == 200
+    assert checked_out == [baseline] * 3
+
+
+@pytest.mark.usefixtures("openai_stub")
+def test_generate_recipe_in_background(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate?background=true",
+        headers=headers,
+        json={"user_input": random_lower_string(), "language": "fr"},
+    )
+    assert r.status_code == 202
+    job = r.json()
+    assert job["status"] in ("queued", "running")
+    assert r.headers["Location"] == f"{settings.API_V1_STR}/recipes/jobs/{job['id']}"
+
+    for _ in range(100):
+        job = client.get(r.headers["Location"], headers=headers).json()
+        if job["status"] not in ("queued", "running"):
+            break
+        time.sleep(0.05)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert job["recipe"]["title"] == SAMPLE_RECIPE_ARGUMENTS["title"]
+    assert len(job["recipe"]["ingredients"]) == len(
+        SAMPLE_RECIPE_ARGUMENTS["ingredients"]
+    )
+
+
+def test_generate_recipe_in_background_limits(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    url = f"{settings.API_V1_STR}/recipes/generate?background=true"
+
+    monkeypatch.setattr(settings, "RECIPE_JOB_MAX_PER_USER", 0)
+    r = client.post(url, headers=headers, json={"user_input": "crêpes"})
+    assert r.status_code == 429
+
+    monkeypatch.setattr(settings, "RECIPE_JOB_MAX_PER_USER", 3)
+    monkeypatch.setattr(settings, "RECIPE_JOB_MAX_PENDING", 0)
+    r = client.post(url, headers=headers, json={"user_input": "crêpes"})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "10"
+
+
+def test_generate_recipe_in_background_rejects_unsafe_input(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    url = f"{settings.API_V1_STR}/recipes/generate?background=true"
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    for callback_url in [
+        "http://example.com/hook",
+        "https://127.0.0.1/hook",
+        "https://localhost:8443/hook",
+        "https://169.254.169.254/latest/meta-data",
+        "https://[::1]/hook",
+    ]:
+        r = client.post(
+            url,
+            headers=headers,
+            json={"user_input": "crêpes", "callback_url": callback_url},
+        )
+        assert r.status_code == 400, callback_url
+
+    r = client.post(
+        url, headers=headers, json={"user_input": "crêpes", "language": "x" * 17}
+    )
+    assert r.status_code == 422
+
+
+def test_read_generation_job_of_another_user(client: TestClient, db: Session) -> None:
+    owner, _ = create_user_with_headers(client, db)
+    _, other_headers = create_user_with_headers(client, db)
+    job = crud.create_generation_job(
+        session=db,
+        job_create=RecipeGenerationJobBase(user_input="crêpes"),
+        owner_id=owner.id,
+    )
+    # Not for the workers of this test module, which have no LLM stub
+    job.status = "failed"
+    db.add(job)
+    db.commit()
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/jobs/{job.id}", headers=other_headers
+    )
+    assert r.status_code == 403
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/jobs/{uuid.uuid4()}", headers=other_headers
+    )
+    assert r.status_code == 404
+
+
+def test_generate_recipe_cache_hit(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    superuser_token_headers: dict[str, str],
+    openai_stub: OpenAIStub,
+) -> None:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate",
+        headers=normal_user_token_headers,
+        json={"user_input": "Cached crêpes", "language": "fr"},
+    )
+    first = r.json()
+    calls = len(openai_stub.requests)
+    hits = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=superuser_token_headers
+    ).json()["recipe_generation_cache_hits_total"]
+
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/generate",
+        headers=normal_user_token_headers,
+        json={"user_input": " cached  CREPES ", "language": "fr-FR"},
+    )
+    assert r.status_code == 200
+    second = r.json()
+    assert len(openai_stub.requests) == calls
+    assert second["id"] != first["id"]
+    assert second["title"] == first["title"]
+    assert len(second["ingredients"]) == len(first["ingredients"])
+    metrics = client.get(
+        f"{settings.API_V1_STR}/utils/metrics/", headers=superuser_token_headers
+    ).json()
+    assert metrics["recipe_generation_cache_hits_total"] == hits + 1
+
+
+def test_read_recipes_statement_count_is_constant(
+    client: TestClient, db: Session
+) -> None:
+    user, headers = create_user_with_headers(client, db)
+    for _ in range(2):
+        create_random_recipe(db, user)
+    with count_statements() as first:
+        client.get(f"{settings.API_V1_STR}/recipes/", headers=headers)
+    with count_statements() as few:
+        r = client.get(f"{settings.API_V1_STR}/recipes/", headers=headers)
+    assert r.json()["count"] == 2
+
+    for _ in range(8):
+        create_random_recipe(db, user)
+    with count_statements() as many:
+        r = client.get(f"{settings.API_V1_STR}/recipes/", headers=headers)
+    content = r.json()
+    assert content["count"] == 10
+    assert all(len(recipe["ingredients"]) == 3 for recipe in content["data"])
+    assert all(recipe["user"]["id"] == str(user.id) for recipe in content["data"])
+    # count, recipes joined with owner, ingredients, directions; the current
+    # user is only loaded on the first request, then served by the auth cache
+    assert len(first) == 5
+    assert len(few) == len(many) == 4
+
+
+def test_read_recipes_cursor_pagination(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipes = [create_random_recipe(db, user) for _ in range(5)]
+    expected = [
+        str(recipe.id)
+        for recipe in sorted(
+            recipes, key=lambda recipe: (recipe.created_at, recipe.id), reverse=True
+        )
+    ]
+
+    seen: list[str] = []
+    params: dict[str, str | int] = {"pagination": "cursor", "limit": 2}
+    while True:
+        r = client.get(
+            f"{settings.API_V1_STR}/recipes/", headers=headers, params=params
+        )
+        assert r.status_code == 200
+        content = r.json()
+        assert content["count"] == 5
+        seen += [recipe["id"] for recipe in content["data"]]
+        if content["next_cursor"] is None:
+            break
+        params = {"cursor": content["next_cursor"], "limit": 2}
+    assert seen == expected
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/",
+        headers=headers,
+        params={"pagination": "cursor", "include_count": False},
+    )
+    assert r.json()["count"] is None
+
+
+def test_read_recipes_invalid_cursor(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/", headers=headers, params={"cursor": "nope"}
+    )
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
+
+
+def test_read_recipes_favorites(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    create_random_recipe(db, user)
+    favorite = create_random_recipe(db, user, is_favorite=True)
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/",
+        headers=headers,
+        params={"is_favorite": True},
+    )
+    content = r.json()
+    assert content["count"] == 1
+    assert [recipe["id"] for recipe in content["data"]] == [str(favorite.id)]
+
+
+def create_recipe_with(
+    client: TestClient, headers: dict[str, str], title: str, ingredients: list[str]
+) -> str:
+    r = client.post(
+        f"{settings.API_V1_STR}/recipes/",
+        headers=headers,
+        json={
+            "title": title,
+            "description": "A recipe to search for",
+            "preparation_time": 10,
+            "serves": 2,
+            "language": "en",
+            "ingredients": [
+                {"index": i, "content": content}
+                for i, content in enumerate(ingredients)
+            ],
+        },
+    )
+    assert r.status_code == 200
+    recipe_id: str = r.json()["id"]
+    return recipe_id
+
+
+def test_search_recipes(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    _, other_headers = create_user_with_headers(client, db)
+    tart = create_recipe_with(client, headers, "Lemon tart", ["3 lemons", "sugar"])
+    cake = create_recipe_with(client, headers, "Sponge cake", ["2 lemons", "flour"])
+    create_recipe_with(client, headers, "Tomato soup", ["tomatoes"])
+    create_recipe_with(client, other_headers, "Lemon curd", ["lemons"])
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search", headers=headers, params={"q": "lemon"}
+    )
+    assert r.status_code == 200
+    content = r.json()
+    # Title matches rank above ingredient matches; other users' recipes are hidden
+    assert [recipe["id"] for recipe in content["data"]] == [tart, cake]
+    assert content["next_cursor"] is None
+
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search",
+        headers=headers,
+        params={"q": "lemon", "limit": 1},
+    )
+    first = r.json()
+    assert [recipe["id"] for recipe in first["data"]] == [tart]
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search",
+        headers=headers,
+        params={"q": "lemon", "limit": 1, "cursor": first["next_cursor"]},
+    )
+    assert [recipe["id"] for recipe in r.json()["data"]] == [cake]
+
+
+def test_search_recipes_follows_updates(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    recipe_id = create_recipe_with(client, headers, "Soup", ["leeks"])
+    client.put(
+        f"{settings.API_V1_STR}/recipes/{recipe_id}",
+        headers=headers,
+        json={"ingredients": [{"index": 0, "content": "pumpkin"}]},
+    )
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search",
+        headers=headers,
+        params={"q": "pumpkins"},
+    )
+    assert [recipe["id"] for recipe in r.json()["data"]] == [recipe_id]
+
+
+def test_search_recipes_fuzzy_fallback(client: TestClient, db: Session) -> None:
+    if not crud.has_trigram_support(session=db):
+        pytest.skip("pg_trgm is not installed")
+    _, headers = create_user_with_headers(client, db)
+    recipe_id = create_recipe_with(client, headers, "Ratatouille", ["zucchini"])
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search",
+        headers=headers,
+        params={"q": "ratatouile"},
+    )
+    assert [recipe["id"] for recipe in r.json()["data"]] == [recipe_id]
+
+
+def test_search_recipes_invalid_cursor(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    r = client.get(
+        f"{settings.API_V1_STR}/recipes/search",
+        headers=headers,
+        params={"q": "lemon", "cursor": "nope"},
+    )
+    assert r.status_code == 400
+
+
+def test_read_recipe_statement_count(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user)
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    with count_statements() as statements:
+        r = client.get(f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()["directions"]) == 2
+    # recipe joined with owner, ingredients, directions
+    assert len(statements) == 3
+
+
+def test_read_recipes_serialize_only_the_public_fields(
+    client: TestClient, db: Session
+) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user)
+    r = client.get(f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers)
+    assert r.headers["Content-Type"] == "application/json"
+    # Serialized from the ORM objects without FastAPI's response_model pass
+    data = r.json()
+    stored = db.get(Recipe, recipe.id)
+    assert data == RecipePublic.model_validate(stored).model_dump(mode="json")
+    assert data.keys() == RecipePublic.model_fields.keys()
+    assert data["user"].keys() == UserPublic.model_fields.keys()
+    assert data["ingredients"][0].keys() == IngredientPublic.model_fields.keys()
+    r = client.get(f"{settings.API_V1_STR}/recipes/", headers=headers)
+    assert r.json()["data"] == [data]
+
+
+def test_patch_recipe_returns_only_the_changes(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user, ingredients=3, directions=2)
+    r = client.get(f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers)
+    etag = r.headers["ETag"]
+
+    r = client.patch(
+        f"{settings.API_V1_STR}/recipes/{recipe.id}",
+        headers={**headers, "If-Match": etag},
+        json=[
+            {"op": "replace", "path": "/is_favorite", "value": True},
+            {"op": "replace", "path": "/serves", "value": recipe.serves},
+            {"op": "move", "from": "/directions/1", "path": "/directions/0"},
+        ],
+    )
+    assert r.status_code == 200
+    changes = r.json()
+    assert set(changes) == {"id", "updated_at", "is_favorite", "directions"}
+    assert changes["is_favorite"] is True
+    assert [direc["content"] for direc in changes["directions"]] == [
+        recipe.directions[1].content,
+        recipe.directions[0].content,
+    ]
+    assert r.headers["ETag"] != etag
+
+    etag = r.headers["ETag"]
+    r = client.get(f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers)
+    assert r.json()["is_favorite"] is True
+    assert r.json()["updated_at"] == changes["updated_at"]
+    assert r.headers["ETag"] == etag
+
+    # Nothing changes: neither does the ETag
+    r = client.patch(
+        f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers, json=[]
+    )
+    assert r.json() == {"id": str(recipe.id), "updated_at": changes["updated_at"]}
+    assert r.headers["ETag"] == etag
+
+
+def test_patch_recipe_preconditions(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user)
+    url = f"{settings.API_V1_STR}/recipes/{recipe.id}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+    favorite = [{"op": "replace", "path": "/is_favorite", "value": True}]
+
+    # Reads do not change the ETag
+    assert client.get(url, headers=headers).headers["ETag"] == etag
+    r = client.patch(url, headers={**headers, "If-Match": etag}, json=favorite)
+    assert r.status_code == 200
+    # Another client still holding the first ETag
+    r = client.patch(
+        url,
+        headers={**headers, "If-Match": etag},
+        json=[{"op": "remove", "path": "/ingredients/0"}],
+    )
+    assert r.status_code == 412
+    assert len(client.get(url, headers=headers).json()["ingredients"]) == 3
+
+    r = client.patch(url, headers={**headers, "If-Match": "*"}, json=favorite)
+    assert r.status_code == 200
+    r = client.patch(
+        url,
+        headers={**headers, "If-Match": r.headers["ETag"]},
+        json=[{"op": "remove", "path": "/ingredients/0"}],
+    )
+    assert r.status_code == 200
+    assert len(r.json()["ingredients"]) == 2
+    r = client.patch(
+        url,
+        headers=headers,
+        json=[{"op": "remove", "path": "/ingredients/3"}],
+    )
+    assert r.status_code == 422
+
+    _, other_headers = create_user_with_headers(client, db)
+    r = client.patch(url, headers=other_headers, json=favorite)
+    assert r.status_code == 403
+
+
+def test_read_recipe_not_modified(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user)
+    url = f"{settings.API_V1_STR}/recipes/{recipe.id}"
+    r = client.get(url, headers=headers)
+    etag = r.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert r.headers["Cache-Control"] == "private, no-cache"
+
+    for if_none_match in [etag, f'"other", {etag.removeprefix("W/")}', "*"]:
+        with count_statements() as statements:
+            r = client.get(url, headers={**headers, "If-None-Match": if_none_match})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["ETag"] == etag
+        # The recipe joined with its owner, not its ingredients and directions
+        assert len(statements) == 1
+
+    client.patch(
+        url, headers=headers, json=[{"op": "remove", "path": "/ingredients/0"}]
+    )
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert len(r.json()["ingredients"]) == 2
+    assert r.headers["ETag"] != etag
+
+
+def test_read_recipes_not_modified(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipes = [create_random_recipe(db, user) for _ in range(3)]
+    url = f"{settings.API_V1_STR}/recipes/"
+    pages: list[dict[str, str | int]] = [{}, {"pagination": "cursor", "limit": 2}]
+    for params in pages:
+        r = client.get(url, headers=headers, params=params)
+        etag = r.headers["ETag"]
+        assert r.headers["Cache-Control"] == "private, no-cache"
+        with count_statements() as statements:
+            r = client.get(
+                url, headers={**headers, "If-None-Match": etag}, params=params
+            )
+        assert r.status_code == 304
+        # The count and the recipes joined with their owner
+        assert len(statements) == 2
+
+    r = client.get(url, headers=headers)
+    etag = r.headers["ETag"]
+    client.patch(
+        f"{settings.API_V1_STR}/recipes/{recipes[1].id}",
+        headers=headers,
+        json=[{"op": "replace", "path": "/is_favorite", "value": True}],
+    )
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    etag = r.headers["ETag"]
+
+    client.delete(f"{settings.API_V1_STR}/recipes/{recipes[0].id}", headers=headers)
+    r = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["count"] == 2
+
+
+def test_update_recipe_statement_count(client: TestClient, db: Session) -> None:
+    user, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, user)
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    with count_statements() as statements:
+        r = client.put(
+            f"{settings.API_V1_STR}/recipes/{recipe.id}",
+            headers=headers,
+            json={"title": "Updated", "ingredients": [{"index": 0, "content": "salt"}]},
+        )
+    assert r.status_code == 200
+    content = r.json()
+    assert content["title"] == "Updated"
+    assert [ing["content"] for ing in content["ingredients"]] == ["salt"]
+    # Updated in place
+    assert content["ingredients"][0]["id"] == str(recipe.ingredients[0].id)
+    assert content["user"]["id"] == str(user.id)
+    # recipe, UPDATE, the stored ingredients, UPDATE the first + DELETE the
+    # others, then the reload: recipe joined with owner, ingredients, directions
+    assert len(statements) == 8
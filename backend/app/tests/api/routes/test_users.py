@@ -9,7 +9,8 @@ from app.core.config import settings
 from app.core.security import verify_password
 from app.models import User
 from app.schemas.user_schemas import UserCreate
-from app.tests.utils.utils import random_email, random_lower_string
+from app.tests.utils.user import create_user_with_headers
+from app.tests.utils.utils import count_statements, random_email, random_lower_string
 
 
 def test_get_users_superuser_me(
@@ -169,6 +170,38 @@ def test_retrieve_users(
         assert "email" in item
 
 
+def test_retrieve_users_cursor_pagination(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        user_in = UserCreate(email=random_email(), password=random_lower_string())
+        crud.create_user(session=db, user_create=user_in)
+    expected = sorted(user.email for user in db.exec(select(User)).all())
+
+    emails: list[str] = []
+    params: dict[str, str | int] = {"pagination": "cursor", "limit": 2}
+    while True:
+        r = client.get(
+            f"{settings.API_V1_STR}/users/",
+            headers=superuser_token_headers,
+            params=params,
+        )
+        assert r.status_code == 200
+        content = r.json()
+        emails += [item["email"] for item in content["data"]]
+        if content["next_cursor"] is None:
+            break
+        params = {"cursor": content["next_cursor"], "limit": 2}
+    assert emails == expected
+
+    r = client.get(
+        f"{settings.API_V1_STR}/users/",
+        headers=superuser_token_headers,
+        params={"cursor": "bm9wZQ"},
+    )
+    assert r.status_code == 400
+
+
 def test_update_user_me(
     client: TestClient, normal_user_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -539,3 +572,42 @@ def test_get_current_user_soft_deleted(client: TestClient, db: Session) -> None:
     r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
     assert r.status_code == 400
     assert r.json()["detail"] == "User account has been deleted"
+
+
+def test_current_user_is_served_from_auth_cache(
+    client: TestClient, db: Session
+) -> None:
+    _, headers = create_user_with_headers(client, db)
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    with count_statements() as statements:
+        r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 200
+    assert statements == []
+
+
+def test_update_user_me_invalidates_auth_cache(client: TestClient, db: Session) -> None:
+    _, headers = create_user_with_headers(client, db)
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    client.patch(
+        f"{settings.API_V1_STR}/users/me",
+        headers=headers,
+        json={"full_name": "Renamed"},
+    )
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.json()["full_name"] == "Renamed"
+
+
+def test_superuser_update_invalidates_auth_cache(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    user, headers = create_user_with_headers(client, db)
+    client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    r = client.patch(
+        f"{settings.API_V1_STR}/users/{user.id}",
+        headers=superuser_token_headers,
+        json={"is_active": False},
+    )
+    assert r.status_code == 200
+    r = client.get(f"{settings.API_V1_STR}/users/me", headers=headers)
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Inactive user"
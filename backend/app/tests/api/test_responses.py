@@ -0,0 +1,14 @@
+import orjson
+import pytest
+
+from app.api.responses import RECIPES_PUBLIC
+
+
+def test_dict_missing_optional_fields() -> None:
+    content = RECIPES_PUBLIC.dump_json({"data": []})
+    assert orjson.loads(content) == {"data": [], "count": None, "next_cursor": None}
+
+
+def test_dict_missing_required_field() -> None:
+    with pytest.raises(ValueError, match="'data'"):
+        RECIPES_PUBLIC.dump_json({"count": 0})
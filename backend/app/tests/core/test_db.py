@@ -0,0 +1,73 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.core.db import create_db_engine, engine
+from app.core.metrics import metrics
+
+
+def test_pool_exhaustion_times_out() -> None:
+    small = create_db_engine(pool_size=1, max_overflow=1, pool_timeout=0.2)
+    try:
+        held = [small.connect(), small.connect()]
+        start = time.perf_counter()
+        with pytest.raises(PoolTimeoutError):
+            small.connect()
+        assert time.perf_counter() - start < 2
+
+        held.pop().close()
+        with small.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+        held.pop().close()
+    finally:
+        small.dispose()
+
+
+def test_statement_timeout_cancels_slow_queries() -> None:
+    strict = create_db_engine(statement_timeout_ms=100)
+    try:
+        with strict.connect() as conn:
+            with pytest.raises(OperationalError, match="statement timeout"):
+                conn.execute(text("SELECT pg_sleep(2)"))
+    finally:
+        strict.dispose()
+
+
+def test_pool_metrics() -> None:
+    before = metrics.snapshot()
+    with Session(engine) as session:
+        session.exec(text("SELECT 1"))  # type: ignore[call-overload]
+        assert metrics.snapshot()["db_pool_checked_out"] >= 1
+    after = metrics.snapshot()
+    # Background flushers may check out connections too
+    assert after["db_pool_checkouts_total"] >= before["db_pool_checkouts_total"] + 1
+    assert after["db_pool_checkins_total"] >= before["db_pool_checkins_total"] + 1
+    assert after["db_pool_size"] == settings.POSTGRES_POOL_SIZE
+
+
+def test_exhausted_pool_returns_503(
+    client: TestClient,
+    normal_user_token_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    small = create_db_engine(pool_size=1, max_overflow=0, pool_timeout=0.1)
+    monkeypatch.setattr(deps, "engine", small)
+    held = small.connect()
+    try:
+        before = metrics.snapshot()["db_pool_timeouts_total"]
+        r = client.get(
+            f"{settings.API_V1_STR}/recipes/", headers=normal_user_token_headers
+        )
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "1"
+        assert metrics.snapshot()["db_pool_timeouts_total"] == before + 1
+    finally:
+        held.close()
+        small.dispose()
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.hashing import HashingExecutor, PasswordHashingBusy
+from app.core.security import get_password_hash, password_hasher, verify_password
+
+
+def test_process_pool_hashes_and_verifies() -> None:
+    executor = HashingExecutor(workers=1, max_pending=4)
+
+    async def scenario() -> bool:
+        hashed = await executor.run(get_password_hash, "secret-password")
+        return await executor.run(verify_password, "secret-password", hashed)
+
+    try:
+        assert asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_rejects_beyond_max_pending() -> None:
+    executor = HashingExecutor(workers=0, max_pending=1)
+
+    async def scenario() -> None:
+        first = asyncio.ensure_future(executor.run(get_password_hash, "one"))
+        await asyncio.sleep(0)
+        assert executor.pending == 1
+        with pytest.raises(PasswordHashingBusy):
+            await executor.run(get_password_hash, "two")
+        await first
+        assert executor.pending == 0
+
+    asyncio.run(scenario())
+
+
+def test_login_returns_503_when_hashing_is_saturated(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    r = client.post(
+        f"{settings.API_V1_STR}/login/access-token",
+        data={
+            "username": settings.FIRST_SUPERUSER,
+            "password": settings.FIRST_SUPERUSER_PASSWORD,
+        },
+    )
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
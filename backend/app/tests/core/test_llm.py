@@ -0,0 +1,174 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any, TypeVar
+
+import httpx
+import pytest
+
+from app.core.llm import CircuitBreaker, CircuitOpenError, OpenAITransport
+from app.tests.utils.openai_stub import OpenAIStub
+
+T = TypeVar("T")
+
+PAYLOAD = {"model": "gpt-4o", "messages": [], "functions": [{}]}
+
+
+@pytest.fixture
+def stub() -> Iterator[tuple[OpenAIStub, str]]:
+    openai_stub = OpenAIStub()
+    with openai_stub.serve() as base_url:
+        yield openai_stub, base_url
+
+
+def call(
+    base_url: str,
+    scenario: Callable[[OpenAITransport], Awaitable[T]],
+    *,
+    breaker: CircuitBreaker | None = None,
+    **kwargs: Any,
+) -> T:
+    options: dict[str, Any] = {
+        "max_attempts": 3,
+        "deadline": 10,
+        "backoff_initial": 0.01,
+        "backoff_max": 0.05,
+    }
+    options.update(kwargs)
+
+    async def run() -> T:
+        async with httpx.AsyncClient(base_url=base_url) as client:
+            transport = OpenAITransport(
+                lambda: client,
+                breaker
+                or CircuitBreaker("test", failure_threshold=100, reset_timeout=60),
+                **options,
+            )
+            return await scenario(transport)
+
+    return asyncio.run(run())
+
+
+def post(transport: OpenAITransport) -> Awaitable[dict[str, Any]]:
+    return transport.post("/chat/completions", PAYLOAD)
+
+
+def test_server_errors_are_retried(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=500)
+    openai_stub.fail_next(1, status_code=503)
+    data = call(base_url, post)
+    assert data["choices"][0]["message"]["function_call"]["name"] == "create_recipe"
+    assert len(openai_stub.requests) == 3
+
+
+def test_gives_up_after_max_attempts(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(5, status_code=502)
+    with pytest.raises(httpx.HTTPStatusError) as exc_info:
+        call(base_url, post)
+    assert exc_info.value.response.status_code == 502
+    assert len(openai_stub.requests) == 3
+
+
+def test_client_errors_are_not_retried(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=400)
+    with pytest.raises(httpx.HTTPStatusError):
+        call(base_url, post)
+    assert len(openai_stub.requests) == 1
+
+
+def test_retry_after_is_honored(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=429, headers={"Retry-After": "1"})
+    start = time.perf_counter()
+    call(base_url, post)
+    assert time.perf_counter() - start >= 1
+    assert len(openai_stub.requests) == 2
+
+
+def test_retry_after_beyond_the_deadline_is_not_waited_for(
+    stub: tuple[OpenAIStub, str],
+) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=429, headers={"Retry-After": "30"})
+    start = time.perf_counter()
+    with pytest.raises(httpx.HTTPStatusError):
+        call(base_url, post, deadline=5)
+    assert time.perf_counter() - start < 1
+    assert len(openai_stub.requests) == 1
+
+
+def test_deadline_bounds_a_hanging_call(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=200, delay=10)
+    start = time.perf_counter()
+    with pytest.raises(httpx.TimeoutException):
+        call(base_url, post, deadline=0.5)
+    assert time.perf_counter() - start < 2
+
+
+def test_stream_is_retried_before_the_first_byte(
+    stub: tuple[OpenAIStub, str],
+) -> None:
+    openai_stub, base_url = stub
+    openai_stub.fail_next(1, status_code=503)
+
+    async def stream(transport: OpenAITransport) -> str:
+        async with transport.stream(
+            "/chat/completions", {**PAYLOAD, "stream": True}
+        ) as response:
+            return (await response.aread()).decode()
+
+    body = call(base_url, stream)
+    assert body.endswith("data: [DONE]\n\n")
+    assert '"name": "create_recipe"' in body
+    assert len(openai_stub.requests) == 2
+
+
+def test_circuit_opens_fails_fast_and_recovers(stub: tuple[OpenAIStub, str]) -> None:
+    openai_stub, base_url = stub
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=0.5)
+    openai_stub.fail_next(2, status_code=503)
+    # Opened by the second failure: the third attempt is not made
+    with pytest.raises(CircuitOpenError):
+        call(base_url, post, breaker=breaker)
+    assert breaker.state == "open"
+    assert len(openai_stub.requests) == 2
+
+    # Open: no request reaches OpenAI
+    with pytest.raises(CircuitOpenError) as exc_info:
+        call(base_url, post, breaker=breaker)
+    assert 0 < exc_info.value.retry_after <= 0.5
+    assert len(openai_stub.requests) == 2
+
+    # Half-open: a failed probe opens it again at once
+    time.sleep(0.5)
+    openai_stub.fail_next(1, status_code=503)
+    with pytest.raises(CircuitOpenError):
+        call(base_url, post, breaker=breaker)
+    assert breaker.state == "open"
+    assert len(openai_stub.requests) == 3
+
+    # ... and a successful one closes it
+    time.sleep(0.5)
+    call(base_url, post, breaker=breaker)
+    assert breaker.state == "closed"
+    call(base_url, post, breaker=breaker)
+    assert len(openai_stub.requests) == 5
+
+
+def test_half_open_circuit_lets_a_single_probe_through() -> None:
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    breaker.before_call()
+    breaker.record(False)
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    # A cancelled probe says nothing about OpenAI: another one may go
+    breaker.record(None)
+    breaker.before_call()
+    breaker.record(True)
+    assert breaker.state == "closed"
@@ -0,0 +1,41 @@
+from passlib.hash import bcrypt
+
+from app.core.security import make_password_context
+
+
+def test_hashes_with_first_scheme_and_upgrades_others() -> None:
+    context = make_password_context(
+        ["argon2", "bcrypt"],
+        bcrypt_rounds=4,
+        argon2_memory_cost=1024,
+        argon2_time_cost=1,
+        argon2_parallelism=1,
+    )
+    hashed = context.hash("secret-password")
+    assert hashed.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+    assert not context.needs_update(hashed)
+
+    legacy = bcrypt.using(rounds=4).hash("secret-password")
+    verified, upgraded = context.verify_and_update("secret-password", legacy)
+    assert verified
+    assert upgraded and upgraded.startswith("$argon2id$")
+
+
+def test_cost_change_requires_update() -> None:
+    cheap = make_password_context(
+        ["argon2", "bcrypt"],
+        bcrypt_rounds=4,
+        argon2_memory_cost=1024,
+        argon2_time_cost=1,
+        argon2_parallelism=1,
+    )
+    costlier = make_password_context(
+        ["bcrypt", "argon2"],
+        bcrypt_rounds=5,
+        argon2_memory_cost=2048,
+        argon2_time_cost=1,
+        argon2_parallelism=1,
+    )
+    assert costlier.needs_update(cheap.hash("secret-password"))
+    assert costlier.needs_update(bcrypt.using(rounds=4).hash("secret-password"))
+    assert costlier.verify("secret-password", cheap.hash("secret-password"))
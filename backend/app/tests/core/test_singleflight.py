@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+from app.core.db import create_db_engine, engine
+from app.core.singleflight import PostgresSingleFlight, SingleFlight
+from app.tests.utils.utils import random_lower_string
+
+
+def test_concurrent_calls_share_one_call() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    calls: list[str] = []
+
+    async def fn() -> str:
+        calls.append("call")
+        await asyncio.sleep(0.05)
+        return "crêpes"
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["crêpes"] * 10
+    assert calls == ["call"]
+    assert flight.in_flight == 0
+    # Later calls are not coalesced with finished ones
+    asyncio.run(scenario())
+    assert calls == ["call", "call"]
+
+
+def test_failure_is_shared_and_not_remembered() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+    calls: list[str] = []
+
+    async def fn() -> str:
+        calls.append("call")
+        await asyncio.sleep(0.05)
+        raise RuntimeError("OpenAI is down")
+
+    async def scenario() -> list[str | BaseException]:
+        return await asyncio.gather(
+            *(flight.do("key", fn) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert [str(r) for r in results] == ["OpenAI is down"] * 3
+    assert calls == ["call"]
+    assert flight.in_flight == 0
+
+
+def test_cancelled_caller_does_not_cancel_the_others() -> None:
+    flight: SingleFlight[str] = SingleFlight("test")
+
+    async def fn() -> str:
+        await asyncio.sleep(0.1)
+        return "crêpes"
+
+    async def scenario() -> str:
+        first = asyncio.create_task(flight.do("key", fn))
+        second = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "crêpes"
+
+
+def test_postgres_flight_coalesces_across_processes() -> None:
+    # Two flights stand for two workers sharing a store
+    store: dict[str, str] = {}
+    calls: list[str] = []
+    key = f"test:{random_lower_string()}"
+    # Lock engines of a single connection: the holder and the waiters of a
+    # worker would time out if any of them needed a second one
+    flights = [
+        PostgresSingleFlight[str](
+            "test",
+            create_db_engine(pool_size=1, max_overflow=0, pool_timeout=1),
+            poll_interval=0.01,
+        )
+        for _ in range(2)
+    ]
+
+    async def fn() -> str:
+        calls.append("call")
+        await asyncio.sleep(0.2)
+        store[key] = "crêpes"
+        return "crêpes"
+
+    async def recheck() -> str | None:
+        return store.get(key)
+
+    async def scenario() -> list[str]:
+        return await asyncio.gather(
+            *(flight.do(key, fn, recheck=recheck) for flight in flights for _ in "ab")
+        )
+
+    assert asyncio.run(scenario()) == ["crêpes"] * 4
+    assert calls == ["call"]
+
+    # The lock was released: the next holder calls again once the store is empty
+    store.clear()
+    assert asyncio.run(scenario()) == ["crêpes"] * 4
+    assert calls == ["call", "call"]
+    for flight in flights:
+        flight.close()
+        flight.engine.dispose()
+
+
+def test_postgres_flight_falls_back_to_calling_when_holder_failed() -> None:
+    calls: list[str] = []
+    key = f"test:{random_lower_string()}"
+    flights = [
+        PostgresSingleFlight[str]("test", engine, poll_interval=0.01) for _ in range(2)
+    ]
+
+    async def fn() -> str:
+        calls.append("call")
+        await asyncio.sleep(0.1)
+        if len(calls) == 1:
+            raise RuntimeError("OpenAI is down")
+        return "crêpes"
+
+    async def recheck() -> str | None:
+        return None
+
+    async def scenario() -> list[str | BaseException]:
+        return await asyncio.gather(
+            *(flight.do(key, fn, recheck=recheck) for flight in flights),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(scenario())
+    assert sorted(map(str, results)) == ["OpenAI is down", "crêpes"]
+    assert calls == ["call", "call"]
+    for flight in flights:
+        flight.close()
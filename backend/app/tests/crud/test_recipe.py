@@ -0,0 +1,150 @@
+from sqlmodel import Session, select
+
+from app import crud
+from app.models import Ingredient, Recipe
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipePublic,
+    RecipeUpdate,
+)
+from app.tests.utils.recipe import create_random_recipe
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import count_statements
+
+
+def test_create_recipe(db: Session) -> None:
+    user = create_random_user(db)
+    recipe = create_random_recipe(db, user, ingredients=5, directions=4)
+    stored = db.get(Recipe, recipe.id)
+    assert stored
+    assert stored.user_id == user.id
+    assert len(stored.ingredients) == 5
+    assert len(stored.directions) == 4
+    ingredient_ids = db.exec(
+        select(Ingredient.id).where(Ingredient.recipe_id == recipe.id)
+    ).all()
+    assert set(ingredient_ids) == {ing.id for ing in recipe.ingredients}
+
+
+def test_create_recipe_single_round_trip_per_table(db: Session) -> None:
+    user = create_random_user(db)
+    user_id = user.id
+    db.expunge(user)
+    with count_statements() as statements:
+        recipe = create_random_recipe(db, user, ingredients=20, directions=15)
+        public = RecipePublic.model_validate(recipe)
+    assert len(statements) == 3
+    assert all(statement.startswith("INSERT") for statement in statements)
+    assert public.user and public.user.id == user_id
+    assert len(public.ingredients) == 20
+
+
+def test_create_recipes_single_round_trip_per_table(db: Session) -> None:
+    user = create_random_user(db)
+    recipe_creates = [
+        RecipeCreate(
+            title=f"Dinner {day}",
+            description="",
+            preparation_time=10,
+            serves=2,
+            ingredients=[IngredientCreate(index=i, content="rice") for i in range(3)],
+        )
+        for day in range(7)
+    ]
+    with count_statements() as statements:
+        recipes = crud.create_recipes(
+            session=db, recipe_creates=recipe_creates, owner=user
+        )
+    # No directions: nothing is sent for them
+    assert len(statements) == 2
+    assert [recipe.title for recipe in recipes] == [f"Dinner {d}" for d in range(7)]
+    for recipe in recipes:
+        stored = db.get(Recipe, recipe.id)
+        assert stored and len(stored.ingredients) == 3
+
+
+def test_update_recipe_only_writes_changed_lines(db: Session) -> None:
+    user = create_random_user(db)
+    recipe = create_random_recipe(db, user, ingredients=4, directions=2)
+    ingredients = [
+        IngredientCreate(index=ing.index, content=ing.content)
+        for ing in recipe.ingredients
+    ]
+    directions = [
+        DirectionCreate(index=direc.index, content=direc.content)
+        for direc in recipe.directions
+    ]
+    db_recipe = db.get(Recipe, recipe.id)
+    assert db_recipe
+
+    # An unchanged autosave only reads the stored lines
+    with count_statements() as statements:
+        crud.update_recipe(
+            session=db,
+            db_recipe=db_recipe,
+            recipe_in=RecipeUpdate(ingredients=ingredients, directions=directions),
+        )
+    assert len(statements) == 2
+    assert all(statement.startswith("SELECT") for statement in statements)
+    assert db_recipe.updated_at == recipe.updated_at
+
+    ingredients[1].content = "2 pinches of salt"
+    del ingredients[2]
+    ingredients.append(IngredientCreate(index=4, content="pepper"))
+    db.refresh(db_recipe)
+    with count_statements() as statements:
+        crud.update_recipe(
+            session=db,
+            db_recipe=db_recipe,
+            recipe_in=RecipeUpdate(title="Updated", ingredients=ingredients),
+        )
+    assert [statement.split()[0] for statement in statements] == [
+        "SELECT",
+        "UPDATE",
+        "INSERT",
+        "DELETE",
+        "UPDATE",
+    ]
+
+    db.expire_all()
+    updated = db.get(Recipe, recipe.id)
+    assert updated and updated.title == "Updated"
+    assert updated.updated_at > recipe.updated_at
+    stored = sorted(updated.ingredients, key=lambda ing: ing.index)
+    assert [(ing.index, ing.content) for ing in stored] == [
+        (ing.index, ing.content) for ing in ingredients
+    ]
+    # Kept and changed lines keep their ids
+    original_ids = {ing.index: ing.id for ing in recipe.ingredients}
+    assert [ing.id for ing in stored[:3]] == [
+        original_ids[0],
+        original_ids[1],
+        original_ids[3],
+    ]
+
+
+def test_update_recipe_matches_duplicate_indexes_in_order(db: Session) -> None:
+    user = create_random_user(db)
+    recipe = create_random_recipe(db, user, ingredients=1)
+    db_recipe = db.get(Recipe, recipe.id)
+    assert db_recipe
+    crud.update_recipe(
+        session=db,
+        db_recipe=db_recipe,
+        recipe_in=RecipeUpdate(
+            ingredients=[
+                IngredientCreate(index=0, content=recipe.ingredients[0].content),
+                IngredientCreate(index=0, content="salt"),
+            ]
+        ),
+    )
+    db.expire_all()
+    stored = db.exec(
+        select(Ingredient.id, Ingredient.content).where(
+            Ingredient.recipe_id == recipe.id
+        )
+    ).all()
+    assert len(stored) == 2
+    assert (recipe.ingredients[0].id, recipe.ingredients[0].content) in stored
@@ -1,8 +1,9 @@
 from fastapi.encoders import jsonable_encoder
+from passlib.hash import bcrypt
 from sqlmodel import Session
 
 from app import crud
-from app.core.security import verify_password
+from app.core.security import pwd_context, verify_password
 from app.models import User
 from app.schemas.user_schemas import UserCreate, UserUpdate
 from app.tests.utils.utils import random_email, random_lower_string
@@ -27,6 +28,22 @@ def test_authenticate_user(db: Session) -> None:
     assert user.email == authenticated_user.email
 
 
+def test_authenticate_upgrades_outdated_hash(db: Session) -> None:
+    email = random_email()
+    password = random_lower_string()
+    outdated = bcrypt.using(rounds=4).hash(password)
+    crud.create_user(
+        session=db,
+        user_create=UserCreate(email=email, password=password),
+        hashed_password=outdated,
+    )
+    user = crud.authenticate(session=db, email=email, password=password)
+    assert user
+    assert user.hashed_password != outdated
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert verify_password(password, user.hashed_password)
+
+
 def test_not_authenticate_user(db: Session) -> None:
     email = random_email()
     password = random_lower_string()
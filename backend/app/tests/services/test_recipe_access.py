@@ -0,0 +1,107 @@
+import asyncio
+import datetime
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.db import engine
+from app.models import Recipe
+from app.services.recipe_access import RecipeAccessTracker, recipe_access_tracker
+from app.tests.utils.recipe import create_random_recipe
+from app.tests.utils.user import create_random_user, create_user_with_headers
+from app.tests.utils.utils import count_statements
+
+
+def make_tracker(
+    *, flush_interval: float = 60, flush_events: int = 1000, max_pending: int = 100
+) -> RecipeAccessTracker:
+    return RecipeAccessTracker(
+        engine,
+        flush_interval=flush_interval,
+        flush_events=flush_events,
+        max_pending=max_pending,
+    )
+
+
+def reload(db: Session, recipe_id: uuid.UUID) -> Recipe:
+    recipe = db.get(Recipe, recipe_id, populate_existing=True)
+    assert recipe
+    return recipe
+
+
+def test_flush_coalesces_accesses(db: Session) -> None:
+    owner = create_random_user(db)
+    first = create_random_recipe(db, owner)
+    second = create_random_recipe(db, owner)
+    latest = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+    tracker = make_tracker()
+    tracker.record(first.id, latest)
+    tracker.record(first.id, latest - datetime.timedelta(minutes=5))
+    tracker.record(first.id)
+    tracker.record(second.id)
+    assert len(tracker) == 2
+
+    with count_statements() as statements:
+        assert tracker.flush() == 2
+    assert len([s for s in statements if s.startswith("UPDATE")]) == 1
+    assert len(tracker) == 0
+    assert tracker.flush() == 0
+
+    assert reload(db, first.id).number_of_accesses == 3
+    assert reload(db, first.id).last_accessed_at == latest
+    assert reload(db, second.id).number_of_accesses == 1
+
+
+def test_buffer_is_bounded(db: Session) -> None:
+    owner = create_random_user(db)
+    recipes = [create_random_recipe(db, owner) for _ in range(3)]
+
+    tracker = make_tracker(max_pending=2)
+    for recipe in recipes:
+        tracker.record(recipe.id)
+    # Already buffered recipes are still counted
+    tracker.record(recipes[0].id)
+    assert len(tracker) == 2
+    tracker.flush()
+
+    assert [reload(db, recipe.id).number_of_accesses for recipe in recipes] == [
+        2,
+        1,
+        0,
+    ]
+
+
+def test_flusher_runs_on_threshold_and_on_stop(db: Session) -> None:
+    owner = create_random_user(db)
+    recipe = create_random_recipe(db, owner)
+    tracker = make_tracker(flush_events=2)
+
+    async def scenario() -> None:
+        tracker.start()
+        tracker.record(recipe.id)
+        tracker.record(recipe.id)
+        for _ in range(50):
+            await asyncio.sleep(0.05)
+            if len(tracker) == 0:
+                break
+        assert len(tracker) == 0
+        tracker.record(recipe.id)
+        await tracker.stop()
+
+    asyncio.run(scenario())
+    assert reload(db, recipe.id).number_of_accesses == 3
+
+
+def test_read_recipe_records_access(client: TestClient, db: Session) -> None:
+    owner, headers = create_user_with_headers(client, db)
+    recipe = create_random_recipe(db, owner)
+    recipe_access_tracker.flush()
+    for _ in range(2):
+        r = client.get(f"{settings.API_V1_STR}/recipes/{recipe.id}", headers=headers)
+        assert r.status_code == 200
+
+    recipe_access_tracker.flush()
+    assert reload(db, recipe.id).number_of_accesses == 2
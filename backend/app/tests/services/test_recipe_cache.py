@@ -0,0 +1,77 @@
+from app.core.cache import MemoryCacheBackend, PostgresCacheBackend
+from app.core.db import engine
+from app.services.recipe_cache import (
+    RecipeGenerationCache,
+    RecipeResponseCache,
+    normalize_prompt,
+)
+from app.tests.utils.utils import random_lower_string
+
+
+def test_normalize_prompt() -> None:
+    assert normalize_prompt("crêpes") == "crepes"
+    assert normalize_prompt("Crepes ") == "crepes"
+    assert normalize_prompt("  Crêpes\tau   sucre ") == "crepes au sucre"
+
+
+def test_cache_key_depends_on_language_model_and_fingerprint() -> None:
+    cache = RecipeGenerationCache(None, ttl=60, fingerprint="a")
+    french = {"name": "French", "units": "metric"}
+    english = {"name": "English", "units": "imperial"}
+    key = cache.key(user_input="crêpes", language=french, model="gpt-4o")
+    assert key == cache.key(user_input="Crepes ", language=french, model="gpt-4o")
+    assert key != cache.key(user_input="crepes", language=english, model="gpt-4o")
+    assert key != cache.key(user_input="crepes", language=french, model="gpt-4.1")
+    other = RecipeGenerationCache(None, ttl=60, fingerprint="b")
+    assert key != other.key(user_input="crepes", language=french, model="gpt-4o")
+
+
+def test_memory_backend_expires_and_evicts() -> None:
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", b"1", ttl=60)
+    backend.set("b", b"2", ttl=0)
+    assert backend.get("a") == b"1"
+    assert backend.get("b") is None
+    backend.set("c", b"3", ttl=60)
+    backend.set("d", b"4", ttl=60)
+    assert backend.get("a") is None
+    assert backend.get("d") == b"4"
+
+
+def test_postgres_backend_roundtrip() -> None:
+    cache = RecipeGenerationCache(
+        PostgresCacheBackend(engine), ttl=60, fingerprint="test"
+    )
+    key = f"test:{random_lower_string()}"
+    assert cache.get(key) is None
+    cache.set(key, {"title": "Crêpes"})
+    assert cache.get(key) == {"title": "Crêpes"}
+    cache.set(key, {"title": "Galettes"})
+    assert cache.get(key) == {"title": "Galettes"}
+
+
+def test_response_cache_reads_through_both_tiers() -> None:
+    renders: list[str] = []
+
+    def render() -> bytes:
+        renders.append("render")
+        return b'{"title": "Cr\xc3\xaapes"}'
+
+    shared = PostgresCacheBackend(engine)
+    key = f"test:{random_lower_string()}"
+    worker = RecipeResponseCache(shared, max_entries=2, ttl=60)
+    assert worker.get_or_render(key, render) == b'{"title": "Cr\xc3\xaapes"}'
+    assert worker.get_or_render(key, render) == b'{"title": "Cr\xc3\xaapes"}'
+    assert renders == ["render"]
+
+    # Another worker finds it in the shared tier, then in its own
+    other_worker = RecipeResponseCache(shared, max_entries=2, ttl=60)
+    assert other_worker.get_or_render(key, render) == b'{"title": "Cr\xc3\xaapes"}'
+    assert len(other_worker.local) == 1
+    assert renders == ["render"]
+
+    # Without a shared tier, each worker renders once
+    alone = RecipeResponseCache(None, max_entries=2, ttl=60)
+    alone.get_or_render(key, render)
+    alone.get_or_render(key, render)
+    assert renders == ["render", "render"]
@@ -0,0 +1,223 @@
+import asyncio
+import datetime
+import json
+import uuid
+from typing import Any
+
+import httpx
+import pytest
+from sqlmodel import Session, select
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.models import Recipe, RecipeGenerationJob, User
+from app.schemas.recipe_schemas import RecipeGenerationJobBase
+from app.services.recipe_jobs import RecipeJobRunner
+from app.tests.utils.recipe import create_random_recipe
+from app.tests.utils.user import create_random_user
+
+
+class FakeService:
+    """
+    Stands in for RecipeAIService: "http-error" fails like an unreachable
+    OpenAI, "broken" like an unparsable answer, "slow" never finishes.
+    """
+
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    async def generate_recipe(
+        self, *, owner_id: uuid.UUID, user_input: str, user_lang: str
+    ) -> Recipe:
+        self.calls.append(user_input)
+        if user_input == "http-error":
+            raise httpx.ConnectError("connection refused")
+        if user_input == "broken":
+            raise RuntimeError("Failed to extract recipe JSON from OpenAI response")
+        if user_input == "slow":
+            await asyncio.sleep(60)
+        with Session(engine, expire_on_commit=False) as session:
+            owner = session.get(User, owner_id)
+            assert owner
+            return create_random_recipe(session, owner)
+
+
+def make_runner(service: FakeService, **kwargs: Any) -> RecipeJobRunner:
+    options: dict[str, Any] = {
+        "workers": 1,
+        "poll_interval": 0.05,
+        "lease_seconds": 60,
+        "max_attempts": 3,
+        "callback_timeout": 1,
+    }
+    options.update(kwargs)
+    return RecipeJobRunner(engine, service, **options)  # type: ignore[arg-type]
+
+
+def enqueue(
+    db: Session, user_input: str, callback_url: str | None = None
+) -> RecipeGenerationJob:
+    owner = create_random_user(db)
+    return crud.create_generation_job(
+        session=db,
+        job_create=RecipeGenerationJobBase(user_input=user_input),
+        owner_id=owner.id,
+        callback_url=callback_url,
+    )
+
+
+def run_until_idle(runner: RecipeJobRunner) -> None:
+    async def drain() -> None:
+        while await runner.run_once():
+            pass
+
+    asyncio.run(drain())
+
+
+def reload(db: Session, job: RecipeGenerationJob) -> RecipeGenerationJob:
+    reloaded = db.get(RecipeGenerationJob, job.id, populate_existing=True)
+    assert reloaded
+    return reloaded
+
+
+def test_job_generates_recipe(db: Session) -> None:
+    job = enqueue(db, "crêpes")
+    run_until_idle(make_runner(FakeService()))
+
+    job = reload(db, job)
+    assert job.status == "succeeded"
+    assert job.attempts == 1
+    assert job.finished_at is not None
+    recipe = db.get(Recipe, job.recipe_id)
+    assert recipe and recipe.user_id == job.user_id
+
+
+def test_unreachable_openai_is_retried_with_backoff(db: Session) -> None:
+    service = FakeService()
+    runner = make_runner(service, max_attempts=2)
+    job = enqueue(db, "http-error")
+    run_until_idle(runner)
+
+    job = reload(db, job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.locked_until and job.locked_until > datetime.datetime.utcnow()
+    # Not retried before its backoff has elapsed
+    run_until_idle(runner)
+    assert service.calls.count("http-error") == 1
+
+    job.locked_until = datetime.datetime.utcnow()
+    db.add(job)
+    db.commit()
+    run_until_idle(runner)
+    job = reload(db, job)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert job.error == "OpenAI API call failed"
+
+
+def test_other_failures_are_not_retried(db: Session) -> None:
+    service = FakeService()
+    job = enqueue(db, "broken")
+    run_until_idle(make_runner(service))
+
+    job = reload(db, job)
+    assert job.status == "failed"
+    assert job.error == "Recipe generation failed"
+    assert service.calls.count("broken") == 1
+
+
+def test_claim_skips_locked_jobs_and_reclaims_expired_leases(db: Session) -> None:
+    job = enqueue(db, "crêpes")
+    with Session(engine) as other:
+        # Another worker holds the row: it is skipped, not waited for
+        other.exec(
+            select(RecipeGenerationJob)
+            .where(RecipeGenerationJob.id == job.id)
+            .with_for_update()
+        ).one()
+        with Session(engine) as session:
+            claimed = crud.claim_generation_job(
+                session=session, lease_seconds=60, max_attempts=3
+            )
+            assert claimed is None or claimed.id != job.id
+
+    with Session(engine) as session:
+        claimed = crud.claim_generation_job(
+            session=session, lease_seconds=-1, max_attempts=2
+        )
+        assert claimed and claimed.id == job.id and claimed.status == "running"
+    # Its worker died: the lease expired, so it is claimed again
+    with Session(engine) as session:
+        claimed = crud.claim_generation_job(
+            session=session, lease_seconds=-1, max_attempts=2
+        )
+        assert claimed and claimed.id == job.id and claimed.attempts == 2
+    # ... until it runs out of attempts
+    with Session(engine) as session:
+        claimed = crud.claim_generation_job(
+            session=session, lease_seconds=60, max_attempts=2
+        )
+        assert claimed is None or claimed.id != job.id
+    job = reload(db, job)
+    assert job.status == "failed"
+    assert job.error == "Gave up after 2 attempts"
+
+
+def test_stop_requeues_running_jobs(db: Session) -> None:
+    runner = make_runner(FakeService())
+    job = enqueue(db, "slow")
+
+    async def scenario() -> None:
+        runner.start()
+        for _ in range(100):
+            await asyncio.sleep(0.05)
+            if runner.running:
+                break
+        assert runner.running == 1
+        await runner.stop()
+
+    asyncio.run(scenario())
+    job = reload(db, job)
+    assert job.status == "queued"
+    assert job.attempts == 0
+    db.delete(job)
+    db.commit()
+
+
+def test_finished_job_is_posted_to_callback(db: Session) -> None:
+    received: list[dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(json.loads(request.content))
+        return httpx.Response(204)
+
+    runner = make_runner(FakeService())
+    runner._callback_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    job = enqueue(db, "crêpes", callback_url="https://example.com/hook")
+    run_until_idle(runner)
+
+    assert len(received) == 1
+    assert received[0]["id"] == str(job.id)
+    assert received[0]["status"] == "succeeded"
+    assert received[0]["recipe"]["id"] == str(reload(db, job).recipe_id)
+
+
+def test_callback_to_a_private_address_is_not_posted(
+    db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    received: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request)
+        return httpx.Response(204)
+
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    runner = make_runner(FakeService())
+    runner._callback_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    job = enqueue(db, "crêpes", callback_url="https://10.0.0.1/hook")
+    run_until_idle(runner)
+
+    assert received == []
+    assert reload(db, job).status == "succeeded"
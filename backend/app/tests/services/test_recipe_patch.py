@@ -0,0 +1,180 @@
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import Direction, Ingredient, Recipe
+from app.schemas.recipe_schemas import RecipePatchOperation
+from app.services.recipe_patch import apply_recipe_operations, apply_recipe_patch
+
+
+def make_recipe() -> Recipe:
+    return Recipe(
+        title="Crêpes",
+        description="Thin French pancakes",
+        preparation_time=10,
+        cook_time=20,
+        serves=4,
+        is_favorite=True,
+        user_id=uuid.uuid4(),
+        # Stored out of order, and with gaps: patches refer to positions
+        ingredients=[
+            Ingredient(index=5, content="500 ml milk"),
+            Ingredient(index=0, content="250 g flour"),
+            Ingredient(index=2, content="4 eggs"),
+        ],
+        directions=[
+            Direction(index=0, content="Whisk everything together."),
+            Direction(index=1, content="Cook thin layers in a hot pan."),
+        ],
+    )
+
+
+def test_empty_patch_keeps_the_recipe() -> None:
+    improved = apply_recipe_patch(make_recipe(), {})
+    assert improved.title == "Crêpes"
+    assert improved.is_favorite is True
+    assert [(i.index, i.content) for i in improved.ingredients] == [
+        (0, "250 g flour"),
+        (1, "4 eggs"),
+        (2, "500 ml milk"),
+    ]
+    assert len(improved.directions) == 2
+
+
+def test_patch_is_applied_against_the_original_positions() -> None:
+    improved = apply_recipe_patch(
+        make_recipe(),
+        {
+            "title": "Vegan crêpes",
+            "serves": None,
+            "ingredients": [
+                {"op": "delete", "index": 1},
+                {"op": "replace", "index": 2, "content": "500 ml oat milk"},
+                {"op": "insert", "index": 1, "content": "2 tbsp flax seeds"},
+                {"op": "insert", "index": 3, "content": "1 pinch of salt"},
+            ],
+            "directions": [
+                {"op": "insert", "index": 0, "content": "Soak the flax seeds."},
+            ],
+        },
+    )
+    assert improved.title == "Vegan crêpes"
+    assert improved.serves == 4
+    assert [(i.index, i.content) for i in improved.ingredients] == [
+        (0, "250 g flour"),
+        (1, "2 tbsp flax seeds"),
+        (2, "500 ml oat milk"),
+        (3, "1 pinch of salt"),
+    ]
+    assert [d.content for d in improved.directions] == [
+        "Soak the flax seeds.",
+        "Whisk everything together.",
+        "Cook thin layers in a hot pan.",
+    ]
+
+
+@pytest.mark.parametrize(
+    "operations",
+    [
+        [{"op": "replace", "index": 3, "content": "salt"}],
+        [{"op": "delete", "index": -1}],
+        [{"op": "insert", "index": 4, "content": "salt"}],
+        [{"op": "delete", "index": 0}, {"op": "replace", "index": 0}],
+        [{"op": "move", "index": 0}],
+        [{"op": "insert", "index": 0}],
+        [{"op": "replace", "index": 0, "content": ""}],
+        [{"op": "replace", "index": 0, "content": None}],
+    ],
+)
+def test_invalid_operations(operations: list[dict[str, object]]) -> None:
+    with pytest.raises(ValueError):
+        apply_recipe_patch(make_recipe(), {"ingredients": operations})
+
+
+@pytest.mark.parametrize("patch", [{"serves": "many"}, {"title": "x" * 256}])
+def test_invalid_patched_recipe(patch: dict[str, object]) -> None:
+    with pytest.raises(ValidationError):
+        apply_recipe_patch(make_recipe(), patch)
+
+
+def operations(*items: dict[str, object]) -> list[RecipePatchOperation]:
+    return [RecipePatchOperation.model_validate(item) for item in items]
+
+
+def test_operations_only_set_the_fields_they_touch() -> None:
+    update = apply_recipe_operations(
+        make_recipe(),
+        operations(
+            {"op": "replace", "path": "/is_favorite", "value": False},
+            {"op": "replace", "path": "/cook_time", "value": None},
+        ),
+    )
+    assert update.model_dump(exclude_unset=True) == {
+        "is_favorite": False,
+        "cook_time": None,
+    }
+
+
+def test_operations_apply_one_after_the_other() -> None:
+    update = apply_recipe_operations(
+        make_recipe(),
+        operations(
+            # flour, eggs, milk -> eggs, milk, flour -> eggs, oat milk, flour
+            {"op": "move", "from": "/ingredients/0", "path": "/ingredients/-"},
+            {"op": "replace", "path": "/ingredients/1", "value": "500 ml oat milk"},
+            {"op": "add", "path": "/ingredients/0", "value": "1 pinch of salt"},
+            {"op": "remove", "path": "/ingredients/1"},
+        ),
+    )
+    assert update.model_fields_set == {"ingredients"}
+    assert update.ingredients is not None
+    assert [(i.index, i.content) for i in update.ingredients] == [
+        (1, "1 pinch of salt"),
+        (4, "500 ml oat milk"),
+        (5, "250 g flour"),
+    ]
+
+
+def test_operations_keep_the_stored_indexes() -> None:
+    recipe = make_recipe()
+    recipe.directions = [
+        Direction(index=1, content="Whisk everything together."),
+        Direction(index=2, content="Rest for an hour."),
+        Direction(index=3, content="Cook thin layers in a hot pan."),
+    ]
+    update = apply_recipe_operations(
+        recipe,
+        operations(
+            {"op": "replace", "path": "/directions/0", "value": "Whisk well."},
+            {"op": "add", "path": "/directions/2", "value": "Heat the pan."},
+            {"op": "remove", "path": "/directions/1"},
+        ),
+    )
+    assert update.directions is not None
+    assert [(d.index, d.content) for d in update.directions] == [
+        (1, "Whisk well."),
+        (2, "Heat the pan."),
+        (3, "Cook thin layers in a hot pan."),
+    ]
+
+
+@pytest.mark.parametrize(
+    "operation",
+    [
+        {"op": "add", "path": "/title", "value": "Galettes"},
+        {"op": "replace", "path": "/title", "value": None},
+        {"op": "replace", "path": "/user_id", "value": "me"},
+        {"op": "replace", "path": "/serves", "value": "many"},
+        {"op": "replace", "path": "/ingredients/3", "value": "salt"},
+        {"op": "replace", "path": "/ingredients/-", "value": "salt"},
+        {"op": "replace", "path": "/ingredients/0", "value": 3},
+        {"op": "add", "path": "/ingredients/4", "value": "salt"},
+        {"op": "remove", "path": "/ingredients"},
+        {"op": "remove", "path": "ingredients/0"},
+        {"op": "move", "from": "/directions/0", "path": "/ingredients/0"},
+    ],
+)
+def test_invalid_recipe_operations(operation: dict[str, object]) -> None:
+    with pytest.raises(ValueError):
+        apply_recipe_operations(make_recipe(), operations(operation))
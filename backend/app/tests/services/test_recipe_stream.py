@@ -0,0 +1,35 @@
+import json
+
+from app.services.recipe_stream import RecipeArgumentsParser
+from app.tests.utils.openai_stub import SAMPLE_RECIPE_ARGUMENTS
+
+
+def test_parser_emits_fields_and_items_as_they_complete() -> None:
+    arguments = json.dumps(SAMPLE_RECIPE_ARGUMENTS, indent=2)
+    parser = RecipeArgumentsParser()
+    events = []
+    for char in arguments:
+        events.extend(parser.feed(char))
+
+    assert [name for name, _ in events] == [
+        "title",
+        "description",
+        "preparation_time",
+        "cook_time",
+        "serves",
+        "ingredient",
+        "ingredient",
+        "ingredient",
+        "direction",
+        "direction",
+    ]
+    assert events[0] == ("title", SAMPLE_RECIPE_ARGUMENTS["title"])
+    assert events[5] == ("ingredient", SAMPLE_RECIPE_ARGUMENTS["ingredients"][0])
+    assert parser.arguments() == SAMPLE_RECIPE_ARGUMENTS
+
+
+def test_parser_waits_for_numbers_to_be_terminated() -> None:
+    parser = RecipeArgumentsParser()
+    assert parser.feed('{"serves": 1') == []
+    assert parser.feed("2") == []
+    assert parser.feed("}") == [("serves", 12)]
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+SAMPLE_RECIPE_ARGUMENTS: dict[str, Any] = {
+    "title": "Crêpes",
+    "description": "Thin French pancakes, perfect for a lazy Sunday.",
+    "preparation_time": 10,
+    "cook_time": 20,
+    "serves": 4,
+    "ingredients": [
+        {"index": 0, "content": "250 g flour"},
+        {"index": 1, "content": "4 eggs"},
+        {"index": 2, "content": "500 ml milk"},
+    ],
+    "directions": [
+        {"index": 0, "content": "Whisk everything together."},
+        {"index": 1, "content": "Cook thin layers in a hot pan."},
+    ],
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of `text`: about four characters per token.
+    """
+    return max(1, round(len(text) / 4))
+
+
+class OpenAIStub:
+    """
+    Minimal local stand-in for the OpenAI chat completions API.
+
+    Used by tests and by the benchmark scripts so that generation code paths
+    can be exercised without network access or API costs.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency: float = 0.0,
+        arguments: dict[str, Any] | None = None,
+        function_arguments: dict[str, dict[str, Any]] | None = None,
+        tokens_per_second: float = 0.0,
+        stream_chunk_size: int = 16,
+        stream_chunk_delay: float = 0.0,
+    ) -> None:
+        self.latency = latency
+        self.arguments = arguments or SAMPLE_RECIPE_ARGUMENTS
+        # Arguments returned instead when a request calls one of these functions
+        self.function_arguments = function_arguments or {}
+        # If set, answers also take as long as generating their tokens would
+        self.tokens_per_second = tokens_per_second
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_chunk_delay = stream_chunk_delay
+        self.requests: list[dict[str, Any]] = []
+        self.faults: deque[tuple[int, float, dict[str, str]]] = deque()
+
+    def fail_next(
+        self,
+        count: int = 1,
+        *,
+        status_code: int = 503,
+        delay: float = 0.0,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Answer the next `count` requests with `status_code` after `delay`
+        seconds (a delay longer than the client waits simulates a hang).
+        """
+        for _ in range(count):
+            self.faults.append((status_code, delay, headers or {}))
+
+    def build_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.post("/v1/chat/completions")
+        async def chat_completions(request: Request) -> Any:
+            payload = await request.json()
+            self.requests.append(payload)
+            if self.faults:
+                status_code, delay, headers = self.faults.popleft()
+                await asyncio.sleep(delay)
+                return JSONResponse(
+                    status_code=status_code,
+                    content={"error": {"message": "Injected fault"}},
+                    headers=headers,
+                )
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if payload.get("stream"):
+                return StreamingResponse(
+                    self.stream_completion(), media_type="text/event-stream"
+                )
+            completion = self.completion(payload)
+            if self.tokens_per_second:
+                tokens = completion["usage"]["completion_tokens"]
+                await asyncio.sleep(tokens / self.tokens_per_second)
+            return completion
+
+        return app
+
+    def completion(self, payload: dict[str, Any]) -> dict[str, Any]:
+        name = (payload.get("function_call") or {}).get("name", "create_recipe")
+        arguments = json.dumps(
+            self.function_arguments.get(name, self.arguments), ensure_ascii=False
+        )
+        if payload.get("functions"):
+            message: dict[str, Any] = {
+                "role": "assistant",
+                "content": None,
+                "function_call": {"name": name, "arguments": arguments},
+            }
+            output = arguments
+        else:
+            output = f"```json\n{arguments}\n```"
+            message = {"role": "assistant", "content": output}
+        prompt = "".join(m.get("content") or "" for m in payload.get("messages", []))
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "model": payload.get("model"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": estimate_tokens(prompt),
+                "completion_tokens": estimate_tokens(output),
+            },
+        }
+
+    async def stream_completion(self) -> AsyncIterator[str]:
+        arguments = json.dumps(self.arguments, ensure_ascii=False)
+        size = self.stream_chunk_size
+        for start in range(0, len(arguments), size):
+            delta: dict[str, Any] = {"arguments": arguments[start : start + size]}
+            if start == 0:
+                delta["name"] = "create_recipe"
+            chunk = {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {"function_call": delta}}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+            if self.stream_chunk_delay:
+                await asyncio.sleep(self.stream_chunk_delay)
+        yield "data: [DONE]\n\n"
+
+    @contextmanager
+    def serve(self) -> Iterator[str]:
+        """
+        Run the stub on a free local port and yield its OpenAI base URL.
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        config = uvicorn.Config(
+            self.build_app(),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            backlog=4096,
+        )
+        server = uvicorn.Server(config)
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.01)
+        try:
+            yield f"http://127.0.0.1:{port}/v1"
+        finally:
+            server.should_exit = True
+            thread.join()
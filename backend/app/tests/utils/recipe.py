@@ -0,0 +1,33 @@
+from sqlmodel import Session
+
+from app import crud
+from app.models import Recipe, User
+from app.schemas.recipe_schemas import DirectionCreate, IngredientCreate, RecipeCreate
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_recipe(
+    db: Session,
+    owner: User,
+    *,
+    ingredients: int = 3,
+    directions: int = 2,
+    is_favorite: bool = False,
+) -> Recipe:
+    recipe_in = RecipeCreate(
+        title=random_lower_string(),
+        description=random_lower_string(),
+        preparation_time=10,
+        cook_time=20,
+        serves=2,
+        is_favorite=is_favorite,
+        ingredients=[
+            IngredientCreate(index=i, content=random_lower_string())
+            for i in range(ingredients)
+        ],
+        directions=[
+            DirectionCreate(index=i, content=random_lower_string())
+            for i in range(directions)
+        ],
+    )
+    return crud.create_recipe(session=db, recipe_create=recipe_in, owner=owner)
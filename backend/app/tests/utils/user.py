@@ -28,6 +28,18 @@ def create_random_user(db: Session) -> User:
     return user
 
 
+def create_user_with_headers(
+    client: TestClient, db: Session
+) -> tuple[User, dict[str, str]]:
+    email = random_email()
+    password = random_lower_string()
+    user = crud.create_user(
+        session=db, user_create=UserCreate(email=email, password=password)
+    )
+    headers = user_authentication_headers(client=client, email=email, password=password)
+    return user, headers
+
+
 def authentication_token_from_email(
     *, client: TestClient, email: str, db: Session
 ) -> dict[str, str]:
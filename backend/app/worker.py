@@ -0,0 +1,42 @@
+"""
+Runs background recipe generation jobs outside the API processes:
+
+    RECIPE_JOB_WORKERS=8 python -m app.worker
+
+Start the API with RECIPE_JOB_WORKERS=0 to leave every job to such workers.
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.core.llm import close_openai_client
+from app.services.recipe_jobs import recipe_job_runner
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run() -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    recipe_job_runner.start()
+    logger.info("Running %d recipe job workers", recipe_job_runner.workers)
+    await stopping.wait()
+    logger.info("Stopping, running jobs go back to the queue")
+    await recipe_job_runner.stop()
+    await close_openai_client()
+
+
+def main() -> None:
+    if settings.RECIPE_JOB_WORKERS <= 0:
+        raise SystemExit("Set RECIPE_JOB_WORKERS to the number of workers to run")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
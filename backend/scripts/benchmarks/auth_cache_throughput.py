@@ -0,0 +1,110 @@
+"""
+Authenticated request throughput with and without the auth cache.
+
+Sends ``--requests`` authenticated requests per endpoint through the ASGI
+app from ``--concurrency`` threads, first with the token and user snapshot
+cache disabled (every request decodes the JWT and loads the user), then
+enabled, and reports requests per second and SQL statements per request.
+
+    python scripts/benchmarks/auth_cache_throughput.py --requests 2000 --concurrency 8
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app import crud
+from app.core.auth_cache import auth_cache
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.models import User
+from app.schemas.user_schemas import UserCreate
+from app.tests.utils.user import user_authentication_headers
+from app.tests.utils.utils import random_email, random_lower_string
+
+ENDPOINTS = [
+    ("GET", "/users/me"),
+    ("POST", "/login/test-token"),
+    ("GET", "/recipes/?limit=1&include_count=false"),
+]
+
+
+def measure(
+    client: TestClient,
+    headers: dict[str, str],
+    method: str,
+    path: str,
+    requests: int,
+    concurrency: int,
+) -> tuple[float, float]:
+    statements = 0
+
+    def on_execute(*_args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    def send(_: int) -> None:
+        r = client.request(method, f"{settings.API_V1_STR}{path}", headers=headers)
+        r.raise_for_status()
+
+    # Warm up, so that the cached run starts from a populated cache
+    send(0)
+    event.listen(engine, "before_cursor_execute", on_execute)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(send, range(requests)))
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    elapsed = time.perf_counter() - start
+    return requests / elapsed, statements / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    email, password = random_email(), random_lower_string()
+    with Session(engine) as session:
+        user = crud.create_user(
+            session=session, user_create=UserCreate(email=email, password=password)
+        )
+        user_id = user.id
+    ttl = auth_cache.ttl
+    try:
+        with TestClient(app) as client:
+            headers = user_authentication_headers(
+                client=client, email=email, password=password
+            )
+            print(f"{args.requests} requests, concurrency {args.concurrency}")
+            print(f"{'endpoint':>42} | {'cache':>5} | {'req/s':>8} {'stmts/req':>9}")
+            for method, path in ENDPOINTS:
+                for label, cache_ttl in [("off", 0), ("on", ttl)]:
+                    auth_cache.clear()
+                    auth_cache.ttl = cache_ttl
+                    throughput, statements = measure(
+                        client, headers, method, path, args.requests, args.concurrency
+                    )
+                    print(
+                        f"{method + ' ' + path:>42} | {label:>5} | "
+                        f"{throughput:>8.0f} {statements:>9.2f}"
+                    )
+    finally:
+        auth_cache.ttl = ttl
+        with Session(engine) as session:
+            session.delete(session.get(User, user_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Connection pool behaviour when requests hold connections for a long time.
+
+For each ``--pool`` setting (``size:overflow``), ``--concurrency`` threads
+each check out a connection and hold it for ``--hold`` seconds, the way a
+request that keeps its session open across an LLM call does, while a probe
+thread runs short queries. Reports completed and timed-out checkouts, the
+probe's wait for a connection and the most connections checked out at once.
+With more threads than ``size + overflow`` the surplus waits for the pool
+timeout and then fails, which the API turns into 503 responses.
+
+    python scripts/benchmarks/db_pool_stress.py --concurrency 30 --hold 1 --pool 5:10 20:10
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import Engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.core.db import create_db_engine
+
+
+def parse_pool(value: str) -> tuple[int, int]:
+    size, overflow = (int(part) for part in value.split(":"))
+    return size, overflow
+
+
+def run(
+    engine: Engine, concurrency: int, hold: float
+) -> tuple[int, int, list[float], int]:
+    completed = timed_out = peak = 0
+    lock = threading.Lock()
+    done = threading.Event()
+    probe_waits: list[float] = []
+
+    def slow(_: int) -> None:
+        nonlocal completed, timed_out, peak
+        try:
+            with engine.connect() as conn:
+                with lock:
+                    peak = max(peak, engine.pool.checkedout())  # type: ignore[attr-defined]
+                conn.execute(text("SELECT pg_sleep(:hold)"), {"hold": hold})
+        except PoolTimeoutError:
+            with lock:
+                timed_out += 1
+        else:
+            with lock:
+                completed += 1
+
+    def probe() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    probe_waits.append((time.perf_counter() - start) * 1000)
+                    conn.execute(text("SELECT 1"))
+            except PoolTimeoutError:
+                probe_waits.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+
+    probe_thread = threading.Thread(target=probe)
+    probe_thread.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(slow, range(concurrency)))
+    done.set()
+    probe_thread.join()
+    return completed, timed_out, probe_waits, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=30)
+    parser.add_argument("--hold", type=float, default=1.0)
+    parser.add_argument("--pool-timeout", type=float, default=2.0)
+    parser.add_argument(
+        "--pool", type=parse_pool, nargs="*", default=[(5, 10), (20, 10)]
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.concurrency} connections held {args.hold}s each, "
+        f"pool timeout {args.pool_timeout}s"
+    )
+    print(
+        f"{'pool':>9} | {'done':>5} {'timeouts':>8} {'peak':>5} | "
+        f"{'probe wait p50 ms':>17} {'p95 ms':>8}"
+    )
+    for size, overflow in args.pool:
+        engine = create_db_engine(
+            pool_size=size,
+            max_overflow=overflow,
+            pool_timeout=args.pool_timeout,
+            statement_timeout_ms=0,
+        )
+        try:
+            completed, timed_out, waits, peak = run(engine, args.concurrency, args.hold)
+        finally:
+            engine.dispose()
+        p95 = statistics.quantiles(waits, n=20)[-1] if len(waits) > 1 else waits[0]
+        print(
+            f"{size:>4}+{overflow:<4} | {completed:>5} {timed_out:>8} {peak:>5} | "
+            f"{statistics.median(waits):>17.1f} {p95:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
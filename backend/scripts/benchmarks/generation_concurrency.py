@@ -0,0 +1,90 @@
+"""
+Load test: concurrent recipe generations against a local stub LLM server.
+
+Compares the pooled async OpenAI client used by ``RecipeAIService`` with the
+previous implementation (a blocking, connection-per-call POST executed on the
+40-thread pool FastAPI uses for sync routes).
+
+    python scripts/benchmarks/generation_concurrency.py --latency 0.5
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from app.core import llm
+from app.core.config import settings
+from app.services.recipe_services import RecipeAIService
+from app.tests.utils.openai_stub import OpenAIStub
+
+# Default size of the AnyIO thread limiter that runs sync FastAPI routes
+SYNC_ROUTE_THREADS = 40
+
+
+def blocking_generations(
+    service: RecipeAIService, base_url: str, concurrency: int
+) -> float:
+    payload = service._build_generation_payload("crêpes", "fr")
+
+    def call() -> None:
+        resp = httpx.post(f"{base_url}/chat/completions", json=payload, timeout=None)
+        resp.raise_for_status()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=SYNC_ROUTE_THREADS) as executor:
+        for future in [executor.submit(call) for _ in range(concurrency)]:
+            future.result()
+    return time.perf_counter() - start
+
+
+async def async_generations(service: RecipeAIService, concurrency: int) -> float:
+    payload = service._build_generation_payload("crêpes", "fr")
+    start = time.perf_counter()
+    await asyncio.gather(*(service._call_openai(payload) for _ in range(concurrency)))
+    return time.perf_counter() - start
+
+
+async def run_async(service: RecipeAIService, levels: list[int]) -> list[float]:
+    try:
+        return [await async_generations(service, level) for level in levels]
+    finally:
+        await llm.close_openai_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument(
+        "--levels", type=int, nargs="+", default=[1, 8, 32, 64, 128, 256]
+    )
+    args = parser.parse_args()
+
+    service = RecipeAIService()
+    stub = OpenAIStub(latency=args.latency)
+    with stub.serve() as base_url:
+        settings.OPENAI_BASE_URL = base_url
+        async_times = asyncio.run(run_async(service, args.levels))
+        blocking_times = [
+            blocking_generations(service, base_url, level) for level in args.levels
+        ]
+
+    print(
+        f"stub latency: {args.latency:.2f}s, sync route threads: {SYNC_ROUTE_THREADS}"
+    )
+    print(
+        f"{'concurrency':>11} | {'blocking (s)':>12} {'req/s':>8} | {'async (s)':>9} {'req/s':>8}"
+    )
+    for level, blocking, pooled in zip(
+        args.levels, blocking_times, async_times, strict=True
+    ):
+        print(
+            f"{level:>11} | {blocking:>12.2f} {level / blocking:>8.1f} "
+            f"| {pooled:>9.2f} {level / pooled:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
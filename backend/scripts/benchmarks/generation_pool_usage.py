@@ -0,0 +1,113 @@
+"""
+Database pool usage during concurrent recipe generations.
+
+Sends ``--concurrency`` concurrent POST /recipes/generate requests (each with
+a distinct prompt, so the generation cache never answers) through the ASGI
+app, against a local stub LLM that takes ``--latency`` seconds to answer,
+while sampling how many pooled connections are checked out. Run it with a
+small pool to see whether generations starve the pool:
+
+    POSTGRES_POOL_SIZE=5 POSTGRES_MAX_OVERFLOW=0 POSTGRES_POOL_TIMEOUT_SECONDS=5 \\
+        python scripts/benchmarks/generation_pool_usage.py --concurrency 50 --latency 2
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.main import app
+from app.models import User
+from app.schemas.user_schemas import UserCreate
+from app.tests.utils.openai_stub import OpenAIStub
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+async def load(
+    email: str, password: str, concurrency: int
+) -> tuple[float, list[int], list[int]]:
+    pool = engine.pool
+    samples: list[int] = []
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        while not done.is_set():
+            samples.append(pool.checkedout())  # type: ignore[attr-defined]
+            await asyncio.sleep(0.005)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://bench",
+        timeout=None,
+    ) as client:
+        r = await client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={"username": email, "password": password},
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        async def generate(i: int) -> int:
+            r = await client.post(
+                f"{settings.API_V1_STR}/recipes/generate",
+                headers=headers,
+                json={"user_input": f"crêpes {i} {random_lower_string()}"},
+            )
+            return r.status_code
+
+        sampler = asyncio.create_task(sample())
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(generate(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await sampler
+    return elapsed, list(statuses), samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=2.0)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    email, password = random_email(), random_lower_string()
+    with Session(engine) as session:
+        user_id = crud.create_user(
+            session=session, user_create=UserCreate(email=email, password=password)
+        ).id
+    try:
+        with OpenAIStub(latency=args.latency).serve() as base_url:
+            settings.OPENAI_BASE_URL = base_url
+            elapsed, statuses, samples = asyncio.run(
+                load(email, password, args.concurrency)
+            )
+    finally:
+        with Session(engine) as session:
+            session.delete(session.get(User, user_id))
+            session.commit()
+
+    ok, busy = statuses.count(200), statuses.count(503)
+    print(
+        f"{args.concurrency} generations, stub latency {args.latency}s, pool "
+        f"{settings.POSTGRES_POOL_SIZE}+{settings.POSTGRES_MAX_OVERFLOW}, "
+        f"pool timeout {settings.POSTGRES_POOL_TIMEOUT_SECONDS}s"
+    )
+    print(
+        f"ok {ok}, 503 {busy}, other {len(statuses) - ok - busy}, "
+        f"{elapsed:.2f}s, {ok / elapsed:.1f} generations/s"
+    )
+    print(
+        f"connections checked out: peak {max(samples)}, "
+        f"mean {statistics.mean(samples):.2f} over {len(samples)} samples"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Latency of GET /recipes/{id} for guest recipes and memory held by the response
+cache.
+
+Reads guest recipes through the app, as the first superuser, with an empty
+cache (each read loads and serializes the recipe, as without the cache), from
+the shared Postgres tier (the worker's LRU emptied before each read) and from
+the worker's LRU, then measures the memory the LRU holds for the recipes.
+
+    python scripts/benchmarks/guest_recipe_cache.py --recipes 200 --ingredients 12
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import tracemalloc
+import uuid
+
+import httpx
+from sqlmodel import Session, col, delete, select
+
+from app import crud
+from app.api.responses import RECIPE_ACCESS_FIELDS
+from app.api.routes.recipes import GUEST_EMAIL
+from app.core.cache import PostgresCacheBackend
+from app.core.config import settings
+from app.core.db import engine, init_db
+from app.main import app
+from app.models import CacheEntry, Recipe, User
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipePublic,
+)
+from app.services.recipe_cache import RecipeResponseCache, recipe_response_cache
+
+
+async def read_all(
+    recipe_ids: list[uuid.UUID], *, clear_local: bool
+) -> tuple[list[float], int]:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    timings: list[float] = []
+    size = 0
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        r = await client.post(
+            f"{settings.API_V1_STR}/login/access-token",
+            data={
+                "username": settings.FIRST_SUPERUSER,
+                "password": settings.FIRST_SUPERUSER_PASSWORD,
+            },
+        )
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        for recipe_id in recipe_ids:
+            if clear_local:
+                recipe_response_cache.local.clear()
+            start = time.perf_counter()
+            r = await client.get(
+                f"{settings.API_V1_STR}/recipes/{recipe_id}", headers=headers
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            r.raise_for_status()
+            size += len(r.content)
+    return timings, size // len(recipe_ids)
+
+
+def local_footprint(recipe_ids: list[uuid.UUID]) -> int:
+    """
+    Bytes held by a worker's LRU once it has cached every recipe.
+    """
+    with Session(engine) as session:
+        recipes = [
+            RecipePublic.model_validate(recipe)
+            for recipe in session.exec(
+                select(Recipe)
+                .where(col(Recipe.id).in_(recipe_ids))
+                .options(*crud.RECIPE_PUBLIC_LOADERS)
+            )
+        ]
+    cache = RecipeResponseCache(None, max_entries=len(recipes), ttl=3600)
+    tracemalloc.start()
+    for recipe in recipes:
+        cache.local.set(
+            cache.key(recipe.id, recipe.updated_at),
+            recipe.model_dump_json(exclude=set(RECIPE_ACCESS_FIELDS)).encode(),
+        )
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=200)
+    parser.add_argument("--ingredients", type=int, default=12)
+    parser.add_argument("--directions", type=int, default=8)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with Session(engine) as session:
+        # The first superuser, who reads the recipes, and the guest account
+        init_db(session)
+        guest = session.exec(select(User).where(User.email == GUEST_EMAIL)).one()
+        recipes = crud.create_recipes(
+            session=session,
+            recipe_creates=[
+                RecipeCreate(
+                    title=f"Guest recipe {n}",
+                    description="Synthetic recipe generated by a guest",
+                    preparation_time=15,
+                    cook_time=30,
+                    serves=4,
+                    ingredients=[
+                        IngredientCreate(index=i, content=f"{i + 1}00 g ingredient")
+                        for i in range(args.ingredients)
+                    ],
+                    directions=[
+                        DirectionCreate(index=i, content=f"Step {i + 1}: stir well.")
+                        for i in range(args.directions)
+                    ],
+                )
+                for n in range(args.recipes)
+            ],
+            owner=guest,
+        )
+        recipe_ids = [recipe.id for recipe in recipes]
+    shared = recipe_response_cache.shared
+    try:
+        recipe_response_cache.local.clear()
+        recipe_response_cache.shared = None
+        uncached, size = asyncio.run(read_all(recipe_ids, clear_local=True))
+        # Each first pass fills the tier the second one reads from
+        asyncio.run(read_all(recipe_ids, clear_local=False))
+        local, _ = asyncio.run(read_all(recipe_ids, clear_local=False))
+        recipe_response_cache.shared = PostgresCacheBackend(engine)
+        asyncio.run(read_all(recipe_ids, clear_local=True))
+        shared_hits, _ = asyncio.run(read_all(recipe_ids, clear_local=True))
+        held = local_footprint(recipe_ids)
+    finally:
+        recipe_response_cache.shared = shared
+        recipe_response_cache.local.clear()
+        with Session(engine) as session:
+            session.exec(  # type: ignore[call-overload]
+                delete(CacheEntry).where(
+                    col(CacheEntry.key).startswith(RecipeResponseCache.NAMESPACE)
+                )
+            )
+            session.exec(  # type: ignore[call-overload]
+                delete(Recipe).where(col(Recipe.id).in_(recipe_ids))
+            )
+            session.commit()
+
+    print(
+        f"{args.recipes} recipes of {args.ingredients} ingredients and "
+        f"{args.directions} directions, {size} bytes of JSON each"
+    )
+    print(f"{'read':>12} | {'mean (ms)':>9} {'p50':>7} {'p95':>7}")
+    for name, timings in [
+        ("uncached", uncached),
+        ("shared hit", shared_hits),
+        ("local hit", local),
+    ]:
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(
+            f"{name:>12} | {statistics.fmean(timings):>9.2f} "
+            f"{statistics.median(timings):>7.2f} {p95:>7.2f}"
+        )
+    print(
+        f"local tier: {held / 1024:.0f} KiB for {args.recipes} recipes, "
+        f"{held / args.recipes:.0f} bytes per entry; "
+        f"{held / args.recipes * settings.RECIPE_RESPONSE_CACHE_MAX_ENTRIES / 2**20:.1f} "
+        f"MiB at RECIPE_RESPONSE_CACHE_MAX_ENTRIES="
+        f"{settings.RECIPE_RESPONSE_CACHE_MAX_ENTRIES}"
+    )
+
+
+if __name__ == "__main__":
+    main()
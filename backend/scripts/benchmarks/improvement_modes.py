@@ -0,0 +1,134 @@
+"""
+Output tokens and wall time of a recipe improvement, full rewrite vs patch.
+
+Replays recorded answers (fixtures/improvement_modes.json) for a few typical
+requests through ``RecipeAIService.improve_recipe``'s OpenAI call against a
+local stub that takes as long as generating the answer's tokens would. Both
+modes must give the same recipe; only what the model has to write differs.
+
+    python scripts/benchmarks/improvement_modes.py --tokens-per-second 80 --latency 0.4
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Literal
+
+from app.core import llm
+from app.core.config import settings
+from app.models import Direction, Ingredient, Recipe
+from app.schemas.recipe_schemas import RecipeCreate
+from app.services.recipe_patch import apply_recipe_patch
+from app.services.recipe_services import RecipeAIService
+from app.tests.utils.openai_stub import OpenAIStub, estimate_tokens
+
+FIXTURES = Path(__file__).parent / "fixtures" / "improvement_modes.json"
+
+
+def load_recipe(data: dict[str, Any]) -> Recipe:
+    return Recipe(
+        id=uuid.uuid4(),
+        title=data["title"],
+        description=data["description"],
+        preparation_time=data["preparation_time"],
+        cook_time=data["cook_time"],
+        serves=data["serves"],
+        user_id=uuid.uuid4(),
+        ingredients=[
+            Ingredient(index=index, content=content)
+            for index, content in enumerate(data["ingredients"])
+        ],
+        directions=[
+            Direction(index=index, content=content)
+            for index, content in enumerate(data["directions"])
+        ],
+    )
+
+
+async def improve(
+    service: RecipeAIService,
+    original: Recipe,
+    user_input: str,
+    mode: Literal["rewrite", "patch"],
+) -> RecipeCreate:
+    # improve_recipe without storing the new version
+    payload = service._build_improvement_payload(user_input, original, mode)
+    arguments = await service._call_openai(payload)
+    if mode == "patch":
+        return apply_recipe_patch(original, arguments)
+    return RecipeCreate(**arguments)
+
+
+async def measure(
+    service: RecipeAIService,
+    original: Recipe,
+    user_input: str,
+    mode: Literal["rewrite", "patch"],
+    iterations: int,
+) -> tuple[float, RecipeCreate]:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        improved = await improve(service, original, user_input, mode)
+    return (time.perf_counter() - start) * 1000 / iterations, improved
+
+
+async def run(
+    stub: OpenAIStub,
+    original: Recipe,
+    scenarios: dict[str, dict[str, Any]],
+    iterations: int,
+) -> list[tuple[str, str, int, float]]:
+    service = RecipeAIService()
+    rows: list[tuple[str, str, int, float]] = []
+    try:
+        for user_input, answers in scenarios.items():
+            stub.function_arguments = {
+                "create_recipe": answers["rewrite"],
+                "patch_recipe": answers["patch"],
+            }
+            results = {}
+            modes: list[Literal["rewrite", "patch"]] = ["rewrite", "patch"]
+            for mode in modes:
+                elapsed, results[mode] = await measure(
+                    service, original, user_input, mode, iterations
+                )
+                tokens = estimate_tokens(json.dumps(answers[mode], ensure_ascii=False))
+                rows.append((user_input, mode, tokens, elapsed))
+            rewritten = results["rewrite"].model_dump(exclude={"is_favorite"})
+            patched = results["patch"].model_dump(exclude={"is_favorite"})
+            if rewritten != patched:
+                raise RuntimeError(f"{user_input!r}: the modes disagree")
+    finally:
+        await llm.close_openai_client()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--latency", type=float, default=0.4)
+    parser.add_argument("--iterations", type=int, default=3)
+    args = parser.parse_args()
+
+    fixtures = json.loads(FIXTURES.read_text())
+    original = load_recipe(fixtures["recipe"])
+    stub = OpenAIStub(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    with stub.serve() as base_url:
+        settings.OPENAI_BASE_URL = base_url
+        rows = asyncio.run(run(stub, original, fixtures["scenarios"], args.iterations))
+
+    print(
+        f"{len(original.ingredients)} ingredients, {len(original.directions)} "
+        f"directions, {args.tokens_per_second:.0f} tokens/s, "
+        f"{args.latency:.2f}s to first token, {args.iterations} iterations"
+    )
+    print(f"{'request':>14} {'mode':>8} | {'output tokens':>13} {'ms':>8}")
+    for user_input, mode, tokens, elapsed in rows:
+        print(f"{user_input:>14} {mode:>8} | {tokens:>13} {elapsed:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Login throughput and event loop responsiveness under a burst of logins.
+
+Fires ``--logins`` concurrent POST /login/access-token requests (at most
+``--concurrency`` in flight) at the ASGI app while a probe keeps calling the
+health check, for each way of running bcrypt: in the thread pool and in a
+process pool. Reports logins per second, logins rejected with 503 by the
+queue-depth limit and the health check latency seen during the burst.
+
+    python scripts/benchmarks/login_throughput.py --logins 64 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+from sqlmodel import Session
+
+from app import crud
+from app.core.config import settings
+from app.core.db import engine
+from app.core.security import password_hasher
+from app.main import app
+from app.models import User
+from app.schemas.user_schemas import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+async def burst(
+    email: str, password: str, logins: int, concurrency: int
+) -> tuple[float, int, int, list[float]]:
+    transport = httpx.ASGITransport(app=app)
+    limit = asyncio.Semaphore(concurrency)
+    done = asyncio.Event()
+    probe_latencies: list[float] = []
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def login() -> int:
+            async with limit:
+                r = await client.post(
+                    f"{settings.API_V1_STR}/login/access-token",
+                    data={"username": email, "password": password},
+                )
+                return r.status_code
+
+        async def probe() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get(f"{settings.API_V1_STR}/utils/health-check/")
+                probe_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    ok = statuses.count(200)
+    return ok / elapsed, ok, statuses.count(503), probe_latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    email, password = random_email(), random_lower_string()
+    with Session(engine) as session:
+        user_id = crud.create_user(
+            session=session, user_create=UserCreate(email=email, password=password)
+        ).id
+    try:
+        print(
+            f"{args.logins} logins, concurrency {args.concurrency}, "
+            f"max pending {password_hasher.max_pending}"
+        )
+        print(
+            f"{'mode':>14} | {'logins/s':>8} {'ok':>4} {'503':>4} | "
+            f"{'health p50 ms':>13} {'p95 ms':>7}"
+        )
+        for label, workers in [
+            ("threads", 0),
+            (f"processes({args.workers})", args.workers),
+        ]:
+            password_hasher.shutdown()
+            password_hasher.workers = workers
+            rate, ok, rejected, latencies = asyncio.run(
+                burst(email, password, args.logins, args.concurrency)
+            )
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else 0
+            print(
+                f"{label:>14} | {rate:>8.1f} {ok:>4} {rejected:>4} | "
+                f"{statistics.median(latencies):>13.1f} {p95:>7.1f}"
+            )
+    finally:
+        password_hasher.shutdown()
+        with Session(engine) as session:
+            session.delete(session.get(User, user_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
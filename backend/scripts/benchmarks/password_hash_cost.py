@@ -0,0 +1,97 @@
+"""
+Per-hash latency and memory of the password hashing settings.
+
+Each setting runs in a fresh process, which hashes and verifies a password
+``--rounds`` times, so that its peak RSS growth is not hidden by an earlier,
+costlier setting. Use it to pick PASSWORD_BCRYPT_ROUNDS and the
+PASSWORD_ARGON2_* costs: the hashes per second a core sustains bounds the
+logins per second a worker can serve.
+
+    python scripts/benchmarks/password_hash_cost.py --bcrypt-rounds 10 12 --argon2 19456:2:1 65536:3:1
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+
+from app.core.security import make_password_context
+
+PASSWORD = "correct horse battery staple"
+
+
+def measure(
+    scheme: str, bcrypt_rounds: int, argon2_costs: tuple[int, int, int], rounds: int
+) -> tuple[float, float, float]:
+    memory_cost, time_cost, parallelism = argon2_costs
+    context = make_password_context(
+        [scheme],
+        bcrypt_rounds=bcrypt_rounds,
+        argon2_memory_cost=memory_cost,
+        argon2_time_cost=time_cost,
+        argon2_parallelism=parallelism,
+    )
+    baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    hash_ms, verify_ms = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hashed = context.hash(PASSWORD)
+        hash_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        assert context.verify(PASSWORD, hashed)
+        verify_ms.append((time.perf_counter() - start) * 1000)
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (
+        statistics.median(hash_ms),
+        statistics.median(verify_ms),
+        (peak_kib - baseline_kib) / 1024,
+    )
+
+
+def parse_argon2(value: str) -> tuple[int, int, int]:
+    memory_cost, time_cost, parallelism = (int(part) for part in value.split(":"))
+    return memory_cost, time_cost, parallelism
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--bcrypt-rounds", type=int, nargs="*", default=[10, 11, 12, 13]
+    )
+    parser.add_argument(
+        "--argon2",
+        type=parse_argon2,
+        nargs="*",
+        default=[(19456, 2, 1), (47104, 1, 1), (65536, 3, 1), (65536, 3, 4)],
+        metavar="MEMORY_KIB:TIME:PARALLELISM",
+    )
+    args = parser.parse_args()
+
+    cases = [
+        ("bcrypt", f"rounds={rounds}", rounds, (0, 0, 0))
+        for rounds in args.bcrypt_rounds
+    ] + [
+        ("argon2", f"m={costs[0]},t={costs[1]},p={costs[2]}", 12, costs)
+        for costs in args.argon2
+    ]
+    print(f"{args.rounds} hashes per setting, medians")
+    print(
+        f"{'scheme':>7} {'setting':>20} | {'hash ms':>8} {'verify ms':>9} "
+        f"{'hashes/s/core':>13} {'peak RSS MiB':>12}"
+    )
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        for scheme, label, bcrypt_rounds, argon2_costs in cases:
+            hash_ms, verify_ms, rss_mib = pool.apply(
+                measure, (scheme, bcrypt_rounds, argon2_costs, args.rounds)
+            )
+            print(
+                f"{scheme:>7} {label:>20} | {hash_ms:>8.1f} {verify_ms:>9.1f} "
+                f"{1000 / verify_ms:>13.1f} {rss_mib:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Query plans and latencies of the recipe access patterns, with and without
+the recipe indexes.
+
+Seeds ``--recipes`` recipes (with their ingredients and directions) spread
+over ``--users`` throwaway users, then runs the queries issued by the recipe
+routes for one of those users. The "after" numbers use the current schema;
+the "before" numbers are taken inside a transaction that drops the indexes
+and is rolled back afterwards. Dropping an index locks its table, so only
+run this against a development database.
+
+    python scripts/benchmarks/recipe_index_plans.py --recipes 1000000 --users 1000
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from typing import Any
+
+from sqlalchemy import Connection, text
+
+from app.core.db import create_db_engine
+
+# Seeding takes longer than the statement timeout meant for requests
+engine = create_db_engine(statement_timeout_ms=0)
+
+# Secondary indexes added for the recipe routes, dropped for "before"
+INDEXES = [
+    "ix_recipe_user_id_created_at_id",
+    "ix_recipe_user_id_last_accessed_at_id",
+    "ix_recipe_created_at_id",
+    "ix_recipe_last_accessed_at_id",
+    "ix_recipe_user_id_is_favorite",
+    "ix_ingredient_recipe_id",
+    "ix_direction_recipe_id",
+]
+
+PAGE = "SELECT id FROM recipe WHERE user_id = :user_id LIMIT 100"
+
+QUERIES = {
+    "list (offset)": "SELECT * FROM recipe WHERE user_id = :user_id LIMIT 100",
+    "count": "SELECT count(*) FROM recipe WHERE user_id = :user_id",
+    "favorites": (
+        "SELECT * FROM recipe WHERE user_id = :user_id AND is_favorite LIMIT 100"
+    ),
+    "list (cursor)": (
+        "SELECT * FROM recipe WHERE user_id = :user_id "
+        "ORDER BY created_at DESC, id DESC LIMIT 101"
+    ),
+    "ingredients": f"SELECT * FROM ingredient WHERE recipe_id IN ({PAGE})",
+    "directions": f"SELECT * FROM direction WHERE recipe_id IN ({PAGE})",
+    "read one": "SELECT * FROM recipe WHERE id = :recipe_id",
+    "cascade delete": "DELETE FROM recipe WHERE id = :recipe_id",
+}
+
+
+def seed(conn: Connection, tag: str, args: argparse.Namespace) -> None:
+    conn.execute(
+        text(
+            'INSERT INTO "user" (id, email, is_active, is_superuser, hashed_password) '
+            "SELECT uuid_generate_v4(), 'bench-' || :tag || '-' || g || '@example.com', "
+            "true, false, '' FROM generate_series(1, :users) g"
+        ),
+        {"tag": tag, "users": args.users},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO recipe (id, title, description, preparation_time, "
+            "cook_time, serves, is_favorite, created_at, updated_at, "
+            "last_accessed_at, number_of_accesses, user_id) "
+            "SELECT uuid_generate_v4(), 'Recipe ' || g, 'Seeded recipe', 10, 20, 4, "
+            "random() < 0.1, ts, ts, ts, 0, u.id "
+            "FROM generate_series(0, :recipes - 1) g "
+            "CROSS JOIN LATERAL (SELECT now() - g * interval '1 second' AS ts) t "
+            "JOIN (SELECT id, row_number() OVER (ORDER BY email) - 1 AS rn "
+            "      FROM \"user\" WHERE email LIKE 'bench-' || :tag || '-%') u "
+            "  ON u.rn = g % :users"
+        ),
+        {"tag": tag, "recipes": args.recipes, "users": args.users},
+    )
+    for table, count in [
+        ("ingredient", args.ingredients),
+        ("direction", args.directions),
+    ]:
+        conn.execute(
+            text(
+                f"INSERT INTO {table} (id, index, content, recipe_id) "
+                f"SELECT uuid_generate_v4(), i, '{table} ' || i, r.id "
+                'FROM recipe r JOIN "user" u ON u.id = r.user_id '
+                "CROSS JOIN generate_series(0, :count - 1) i "
+                "WHERE u.email LIKE 'bench-' || :tag || '-%'"
+            ),
+            {"tag": tag, "count": count},
+        )
+
+
+def measure(
+    conn: Connection, sql: str, params: dict[str, Any], repeat: int
+) -> tuple[float, str]:
+    plan = conn.execute(text(f"EXPLAIN (COSTS OFF) {sql}"), params).scalars().all()
+    timings = []
+    for _ in range(repeat):
+        savepoint = conn.begin_nested()
+        start = time.perf_counter()
+        conn.execute(text(sql), params)
+        timings.append((time.perf_counter() - start) * 1000)
+        savepoint.rollback()
+    return statistics.median(timings), "\n".join(plan)
+
+
+def scans(plan: str) -> str:
+    """
+    Summarize a plan as the scan nodes it uses.
+    """
+    nodes = [
+        line.strip().removeprefix("->").strip()
+        for line in plan.splitlines()
+        if "Scan" in line
+    ]
+    return ", ".join(nodes)
+
+
+def run_queries(
+    conn: Connection, params: dict[str, Any], repeat: int
+) -> dict[str, tuple[float, str]]:
+    return {name: measure(conn, sql, params, repeat) for name, sql in QUERIES.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--recipes", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--ingredients", type=int, default=3)
+    parser.add_argument("--directions", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="print full plans")
+    args = parser.parse_args()
+
+    tag = uuid.uuid4().hex[:8]
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        seed(conn, tag, args)
+    with engine.connect() as conn:
+        conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+            text("ANALYZE recipe, ingredient, direction")
+        )
+    print(
+        f"seeded {args.recipes} recipes for {args.users} users "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+    try:
+        with engine.connect() as conn:
+            params = dict(
+                conn.execute(
+                    text(
+                        "SELECT r.user_id, r.id AS recipe_id FROM recipe r "
+                        'JOIN "user" u ON u.id = r.user_id '
+                        "WHERE u.email = 'bench-' || :tag || '-1@example.com' "
+                        "LIMIT 1"
+                    ),
+                    {"tag": tag},
+                )
+                .one()
+                ._mapping
+            )
+            after = run_queries(conn, params, args.repeat)
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            before = run_queries(conn, params, args.repeat)
+            conn.rollback()
+
+        print(f"{'query':>15} | {'before ms':>10} {'after ms':>10} | scans after")
+        for name in QUERIES:
+            print(
+                f"{name:>15} | {before[name][0]:>10.2f} {after[name][0]:>10.2f} "
+                f"| {scans(after[name][1])}"
+            )
+        if args.plans:
+            for name in QUERIES:
+                print(f"\n== {name} (before)\n{before[name][1]}")
+                print(f"== {name} (after)\n{after[name][1]}")
+    finally:
+        with engine.begin() as conn:
+            conn.execute(
+                text("DELETE FROM \"user\" WHERE email LIKE 'bench-' || :tag || '-%'"),
+                {"tag": tag},
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Round-trips needed to store one recipe, before and after crud.create_recipe.
+
+Counts the statements sent to Postgres and the transactions committed while
+creating a recipe and serializing it as the API response (RecipePublic), for
+the previous per-object ORM implementation and for the bulk insert.
+
+    python scripts/benchmarks/recipe_insert_roundtrips.py --ingredients 12 --directions 8
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app import crud
+from app.core.db import engine
+from app.models import Direction, Ingredient, Recipe, User
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipePublic,
+)
+from app.schemas.user_schemas import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+
+def legacy_create_recipe(
+    session: Session, current_user: User, recipe_create: RecipeCreate
+) -> Recipe:
+    """
+    The implementation previously shared by create_recipe and _persist_recipe.
+    """
+    recipe_data = recipe_create.model_dump(exclude={"ingredients", "directions"})
+    recipe = Recipe.model_validate(recipe_data, update={"user_id": current_user.id})
+    session.add(recipe)
+    session.commit()
+    session.refresh(recipe)
+    for ing in recipe_create.ingredients:
+        session.add(Ingredient.model_validate(ing, update={"recipe_id": recipe.id}))
+    for direc in recipe_create.directions:
+        session.add(Direction.model_validate(direc, update={"recipe_id": recipe.id}))
+    session.commit()
+    session.refresh(recipe)
+    return recipe
+
+
+def bulk_create_recipe(
+    session: Session, current_user: User, recipe_create: RecipeCreate
+) -> Recipe:
+    return crud.create_recipe(
+        session=session, recipe_create=recipe_create, owner=current_user
+    )
+
+
+def measure(
+    create: Callable[[Session, User, RecipeCreate], Recipe],
+    user: User,
+    recipe_create: RecipeCreate,
+    iterations: int,
+) -> tuple[float, float, float]:
+    counts = {"statements": 0, "commits": 0}
+
+    def on_execute(*_args: Any) -> None:
+        counts["statements"] += 1
+
+    def on_commit(*_args: Any) -> None:
+        counts["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    start = time.perf_counter()
+    try:
+        for _ in range(iterations):
+            with Session(engine) as session:
+                session.add(user)
+                recipe = create(session, user, recipe_create)
+                RecipePublic.model_validate(recipe)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+    return (
+        counts["statements"] / iterations,
+        counts["commits"] / iterations,
+        elapsed_ms,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ingredients", type=int, default=12)
+    parser.add_argument("--directions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    recipe_create = RecipeCreate(
+        title="Benchmark recipe",
+        description="Synthetic recipe used to count round-trips",
+        preparation_time=10,
+        cook_time=20,
+        serves=4,
+        ingredients=[
+            IngredientCreate(index=i, content=f"ingredient {i}")
+            for i in range(args.ingredients)
+        ],
+        directions=[
+            DirectionCreate(index=i, content=f"direction {i}")
+            for i in range(args.directions)
+        ],
+    )
+
+    with Session(engine) as session:
+        user = crud.create_user(
+            session=session,
+            user_create=UserCreate(
+                email=random_email(), password=random_lower_string()
+            ),
+        )
+        session.expunge(user)
+    try:
+        print(
+            f"{args.ingredients} ingredients, {args.directions} directions, "
+            f"{args.iterations} iterations"
+        )
+        print(f"{'implementation':>14} | {'statements':>10} {'commits':>7} {'ms':>7}")
+        for name, create in [
+            ("legacy", legacy_create_recipe),
+            ("bulk", bulk_create_recipe),
+        ]:
+            statements, commits, elapsed = measure(
+                create, user, recipe_create, args.iterations
+            )
+            print(f"{name:>14} | {statements:>10.1f} {commits:>7.1f} {elapsed:>7.2f}")
+    finally:
+        with Session(engine) as session:
+            session.delete(session.get(User, user.id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
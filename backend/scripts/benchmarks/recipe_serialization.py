@@ -0,0 +1,139 @@
+"""
+CPU time to serialize a page of recipes, as FastAPI's response_model does it
+and with the ResponseSerializer of app.api.responses.
+
+Serializes synthetic pages of recipes, loaded with their owner, ingredients
+and directions as read_recipes loads them, without a database:
+
+- response_model + json: a RecipesPublic validated again by FastAPI, dumped
+  to dicts and encoded with the stdlib, as before
+- response_model + orjson: the same, encoded by the default response class
+- serializer: the response model's fields read from the ORM objects, without
+  validating them, and encoded with orjson
+
+    python scripts/benchmarks/recipe_serialization.py --pages 10 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.responses import RECIPES_PUBLIC, DefaultJSONResponse, model_response
+from app.models import Direction, Ingredient, Recipe, User
+from app.schemas.recipe_schemas import RecipesPublic
+
+RESPONSE_FIELD = create_model_field(
+    name="Response_recipes-read_recipes", type_=RecipesPublic, mode="serialization"
+)
+
+
+def make_recipes(count: int, ingredients: int, directions: int) -> list[Recipe]:
+    owner = User(
+        id=uuid.uuid4(),
+        email="cook@example.com",
+        full_name="Benchmark Cook",
+        hashed_password="not-a-hash",
+    )
+    return [
+        Recipe(
+            id=uuid.uuid4(),
+            title=f"Recipe {n}",
+            description="Synthetic recipe read back in a page",
+            preparation_time=15,
+            cook_time=30,
+            serves=4,
+            user_id=owner.id,
+            user=owner,
+            ingredients=[
+                Ingredient(index=i, content=f"{i + 1}00 g ingredient")
+                for i in range(ingredients)
+            ],
+            directions=[
+                Direction(index=i, content=f"Step {i + 1}: stir well.")
+                for i in range(directions)
+            ],
+        )
+        for n in range(count)
+    ]
+
+
+async def response_model_body(
+    recipes: list[Recipe], response_class: type[JSONResponse]
+) -> bytes:
+    # What read_recipes returned, and what FastAPI then did with it
+    page = RecipesPublic(data=recipes, count=len(recipes), next_cursor=None)
+    content = await serialize_response(
+        field=RESPONSE_FIELD, response_content=page, is_coroutine=True
+    )
+    return bytes(response_class(content).body)
+
+
+async def stdlib_body(recipes: list[Recipe]) -> bytes:
+    return await response_model_body(recipes, JSONResponse)
+
+
+async def orjson_body(recipes: list[Recipe]) -> bytes:
+    return await response_model_body(recipes, DefaultJSONResponse)
+
+
+async def serializer_body(recipes: list[Recipe]) -> bytes:
+    page = {"data": recipes, "count": len(recipes), "next_cursor": None}
+    return bytes(model_response(RECIPES_PUBLIC, page).body)
+
+
+async def measure(
+    render: Callable[[list[Recipe]], Awaitable[bytes]],
+    recipes: list[Recipe],
+    iterations: int,
+) -> tuple[float, bytes]:
+    body = await render(recipes)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await render(recipes)
+    return (time.perf_counter() - start) * 1000 / iterations, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--ingredients", type=int, default=12)
+    parser.add_argument("--directions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = {
+        "response_model + json": stdlib_body,
+        "response_model + orjson": orjson_body,
+        "serializer": serializer_body,
+    }
+    print(
+        f"{args.ingredients} ingredients and {args.directions} directions per "
+        f"recipe, {args.iterations} iterations"
+    )
+    print(f"{'recipes':>7} {'path':>24} | {'ms':>8} {'speedup':>8} {'kB':>7}")
+    for count in args.pages:
+        recipes = make_recipes(count, args.ingredients, args.directions)
+        baseline = None
+        expected = None
+        for name, render in paths.items():
+            elapsed, body = asyncio.run(measure(render, recipes, args.iterations))
+            if expected is None:
+                expected = json.loads(body)
+            elif json.loads(body) != expected:
+                raise RuntimeError(f"{name}: the page differs")
+            baseline = baseline or elapsed
+            print(
+                f"{count:>7} {name:>24} | {elapsed:>8.2f} "
+                f"{baseline / elapsed:>7.1f}x {len(body) / 1000:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+WAL written and latency of typical recipe edits, before and after the
+differential crud.update_recipe.
+
+Applies each edit to a recipe, as the editor's autosave would PUT it, with
+the previous implementation (delete every ingredient and direction, insert
+them again) and with the index-keyed diff. WAL is measured as the advance of
+the server's WAL insert position, so run it against an otherwise idle
+database.
+
+    python scripts/benchmarks/recipe_update_wal.py --ingredients 12 --directions 8
+"""
+
+import argparse
+import time
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlmodel import Session, col, delete
+
+from app import crud
+from app.core.db import engine
+from app.models import Direction, Ingredient, Recipe, User
+from app.schemas.recipe_schemas import (
+    DirectionCreate,
+    IngredientCreate,
+    RecipeCreate,
+    RecipeUpdate,
+)
+from app.schemas.user_schemas import UserCreate
+from app.tests.utils.utils import random_email, random_lower_string
+
+Lines = tuple[list[IngredientCreate], list[DirectionCreate]]
+
+
+def legacy_update_recipe(
+    session: Session, recipe: Recipe, recipe_in: RecipeUpdate
+) -> None:
+    """
+    The implementation previously in the update_recipe route.
+    """
+    data = recipe_in.model_dump(exclude_unset=True)
+    ingredients_data = data.pop("ingredients", None)
+    directions_data = data.pop("directions", None)
+    for field, value in data.items():
+        setattr(recipe, field, value)
+    session.flush()
+    if ingredients_data is not None:
+        session.exec(delete(Ingredient).where(col(Ingredient.recipe_id) == recipe.id))  # type: ignore[call-overload]
+        for ing in ingredients_data:
+            session.add(Ingredient.model_validate(ing, update={"recipe_id": recipe.id}))
+    if directions_data is not None:
+        session.exec(delete(Direction).where(col(Direction.recipe_id) == recipe.id))  # type: ignore[call-overload]
+        for dir_ in directions_data:
+            session.add(Direction.model_validate(dir_, update={"recipe_id": recipe.id}))
+    session.commit()
+
+
+def differential_update_recipe(
+    session: Session, recipe: Recipe, recipe_in: RecipeUpdate
+) -> None:
+    crud.update_recipe(session=session, db_recipe=recipe, recipe_in=recipe_in)
+
+
+def edits(base: Lines) -> dict[str, Callable[[], Lines]]:
+    ingredients, directions = base
+
+    def unchanged() -> Lines:
+        return list(ingredients), list(directions)
+
+    def edit_one_line() -> Lines:
+        edited = list(ingredients)
+        edited[1] = IngredientCreate(index=1, content="2 pinches of salt")
+        return edited, list(directions)
+
+    def append_a_line() -> Lines:
+        added = IngredientCreate(index=len(ingredients), content="fresh basil")
+        return [*ingredients, added], list(directions)
+
+    def delete_a_line() -> Lines:
+        return list(ingredients), directions[:-1]
+
+    def rewrite_everything() -> Lines:
+        return (
+            [
+                IngredientCreate(index=i.index, content=f"{i.content}!")
+                for i in ingredients
+            ],
+            [
+                DirectionCreate(index=d.index, content=f"{d.content}!")
+                for d in directions
+            ],
+        )
+
+    return {
+        "unchanged": unchanged,
+        "edit 1 line": edit_one_line,
+        "append 1 line": append_a_line,
+        "delete 1 line": delete_a_line,
+        "rewrite all": rewrite_everything,
+    }
+
+
+def wal_position(session: Session) -> str:
+    position: str = session.exec(  # type: ignore[call-overload]
+        text("SELECT pg_current_wal_insert_lsn()::text")
+    ).scalar_one()
+    return position
+
+
+def wal_bytes(session: Session, start: str, end: str) -> int:
+    written: int = session.exec(  # type: ignore[call-overload]
+        text("SELECT pg_wal_lsn_diff(:end, :start)::bigint"),
+        params={"start": start, "end": end},
+    ).scalar_one()
+    return written
+
+
+def measure(
+    update: Callable[[Session, Recipe, RecipeUpdate], None],
+    recipe_id: uuid.UUID,
+    base: Lines,
+    edit: Callable[[], Lines],
+    iterations: int,
+) -> tuple[float, float]:
+    total_bytes = 0
+    total_seconds = 0.0
+    with Session(engine) as probe:
+        for _ in range(iterations):
+            # Back to the original lines, with the implementation under test
+            # so that the rows look like the ones it leaves behind
+            with Session(engine) as session:
+                recipe = session.get(Recipe, recipe_id)
+                assert recipe
+                update(
+                    session,
+                    recipe,
+                    RecipeUpdate(ingredients=base[0], directions=base[1]),
+                )
+            ingredients, directions = edit()
+            recipe_in = RecipeUpdate(ingredients=ingredients, directions=directions)
+            with Session(engine) as session:
+                recipe = session.get(Recipe, recipe_id)
+                assert recipe
+                start = wal_position(probe)
+                probe.commit()
+                began = time.perf_counter()
+                update(session, recipe, recipe_in)
+                total_seconds += time.perf_counter() - began
+                total_bytes += wal_bytes(probe, start, wal_position(probe))
+                probe.commit()
+    return total_bytes / iterations, total_seconds * 1000 / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ingredients", type=int, default=12)
+    parser.add_argument("--directions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    base: Lines = (
+        [
+            IngredientCreate(index=i, content=f"{i + 1} ingredient, chopped")
+            for i in range(args.ingredients)
+        ],
+        [
+            DirectionCreate(index=i, content=f"Step {i + 1}: stir and simmer gently.")
+            for i in range(args.directions)
+        ],
+    )
+    with Session(engine) as session:
+        user = crud.create_user(
+            session=session,
+            user_create=UserCreate(
+                email=random_email(), password=random_lower_string()
+            ),
+        )
+        recipe = crud.create_recipe(
+            session=session,
+            recipe_create=RecipeCreate(
+                title="Benchmark recipe",
+                description="Synthetic recipe edited by the autosave",
+                preparation_time=10,
+                serves=4,
+                ingredients=base[0],
+                directions=base[1],
+            ),
+            owner=user,
+        )
+        user_id, recipe_id = user.id, recipe.id
+    try:
+        print(
+            f"{args.ingredients} ingredients, {args.directions} directions, "
+            f"{args.iterations} iterations"
+        )
+        print(
+            f"{'edit':>14} | {'legacy WAL (B)':>14} {'ms':>6} "
+            f"| {'diff WAL (B)':>12} {'ms':>6}"
+        )
+        for name, edit in edits(base).items():
+            legacy = measure(
+                legacy_update_recipe, recipe_id, base, edit, args.iterations
+            )
+            diff = measure(
+                differential_update_recipe, recipe_id, base, edit, args.iterations
+            )
+            print(
+                f"{name:>14} | {legacy[0]:>14.0f} {legacy[1]:>6.2f} "
+                f"| {diff[0]:>12.0f} {diff[1]:>6.2f}"
+            )
+    finally:
+        with Session(engine) as session:
+            session.delete(session.get(User, user_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
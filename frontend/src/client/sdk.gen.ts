@@ -19,14 +19,24 @@ import type {
 	RecipesReadRecipesResponse,
 	RecipesCreateRecipeData,
 	RecipesCreateRecipeResponse,
+	RecipesSearchRecipesData,
+	RecipesSearchRecipesResponse,
+	RecipesReadGenerationJobData,
+	RecipesReadGenerationJobResponse,
 	RecipesReadRecipeData,
 	RecipesReadRecipeResponse,
 	RecipesUpdateRecipeData,
 	RecipesUpdateRecipeResponse,
+	RecipesPatchRecipeData,
+	RecipesPatchRecipeResponse,
 	RecipesDeleteRecipeData,
 	RecipesDeleteRecipeResponse,
 	RecipesGenerateRecipeData,
 	RecipesGenerateRecipeResponse,
+	RecipesGenerateRecipeStreamData,
+	RecipesGenerateRecipeStreamResponse,
+	RecipesGenerateRecipeBatchData,
+	RecipesGenerateRecipeBatchResponse,
 	RecipesGenerateRecipePublicData,
 	RecipesGenerateRecipePublicResponse,
 	RecipesImproveRecipeData,
@@ -51,6 +61,7 @@ import type {
 	UsersDeleteUserResponse,
 	UtilsTestEmailData,
 	UtilsTestEmailResponse,
+	UtilsReadMetricsResponse,
 	UtilsHealthCheckResponse,
 } from "./types.gen";
 
@@ -186,10 +197,26 @@ export class PrivateService {
 export class RecipesService {
 	/**
 	 * Read Recipes
-	 * Retrieve recipes (owns only, unless superuser).
+	 * Retrieve recipes (owns only, unless superuser), optionally only the
+	 * favorite (or non-favorite) ones.
+	 *
+	 * With `pagination=cursor` (implied when `cursor` is given) recipes are
+	 * paged by keyset over `(order_by, id)`, most recent first: pass the
+	 * returned `next_cursor` to fetch the following page. `include_count=false`
+	 * skips counting the matching recipes.
+	 *
+	 * The page has an ETag that changes when one of its recipes is updated or
+	 * the page holds other recipes: with a matching If-None-Match, 304 is
+	 * returned without loading the ingredients and directions.
 	 * @param data The data for the request.
 	 * @param data.skip
 	 * @param data.limit
+	 * @param data.pagination
+	 * @param data.cursor
+	 * @param data.orderBy
+	 * @param data.includeCount
+	 * @param data.isFavorite
+	 * @param data.ifNoneMatch
 	 * @returns RecipesPublic Successful Response
 	 * @throws ApiError
 	 */
@@ -199,9 +226,17 @@ export class RecipesService {
 		return __request(OpenAPI, {
 			method: "GET",
 			url: "/api/v1/recipes/",
+			headers: {
+				"if-none-match": data.ifNoneMatch,
+			},
 			query: {
 				skip: data.skip,
 				limit: data.limit,
+				pagination: data.pagination,
+				cursor: data.cursor,
+				order_by: data.orderBy,
+				include_count: data.includeCount,
+				is_favorite: data.isFavorite,
 			},
 			errors: {
 				422: "Validation Error",
@@ -231,11 +266,80 @@ export class RecipesService {
 		});
 	}
 
+	/**
+	 * Search Recipes
+	 * Search recipes (owns only, unless superuser) by title, description and
+	 * ingredients, best matches first.
+	 *
+	 * `language` picks the stemming rules applied to `q`. When nothing matches,
+	 * recipes are matched on fuzzy title similarity instead, so typos still
+	 * find results. Pass the returned `next_cursor` to fetch the following page.
+	 * @param data The data for the request.
+	 * @param data.q
+	 * @param data.language
+	 * @param data.limit
+	 * @param data.cursor
+	 * @returns RecipesPublic Successful Response
+	 * @throws ApiError
+	 */
+	public static searchRecipes(
+		data: RecipesSearchRecipesData,
+	): CancelablePromise<RecipesSearchRecipesResponse> {
+		return __request(OpenAPI, {
+			method: "GET",
+			url: "/api/v1/recipes/search",
+			query: {
+				q: data.q,
+				language: data.language,
+				limit: data.limit,
+				cursor: data.cursor,
+			},
+			errors: {
+				422: "Validation Error",
+			},
+		});
+	}
+
+	/**
+	 * Read Generation Job
+	 * Get the status of a background recipe generation, and the recipe once
+	 * it has succeeded.
+	 * @param data The data for the request.
+	 * @param data.id
+	 * @returns RecipeGenerationJobPublic_Output Successful Response
+	 * @throws ApiError
+	 */
+	public static readGenerationJob(
+		data: RecipesReadGenerationJobData,
+	): CancelablePromise<RecipesReadGenerationJobResponse> {
+		return __request(OpenAPI, {
+			method: "GET",
+			url: "/api/v1/recipes/jobs/{id}",
+			path: {
+				id: data.id,
+			},
+			errors: {
+				422: "Validation Error",
+			},
+		});
+	}
+
 	/**
 	 * Read Recipe
 	 * Get a recipe by UUID.
+	 *
+	 * The read is recorded in last_accessed_at and number_of_accesses a few
+	 * seconds later, in a batch with other reads. The ETag changes when the
+	 * recipe is updated, not on reads: with a matching If-None-Match, 304 is
+	 * returned without loading the ingredients and directions. It can also be
+	 * sent back in If-Match to PATCH the recipe.
+	 *
+	 * Guest recipes, which nobody edits once generated, are served from the
+	 * response cache, keyed by id and updated_at: a cached read neither loads
+	 * nor serializes the ingredients and directions.
 	 * @param data The data for the request.
 	 * @param data.id
+	 * @param data.ifNoneMatch
 	 * @returns RecipePublic Successful Response
 	 * @throws ApiError
 	 */
@@ -245,6 +349,9 @@ export class RecipesService {
 		return __request(OpenAPI, {
 			method: "GET",
 			url: "/api/v1/recipes/{id}",
+			headers: {
+				"if-none-match": data.ifNoneMatch,
+			},
 			path: {
 				id: data.id,
 			},
@@ -280,6 +387,42 @@ export class RecipesService {
 		});
 	}
 
+	/**
+	 * Patch Recipe
+	 * Edit a recipe with JSON Patch style operations, applied in order in a
+	 * single transaction: "replace" a field such as "/is_favorite", or
+	 * "add", "replace", "remove" or "move" a line such as "/directions/2".
+	 *
+	 * With If-Match, the operations are only applied if the recipe still has
+	 * that ETag, or 412 is returned. Only the fields that changed are returned,
+	 * with the new ETag.
+	 * @param data The data for the request.
+	 * @param data.id
+	 * @param data.requestBody
+	 * @param data.ifMatch
+	 * @returns RecipeChanges Successful Response
+	 * @throws ApiError
+	 */
+	public static patchRecipe(
+		data: RecipesPatchRecipeData,
+	): CancelablePromise<RecipesPatchRecipeResponse> {
+		return __request(OpenAPI, {
+			method: "PATCH",
+			url: "/api/v1/recipes/{id}",
+			headers: {
+				"if-match": data.ifMatch,
+			},
+			path: {
+				id: data.id,
+			},
+			body: data.requestBody,
+			mediaType: "application/json",
+			errors: {
+				422: "Validation Error",
+			},
+		});
+	}
+
 	/**
 	 * Delete Recipe
 	 * Delete a recipe.
@@ -306,9 +449,15 @@ export class RecipesService {
 	/**
 	 * Generate Recipe
 	 * Generate a recipe via OpenAI, storing the result.
+	 *
+	 * With `background=true`, answer 202 at once with a job to poll at
+	 * `GET /recipes/jobs/{id}` (also given as the Location header); if
+	 * `callback_url` is set, the finished job is also POSTed to it.
 	 * @param data The data for the request.
 	 * @param data.requestBody
+	 * @param data.background
 	 * @returns RecipePublic Successful Response
+	 * @returns RecipeGenerationJobPublic_Input Queued as a background job
 	 * @throws ApiError
 	 */
 	public static generateRecipe(
@@ -317,6 +466,62 @@ export class RecipesService {
 		return __request(OpenAPI, {
 			method: "POST",
 			url: "/api/v1/recipes/generate",
+			query: {
+				background: data.background,
+			},
+			body: data.requestBody,
+			mediaType: "application/json",
+			errors: {
+				422: "Validation Error",
+			},
+		});
+	}
+
+	/**
+	 * Generate Recipe Stream
+	 * Same as /generate, but streams the recipe as server-sent events while
+	 * OpenAI generates it: `title`, `description`, `preparation_time`,
+	 * `cook_time`, `serves`, one `ingredient` / `direction` event per item,
+	 * then `recipe` with the stored recipe (or `error`).
+	 * @param data The data for the request.
+	 * @param data.requestBody
+	 * @returns unknown Successful Response
+	 * @throws ApiError
+	 */
+	public static generateRecipeStream(
+		data: RecipesGenerateRecipeStreamData,
+	): CancelablePromise<RecipesGenerateRecipeStreamResponse> {
+		return __request(OpenAPI, {
+			method: "POST",
+			url: "/api/v1/recipes/generate/stream",
+			body: data.requestBody,
+			mediaType: "application/json",
+			errors: {
+				422: "Validation Error",
+			},
+		});
+	}
+
+	/**
+	 * Generate Recipe Batch
+	 * Generate several recipes at once, from a list of `prompts` or from one
+	 * `user_input` repeated `count` times (each giving a different recipe).
+	 *
+	 * Streams server-sent events: an `item` with `index` and the generated
+	 * `recipe` (or an `error` with `index` and `detail`) as each generation
+	 * completes, in any order. The generated recipes are then stored together,
+	 * and a final `done` lists them in prompt order, with null for failures.
+	 * @param data The data for the request.
+	 * @param data.requestBody
+	 * @returns unknown Successful Response
+	 * @throws ApiError
+	 */
+	public static generateRecipeBatch(
+		data: RecipesGenerateRecipeBatchData,
+	): CancelablePromise<RecipesGenerateRecipeBatchResponse> {
+		return __request(OpenAPI, {
+			method: "POST",
+			url: "/api/v1/recipes/generate/batch",
 			body: data.requestBody,
 			mediaType: "application/json",
 			errors: {
@@ -349,16 +554,17 @@ export class RecipesService {
 
 	/**
 	 * Improve Recipe
-	 * Improve (modify) an existing recipe with user instructions and AI assistance.
-	 * 1. Fetch the original recipe.
-	 * 2. Build a prompt with the original recipe + user instructions.
-	 * 3. Send prompt to OpenAI, parse the improved recipe JSON.
-	 * 4. Update the recipe in the DB.
-	 * 5. Return the updated recipe in the public schema.
+	 * Improve an existing recipe with user instructions and AI assistance.
+	 *
+	 * The improved recipe is stored as a new version of the original (its
+	 * `parent_id`), which is left unchanged, and returned. With `mode=patch`
+	 * the model only describes the changes, which are applied to the
+	 * original: faster and cheaper for small improvements.
 	 * @param data The data for the request.
 	 * @param data.id
 	 * @param data.requestBody
-	 * @returns unknown Successful Response
+	 * @param data.mode
+	 * @returns RecipePublic Successful Response
 	 * @throws ApiError
 	 */
 	public static improveRecipe(
@@ -370,6 +576,9 @@ export class RecipesService {
 			path: {
 				id: data.id,
 			},
+			query: {
+				mode: data.mode,
+			},
 			body: data.requestBody,
 			mediaType: "application/json",
 			errors: {
@@ -383,9 +592,16 @@ export class UsersService {
 	/**
 	 * Read Users
 	 * Retrieve users.
+	 *
+	 * With `pagination=cursor` (implied when `cursor` is given) users are paged
+	 * by keyset over their email: pass the returned `next_cursor` to fetch the
+	 * following page. `include_count=false` skips counting the users.
 	 * @param data The data for the request.
 	 * @param data.skip
 	 * @param data.limit
+	 * @param data.pagination
+	 * @param data.cursor
+	 * @param data.includeCount
 	 * @returns UsersPublic Successful Response
 	 * @throws ApiError
 	 */
@@ -398,6 +614,9 @@ export class UsersService {
 			query: {
 				skip: data.skip,
 				limit: data.limit,
+				pagination: data.pagination,
+				cursor: data.cursor,
+				include_count: data.includeCount,
 			},
 			errors: {
 				422: "Validation Error",
@@ -616,6 +835,19 @@ export class UtilsService {
 		});
 	}
 
+	/**
+	 * Read Metrics
+	 * In-process counters and gauges of the worker that serves the request.
+	 * @returns unknown Successful Response
+	 * @throws ApiError
+	 */
+	public static readMetrics(): CancelablePromise<UtilsReadMetricsResponse> {
+		return __request(OpenAPI, {
+			method: "GET",
+			url: "/api/v1/utils/metrics/",
+		});
+	}
+
 	/**
 	 * Health Check
 	 * @returns boolean Successful Response
@@ -12,6 +12,7 @@ export type Body_login_login_access_token = {
 export type Body_recipes_generate_recipe = {
 	user_input: string;
 	language?: string;
+	callback_url?: string | null;
 };
 
 export type Body_recipes_generate_recipe_public = {
@@ -19,6 +20,11 @@ export type Body_recipes_generate_recipe_public = {
 	language?: string;
 };
 
+export type Body_recipes_generate_recipe_stream = {
+	user_input: string;
+	language?: string;
+};
+
 export type Body_recipes_improve_recipe = {
 	user_input: string;
 };
@@ -65,6 +71,26 @@ export type PrivateUserCreate = {
 	is_verified?: boolean;
 };
 
+export type RecipeBatchGenerate = {
+	prompts?: Array<string> | null;
+	user_input?: string | null;
+	count?: number | null;
+	language?: string;
+};
+
+export type RecipeChanges = {
+	id: string;
+	updated_at: string;
+	title?: string | null;
+	description?: string | null;
+	preparation_time?: number | null;
+	cook_time?: number | null;
+	serves?: number | null;
+	is_favorite?: boolean | null;
+	ingredients?: Array<IngredientPublic> | null;
+	directions?: Array<DirectionPublic> | null;
+};
+
 export type RecipeCreate = {
 	title: string;
 	description: string;
@@ -74,6 +100,40 @@ export type RecipeCreate = {
 	is_favorite?: boolean;
 	ingredients?: Array<IngredientCreate>;
 	directions?: Array<DirectionCreate>;
+	language?: string | null;
+};
+
+export type RecipeGenerationJobPublic_Input = {
+	user_input: string;
+	language?: string;
+	id: string;
+	status: string;
+	attempts: number;
+	error?: string | null;
+	created_at: string;
+	started_at?: string | null;
+	finished_at?: string | null;
+	recipe?: RecipePublic | null;
+};
+
+export type RecipeGenerationJobPublic_Output = {
+	user_input: string;
+	language?: string;
+	id: string;
+	status: string;
+	attempts: number;
+	error?: string | null;
+	created_at: string;
+	started_at?: string | null;
+	finished_at?: string | null;
+	recipe?: RecipePublic | null;
+};
+
+export type RecipePatchOperation = {
+	op: "replace" | "add" | "remove" | "move";
+	path: string;
+	value?: string | number | boolean | null;
+	from?: string | null;
 };
 
 export type RecipePublic = {
@@ -92,11 +152,14 @@ export type RecipePublic = {
 	number_of_accesses: number;
 	user?: UserPublic | null;
 	deleted_at?: string | null;
+	parent_id?: string | null;
+	version?: number;
 };
 
 export type RecipesPublic = {
 	data: Array<RecipePublic>;
-	count: number;
+	count?: number | null;
+	next_cursor?: string | null;
 };
 
 export type RecipeUpdate = {
@@ -144,7 +207,8 @@ export type UserRegister = {
 
 export type UsersPublic = {
 	data: Array<UserPublic>;
-	count: number;
+	count?: number | null;
+	next_cursor?: string | null;
 };
 
 export type UserUpdate = {
@@ -199,7 +263,13 @@ export type PrivateCreateUserData = {
 export type PrivateCreateUserResponse = UserPublic;
 
 export type RecipesReadRecipesData = {
+	cursor?: string | null;
+	ifNoneMatch?: string | null;
+	includeCount?: boolean;
+	isFavorite?: boolean | null;
 	limit?: number;
+	orderBy?: "created_at" | "last_accessed_at";
+	pagination?: "offset" | "cursor";
 	skip?: number;
 };
 
@@ -211,8 +281,24 @@ export type RecipesCreateRecipeData = {
 
 export type RecipesCreateRecipeResponse = RecipePublic;
 
+export type RecipesSearchRecipesData = {
+	cursor?: string | null;
+	language?: string;
+	limit?: number;
+	q: string;
+};
+
+export type RecipesSearchRecipesResponse = RecipesPublic;
+
+export type RecipesReadGenerationJobData = {
+	id: string;
+};
+
+export type RecipesReadGenerationJobResponse = RecipeGenerationJobPublic_Output;
+
 export type RecipesReadRecipeData = {
 	id: string;
+	ifNoneMatch?: string | null;
 };
 
 export type RecipesReadRecipeResponse = RecipePublic;
@@ -224,6 +310,14 @@ export type RecipesUpdateRecipeData = {
 
 export type RecipesUpdateRecipeResponse = RecipePublic;
 
+export type RecipesPatchRecipeData = {
+	id: string;
+	ifMatch?: string | null;
+	requestBody: Array<RecipePatchOperation>;
+};
+
+export type RecipesPatchRecipeResponse = RecipeChanges;
+
 export type RecipesDeleteRecipeData = {
 	id: string;
 };
@@ -231,10 +325,25 @@ export type RecipesDeleteRecipeData = {
 export type RecipesDeleteRecipeResponse = Message;
 
 export type RecipesGenerateRecipeData = {
+	background?: boolean;
 	requestBody: Body_recipes_generate_recipe;
 };
 
-export type RecipesGenerateRecipeResponse = RecipePublic;
+export type RecipesGenerateRecipeResponse =
+	| RecipePublic
+	| RecipeGenerationJobPublic_Input;
+
+export type RecipesGenerateRecipeStreamData = {
+	requestBody: Body_recipes_generate_recipe_stream;
+};
+
+export type RecipesGenerateRecipeStreamResponse = unknown;
+
+export type RecipesGenerateRecipeBatchData = {
+	requestBody: RecipeBatchGenerate;
+};
+
+export type RecipesGenerateRecipeBatchResponse = unknown;
 
 export type RecipesGenerateRecipePublicData = {
 	requestBody: Body_recipes_generate_recipe_public;
@@ -244,13 +353,17 @@ export type RecipesGenerateRecipePublicResponse = RecipePublic;
 
 export type RecipesImproveRecipeData = {
 	id: string;
+	mode?: "rewrite" | "patch";
 	requestBody: Body_recipes_improve_recipe;
 };
 
-export type RecipesImproveRecipeResponse = unknown;
+export type RecipesImproveRecipeResponse = RecipePublic;
 
 export type UsersReadUsersData = {
+	cursor?: string | null;
+	includeCount?: boolean;
 	limit?: number;
+	pagination?: "offset" | "cursor";
 	skip?: number;
 };
 
@@ -309,4 +422,8 @@ export type UtilsTestEmailData = {
 
 export type UtilsTestEmailResponse = Message;
 
+export type UtilsReadMetricsResponse = {
+	[key: string]: number;
+};
+
 export type UtilsHealthCheckResponse = boolean;
@@ -12,7 +12,7 @@ import TypingEffectTitle from "@/components/TypingEffectTitle";
 
 import { useNavigateTo } from "@/hooks/use-navigate-to";
 import { useRecipe } from "@/hooks/use-recipe";
-import { RecipesService, RecipesPublic } from "@/client";
+import { RecipesService, RecipePublic, RecipesPublic } from "@/client";
 
 import { promptExemples } from "@/prompt-examples";
 import { useAuth } from "@/hooks/use-auth";
@@ -41,8 +41,9 @@ function HomePage(): JSX.Element {
 			const body = {
 				requestBody: { user_input: userInput, language: recipeLanguage },
 			};
+			// Generated inline (no `background`), so never a job
 			const newRecipe = isAuthenticated
-				? await RecipesService.generateRecipe(body)
+				? ((await RecipesService.generateRecipe(body)) as RecipePublic)
 				: await RecipesService.generateRecipePublic(body);
 
 			if (isAuthenticated) {
@@ -1,5 +1,4 @@
 // src/pages/RecipePage/ImproveRecipeDialog.tsx
-import { v4 as uuidv4 } from "uuid";
 import axios from "axios";
 import { Loader2 } from "lucide-react";
 import { useState } from "react";
@@ -48,13 +47,6 @@ const ImproveRecipeDialog: React.FC<ImproveRecipeDialogProps> = ({
 				id: recipe.id,
 				requestBody: { user_input: userInput },
 			});
-			improvedRecipe.id = uuidv4();
-			improvedRecipe.ingredients?.forEach((ing) => {
-				ing.id = uuidv4();
-			});
-			improvedRecipe.directions?.forEach((ing) => {
-				ing.id = uuidv4();
-			});
 			setUserInput("");
 			setOpen(false);
 			setIsLoading(false);
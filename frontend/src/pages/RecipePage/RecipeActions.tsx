@@ -40,7 +40,8 @@ const RecipeActions: React.FC<RecipeActionsProps> = ({
   setImprovedRecipe,
 }) => {
   const { toHome, toRecipe } = useNavigateTo();
-  const { toggleFavorite, deleteRecipe, updateRecipe, addRecipe } = useRecipe();
+  const { toggleFavorite, deleteRecipe, updateRecipe, setRecipes } =
+    useRecipe();
   const { openLoginDialogIfGuest, isAuthenticated } = useAuth();
 
   // --- Handlers ---
@@ -59,19 +60,19 @@ const RecipeActions: React.FC<RecipeActionsProps> = ({
     }
   };
 
-  const handleUndoImprove = () => {
+  // The improved recipe is already stored, as a new version of the current one
+  const handleUndoImprove = async () => {
+    await deleteRecipe(recipe.id);
     setImprove(false);
     setImprovedRecipe(null);
   };
 
   const handleSaveImprove = async () => {
-    const newRecipe = await addRecipe(recipe);
-    if (newRecipe) {
-      await deleteRecipe(currentRecipe.id);
-      setImprove(false);
-      setImprovedRecipe(null);
-      toRecipe(newRecipe.id);
-    }
+    await deleteRecipe(currentRecipe.id);
+    setRecipes((prev) => [...prev, recipe]);
+    setImprove(false);
+    setImprovedRecipe(null);
+    toRecipe(recipe.id);
   };
 
   const handleToggleFavorite = async () => {